@@ -4,48 +4,211 @@ Folkets Lexikon XML to Yomitan Dictionary Converter
 Main entry point for the conversion process
 """
 
+import argparse
 import os
 import sys
 from xml_parser import FolketsXMLParser
 from yomitan_converter import YomitanConverter
+from lexicon_snapshot import LexiconSnapshot
+from sqlite_export import SQLiteExporter
+from reverse_dictionary import ReverseDictionaryConverter
+from variant_build import MultiVariantBuild, VARIANTS
+from frequency_index import FrequencyIndex
+from audio_bundle import AudioBundle
+from cross_references import CrossReferenceIndex
+from resource_scheduler import plan_workers, positive_int
+from bank_validator import print_issues, validate_dictionary
 
 
-def main():
+def parse_args(argv=None):
+    """Parse command line options"""
+    arg_parser = argparse.ArgumentParser(description="Convert Folkets Lexikon XML to a Yomitan dictionary")
+    arg_parser.add_argument("--xml", default="folkets_sv_en_public.xml",
+                            help="Folkets Lexikon XML file (default: %(default)s)")
+    arg_parser.add_argument("--output", default="Folkets_Lexikon.zip",
+                            help="Output dictionary ZIP (default: %(default)s)")
+    arg_parser.add_argument("--cache-dir", default=".lexicon_cache",
+                            help="Directory for parsed lexicon snapshots (default: %(default)s)")
+    arg_parser.add_argument("--no-cache", action="store_true",
+                            help="Always parse the XML, neither reading nor writing snapshots")
+    arg_parser.add_argument("--parse-workers", type=positive_int,
+                            help="Parse the XML, and count --corpus, in chunks across this many processes "
+                                 "(default: 1, or sized from available CPUs and memory with --auto-workers)")
+    arg_parser.add_argument("--render-workers", type=positive_int,
+                            help="Render entries in this many processes sharing one entry store "
+                                 "(default: 1, or sized from available CPUs and memory with --auto-workers)")
+    arg_parser.add_argument("--auto-workers", action="store_true",
+                            help="Size the parse and render process pools not given explicitly from the CPUs "
+                                 "and memory this build may use")
+    arg_parser.add_argument("--serialize-workers", type=positive_int,
+                            help="Threads serializing term banks (default: sized from available CPUs and memory)")
+    arg_parser.add_argument("--compress-workers", type=positive_int,
+                            help="Threads compressing ZIP members (default: sized from available CPUs and memory)")
+    arg_parser.add_argument("--memory-budget", type=int, metavar="MB",
+                            help="Hold at most about this many MB of rendered rows; beyond it, finished term "
+                                 "banks are written out as they complete (same output)")
+    arg_parser.add_argument("--inflection-mode", choices=["full", "compact"], default="full",
+                            help="'compact' emits content-less inflections as pointer rows plus "
+                                 "inflection_index.json instead of repeating base form content")
+    arg_parser.add_argument("--pipeline", action="store_true",
+                            help="Overlap render, serialize and compress stages, writing the ZIP directly")
+    arg_parser.add_argument("--previous-zip",
+                            help="Previous release ZIP; unchanged members are copied without recompression")
+    arg_parser.add_argument("--stable-banks", type=int, default=0,
+                            help="Partition term banks by headword hash into this many banks, so an "
+                                 "inserted entry only changes its own bank (default: sequential banks)")
+    arg_parser.add_argument("--merge-homographs", action="store_true",
+                            help="Render same-headword, same-POS entries as one row with numbered senses")
+    arg_parser.add_argument("--compiled-layout", action="store_true",
+                            help="Render entries with the layout compiled into flat functions (identical output)")
+    arg_parser.add_argument("--frequency-scores", action="store_true",
+                            help="Score rows by word form frequency in the lexicon's examples and idioms "
+                                 "and write a term_meta_bank with the frequencies")
+    arg_parser.add_argument("--corpus",
+                            help="Plain-text Swedish corpus counted for --frequency-scores as well (implies it)")
+    arg_parser.add_argument("--audio-dir",
+                            help="Directory of Folkets sound files to bundle into the ZIP; pronunciations "
+                                 "reference their audio file in a data attribute, which Yomitan does not play")
+    arg_parser.add_argument("--audio-workers", type=positive_int, default=16,
+                            help="Threads hashing and reading audio files (default: %(default)s)")
+    arg_parser.add_argument("--link-references", action="store_true",
+                            help="Render synonyms, variants and see-also references that are headwords as "
+                                 "Yomitan search links")
+    arg_parser.add_argument("--link-same-class", action="store_true",
+                            help="Only link synonyms and variants to headwords of the referring entry's word class")
+    arg_parser.add_argument("--variants",
+                            help="Comma-separated dictionary variants to build from one render pass "
+                                 f"({', '.join(VARIANTS)}); variants other than full get their name "
+                                 "appended to the output file name")
+    arg_parser.add_argument("--reverse-output",
+                            help="Also build the English-Swedish dictionary from the same entries into this ZIP")
+    arg_parser.add_argument("--sqlite",
+                            help="Also export the processed lexicon to this SQLite database")
+    arg_parser.add_argument("--validate", action="store_true",
+                            help="Validate every bank of the written dictionaries and fail on invalid rows")
+    args = arg_parser.parse_args(argv)
+    if args.memory_budget and (args.pipeline or args.variants):
+        arg_parser.error("--memory-budget applies to single-variant builds without --pipeline, "
+                         "which already streams banks")
+    if args.variants:
+        args.variants = [name.strip() for name in args.variants.split(",") if name.strip()]
+        unknown = [name for name in args.variants if name not in VARIANTS]
+        if unknown:
+            arg_parser.error(f"unknown variants: {', '.join(unknown)}")
+        if args.pipeline or args.compiled_layout:
+            arg_parser.error("--pipeline and --compiled-layout only apply to single-variant builds")
+    return args
+
+
+def main(argv=None):
     """Main conversion process"""
-    # Default XML file path
-    xml_file = "folkets_sv_en_public.xml"
-    
+    args = parse_args(argv)
+    xml_file = args.xml
+
     if not os.path.exists(xml_file):
         print(f"XML file not found: {xml_file}")
         print("Please ensure the XML file is in the current working directory.")
         return 1
-    
+
     print(f"=== Creating Folkets Lexikon Dictionary ===")
-    
+
+    # Pool sizes from the CPUs and memory this process may use; explicit options win
+    plan = plan_workers(overrides={"parse": args.parse_workers, "render": args.render_workers,
+                                   "serialize": args.serialize_workers, "compress": args.compress_workers})
+    if not args.auto_workers:
+        # Process pools stay opt-in; the serialize and compress threads always follow the plan
+        for stage in ("parse", "render"):
+            if getattr(args, f"{stage}_workers") is None:
+                setattr(plan, stage, 1)
+                plan.reasons[stage] = "default, --auto-workers sizes it"
+    plan.report()
+    args.parse_workers, args.render_workers = plan.parse, plan.render
+
     # Initialize components
     parser = FolketsXMLParser()
-    converter = YomitanConverter()
-    
+    converter = YomitanConverter(render_workers=args.render_workers, inflection_mode=args.inflection_mode,
+                                 pipeline=args.pipeline, previous_zip=args.previous_zip,
+                                 stable_banks=args.stable_banks, merge_homographs=args.merge_homographs,
+                                 compiled_layout=args.compiled_layout, serialize_workers=plan.serialize,
+                                 compress_workers=plan.compress,
+                                 memory_budget=args.memory_budget * 1024 * 1024 if args.memory_budget else None)
+    snapshot = None if args.no_cache else LexiconSnapshot(args.cache_dir)
+
     try:
-        # Parse XML file
-        print(f"Parsing XML file: {xml_file}")
-        entries = parser.parse_xml(xml_file)
-        print(f"Found {len(entries)} entries")
-        
+        # Load processed entries from a snapshot of this exact XML and processing code, if available
+        entry_nodes_map = None
+        if snapshot:
+            source_hash = snapshot.cache_key(xml_file)
+            entry_nodes_map = snapshot.load(source_hash)
+            if entry_nodes_map is not None:
+                print(f"Loaded snapshot: {snapshot.snapshot_path(source_hash)}")
+
+        if entry_nodes_map is None:
+            # Parse XML file
+            print(f"Parsing XML file: {xml_file}")
+            if args.parse_workers > 1:
+                entries = parser.parse_xml_parallel(xml_file, args.parse_workers)
+            else:
+                entries = parser.parse_xml(xml_file)
+            print(f"Found {len(entries)} entries")
+
+            entry_nodes_map = converter.entry_processor.process_entries(entries)
+            if snapshot:
+                print(f"Saved snapshot: {snapshot.save(source_hash, entry_nodes_map)}")
+
+        if args.frequency_scores or args.corpus:
+            converter.frequency_index = FrequencyIndex.build(entry_nodes_map, args.corpus, args.parse_workers)
+
+        if args.audio_dir:
+            converter.use_audio_bundle(AudioBundle.build(entry_nodes_map, args.audio_dir, args.audio_workers))
+
+        if args.link_references or args.link_same_class:
+            converter.use_cross_references(CrossReferenceIndex.build(entry_nodes_map, args.link_same_class))
+
         # Convert to Yomitan format
-        output_name = "Folkets_Lexikon.zip"
-        converter.convert_dictionary(entries, output_name)
-        
+        output_names = [args.output]
+        if args.variants:
+            variant_build = MultiVariantBuild(args.variants, render_workers=args.render_workers,
+                                              previous_zip=args.previous_zip, inflection_mode=args.inflection_mode,
+                                              stable_banks=args.stable_banks, merge_homographs=args.merge_homographs,
+                                              frequency_index=converter.frequency_index,
+                                              audio_bundle=converter.audio_bundle,
+                                              cross_references=converter.cross_references,
+                                              serialize_workers=plan.serialize, compress_workers=plan.compress)
+            output_names = list(variant_build.run(entry_nodes_map, args.output).values())
+        else:
+            converter.convert_entry_nodes(entry_nodes_map, args.output)
+
+        if args.reverse_output:
+            reverse_converter = ReverseDictionaryConverter(stable_banks=args.stable_banks)
+            reverse_converter.convert_reverse(entry_nodes_map, args.reverse_output)
+
+        if args.sqlite:
+            SQLiteExporter().export(entry_nodes_map, args.sqlite)
+
+        if args.validate:
+            validated_names = output_names + ([args.reverse_output] if args.reverse_output else [])
+            invalid = False
+            for output_name in validated_names:
+                issues = validate_dictionary(output_name)
+                if issues:
+                    print(f"❌ Invalid banks in {output_name}:")
+                    print_issues(issues)
+                    invalid = True
+            if invalid:
+                return 1
+
         print(f"\n=== Conversion Summary ===")
-        print(f"Dictionary created: {output_name}")
+        for output_name in output_names:
+            print(f"Dictionary created: {output_name}")
         print("✅ Includes built-in structured styling - ready to import into Yomitan!")
-        
+
         return 0
-        
+
     except Exception as e:
         print(f"❌ Error during conversion: {e}")
         return 1
 
 
 if __name__ == "__main__":
-    sys.exit(main())
\ No newline at end of file
+    sys.exit(main())
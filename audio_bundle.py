@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Audio bundle - resolves entries' sound_file references in a local directory of
+Folkets sound files, deduplicates them by content and stores them in the ZIP
+"""
+
+import collections
+import concurrent.futures
+import hashlib
+import os
+import shutil
+import time
+import zipfile
+from typing import Dict, Iterable, List, Tuple
+
+from entry_processor import EntryNode
+from models import FolketsEntry
+
+# Folkets references .swf players; local copies are usually converted to one of these
+AUDIO_EXTENSIONS = (".mp3", ".ogg", ".opus", ".m4a", ".wav")
+READ_CHUNK_SIZE = 1024 * 1024
+# Fixed member timestamp, so identical audio gives identical archives
+MEMBER_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+
+def _hash_file(path: str) -> Tuple[str, int]:
+    """SHA-256 and size of a file; hashlib releases the GIL, so threads hash concurrently"""
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+            size += len(chunk)
+    return digest.hexdigest(), size
+
+
+def _read_head(path: str) -> bytes:
+    """First chunk of a file; pronunciation clips almost always fit in one"""
+    with open(path, 'rb') as f:
+        return f.read(READ_CHUNK_SIZE)
+
+
+class AudioBundle:
+    """Archive members for the pronunciation audio referenced by entries"""
+
+    def __init__(self, members: Dict[str, str], member_paths: Dict[str, str], workers: int = 16):
+        # sound_file reference -> archive member
+        self.members = members
+        # archive member -> local file, one per distinct content
+        self.member_paths = member_paths
+        self.workers = workers
+
+    @staticmethod
+    def index_directory(audio_dir: str) -> Dict[str, str]:
+        """File name and extensionless name -> path, from one directory scan instead of a stat per reference"""
+        index: Dict[str, str] = {}
+        for root, _, files in os.walk(audio_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                index.setdefault(name, path)
+                stem, extension = os.path.splitext(name)
+                if extension.lower() in AUDIO_EXTENSIONS:
+                    index.setdefault(stem, path)
+        return index
+
+    @classmethod
+    def build(cls, entry_nodes_map: Dict[str, List[EntryNode]], audio_dir: str, workers: int = 16) -> "AudioBundle":
+        """Resolve every referenced sound file and hash the files concurrently"""
+        start = time.perf_counter()
+        references = sorted({node.entry.sound_file for node_list in entry_nodes_map.values()
+                             for node in node_list if node.entry.sound_file})
+        index = cls.index_directory(audio_dir)
+
+        paths: Dict[str, str] = {}
+        missing = 0
+        for reference in references:
+            name = os.path.basename(reference)
+            path = index.get(name) or index.get(os.path.splitext(name)[0])
+            if path:
+                paths[reference] = path
+            else:
+                missing += 1
+
+        distinct_paths = sorted(set(paths.values()))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            hashes = dict(zip(distinct_paths, executor.map(_hash_file, distinct_paths)))
+
+        # Identical recordings under different names share one member
+        members: Dict[str, str] = {}
+        member_paths: Dict[str, str] = {}
+        total_size = 0
+        for reference, path in paths.items():
+            digest, size = hashes[path]
+            extension = os.path.splitext(path)[1].lower()
+            member = f"audio/{digest[:20]}{extension}"
+            members[reference] = member
+            if member not in member_paths:
+                member_paths[member] = path
+                total_size += size
+
+        print(f"Audio bundle: {len(references)} references, {len(paths)} found, {missing} missing, "
+              f"{len(member_paths)} distinct files ({total_size / 1024 / 1024:.1f} MB) "
+              f"hashed in {time.perf_counter() - start:.2f}s with {workers} threads")
+        return cls(members, member_paths, workers)
+
+    def for_entries(self, entries: Iterable[FolketsEntry]) -> "AudioBundle":
+        """The members these entries reference, for a render worker; files are written by the parent"""
+        members = {entry.sound_file: self.members[entry.sound_file]
+                   for entry in entries if entry.sound_file in self.members}
+        return AudioBundle(members, {}, self.workers)
+
+    def write(self, zipf: zipfile.ZipFile) -> None:
+        """Store the audio files uncompressed, reading their first chunks ahead of the single archive writer"""
+        start = time.perf_counter()
+        window = self.workers * 4
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.workers) as executor:
+            pending = collections.deque()
+            for member, path in sorted(self.member_paths.items()):
+                pending.append((member, path, executor.submit(_read_head, path)))
+                if len(pending) >= window:
+                    self._write_member(zipf, *pending.popleft())
+            while pending:
+                self._write_member(zipf, *pending.popleft())
+        print(f"Stored {len(self.member_paths)} audio files in {time.perf_counter() - start:.2f}s")
+
+    @staticmethod
+    def _write_member(zipf: zipfile.ZipFile, member: str, path: str, future: concurrent.futures.Future) -> None:
+        info = zipfile.ZipInfo(member, date_time=MEMBER_DATE_TIME)
+        # Audio is already compressed; deflating it again costs time and saves nothing
+        info.compress_type = zipfile.ZIP_STORED
+        with zipf.open(info, 'w') as dest:
+            head = future.result()
+            dest.write(head)
+            if len(head) == READ_CHUNK_SIZE:
+                # Longer files are streamed, so memory stays bounded by the read-ahead window
+                with open(path, 'rb') as f:
+                    f.seek(len(head))
+                    shutil.copyfileobj(f, dest, READ_CHUNK_SIZE)
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Bank spool - collects rendered term rows and, once they exceed a memory budget,
+writes finished banks to disk as they complete instead of holding every row
+"""
+
+import json
+import os
+import shutil
+import sys
+import zlib
+from typing import List
+
+# Every n-th row is measured to estimate the memory held by rows
+SAMPLE_EVERY = 50
+
+
+def write_bank_file(output_dir: str, bank_number: int, bank_entries: List) -> int:
+    """Write term_bank_<n>.json; returns its size in characters"""
+    # One-shot dumps runs in the C encoder; dump() streams through iterencode
+    data = json.dumps(bank_entries, ensure_ascii=False, separators=(',', ':'))
+    with open(f"{output_dir}/term_bank_{bank_number}.json", 'w', encoding='utf-8') as f:
+        f.write(data)
+    return len(data)
+
+
+def estimate_row_bytes(row) -> int:
+    """Approximate memory of a term row's objects, counting shared objects once"""
+    seen = set()
+    total = 0
+    stack = [row]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.values())
+        elif isinstance(obj, list):
+            stack.extend(obj)
+    return total
+
+
+class BankSpool:
+    """Term rows in bank order, spilled to disk once a memory budget is exceeded
+
+    Sequential banks are streamed into their bank file as rows arrive, since a
+    bank is its rows' JSON joined by commas. Headword-hash banks are only complete
+    after the last row, so their rows are appended to per-bank spill files and
+    numbered when each bank is written.
+    """
+
+    def __init__(self, output_dir: str, memory_budget: int, stable_banks: int = 0,
+                 sequence_stride: int = 0, bank_size: int = 10000):
+        self.output_dir = output_dir
+        self.memory_budget = memory_budget
+        self.stable_banks = stable_banks
+        self.sequence_stride = sequence_stride
+        self.bank_size = bank_size
+        self.spill_dir = os.path.join(output_dir, ".spill")
+        self.spilling = False
+
+        # Rows held in memory: all rows until the budget is exceeded, then one buffer per hash bank
+        self.buffers: List[List] = [[] for _ in range(stable_banks)] if stable_banks else [[]]
+        self.held_rows = 0
+        # Compact metadata of what is on disk
+        self.banks_written = 0
+        self.spilled_rows = 0
+        self.total_rows = 0
+        self.peak_held_rows = 0
+        # Sequential bank being streamed, and its row count
+        self._bank_file = None
+        self._bank_rows = 0
+
+        self.sampled_rows = 0
+        self.sampled_bytes = 0
+
+    @property
+    def held_bytes(self) -> int:
+        """Estimated memory of the held rows"""
+        if not self.sampled_rows:
+            return 0
+        return self.held_rows * self.sampled_bytes // self.sampled_rows
+
+    def add(self, rows: List) -> None:
+        """Add rendered rows in output order"""
+        for index in range(-self.total_rows % SAMPLE_EVERY, len(rows), SAMPLE_EVERY):
+            self.sampled_rows += 1
+            self.sampled_bytes += estimate_row_bytes(rows[index])
+        self.total_rows += len(rows)
+        self.peak_held_rows = max(self.peak_held_rows, self.held_rows + len(rows))
+
+        if self.spilling and not self.stable_banks:
+            self._stream_rows(rows)
+            self.spilled_rows += len(rows)
+            return
+        self.held_rows += len(rows)
+        if self.stable_banks:
+            for row in rows:
+                self.buffers[zlib.crc32(row[0].encode('utf-8')) % self.stable_banks].append(row)
+        else:
+            self.buffers[0].extend(rows)
+
+        if self.held_bytes > self.memory_budget:
+            if not self.spilling:
+                print(f"Rendered rows exceed the memory budget ({self.held_bytes / 1024 ** 2:.0f} MB "
+                      f"estimated > {self.memory_budget / 1024 ** 2:.0f} MB); spilling banks to disk")
+                self.spilling = True
+            self._spill()
+
+    def _spill(self) -> None:
+        if self.stable_banks:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            for bank_index, buffer in enumerate(self.buffers):
+                if buffer:
+                    with open(self._spill_path(bank_index), 'a', encoding='utf-8') as f:
+                        f.writelines(json.dumps(row, ensure_ascii=False, separators=(',', ':')) + "\n"
+                                     for row in buffer)
+                    buffer.clear()
+        else:
+            self._stream_rows(self.buffers[0])
+            self.buffers[0] = []
+        self.spilled_rows += self.held_rows
+        self.held_rows = 0
+
+    def _spill_path(self, bank_index: int) -> str:
+        return os.path.join(self.spill_dir, f"bank_{bank_index}.jsonl")
+
+    def _stream_rows(self, rows: List) -> None:
+        """Append rows to the sequential bank files, closing each bank at bank_size rows"""
+        start = 0
+        while start < len(rows):
+            if self._bank_file is None:
+                self._bank_file = open(f"{self.output_dir}/term_bank_{self.banks_written + 1}.json",
+                                       'w', encoding='utf-8')
+                self._bank_file.write("[")
+            end = min(len(rows), start + self.bank_size - self._bank_rows)
+            # Same text as dumping the whole bank: rows joined by "," between the brackets
+            self._bank_file.write(("," if self._bank_rows else "") + ",".join(
+                json.dumps(row, ensure_ascii=False, separators=(',', ':')) for row in rows[start:end]))
+            self._bank_rows += end - start
+            start = end
+            if self._bank_rows == self.bank_size:
+                self._close_bank()
+
+    def _close_bank(self) -> None:
+        self._bank_file.write("]")
+        self._bank_file.close()
+        self._bank_file = None
+        self._bank_rows = 0
+        self.banks_written += 1
+
+    def finish(self) -> int:
+        """Write the remaining banks; returns the number of term banks"""
+        if self.stable_banks:
+            for bank_index, buffer in enumerate(self.buffers):
+                bank = self._read_spilled(bank_index) + buffer
+                # Sequence numbers restart per bank, as in the in-memory partition
+                for position, row in enumerate(bank):
+                    row[6] = bank_index * self.sequence_stride + position + 1
+                write_bank_file(self.output_dir, bank_index + 1, bank)
+                buffer.clear()
+            self.banks_written = self.stable_banks
+            shutil.rmtree(self.spill_dir, ignore_errors=True)
+        elif self.spilling:
+            if self._bank_file is not None:
+                self._close_bank()
+        else:
+            rows = self.buffers[0]
+            for start in range(0, len(rows), self.bank_size):
+                self.banks_written += 1
+                write_bank_file(self.output_dir, self.banks_written, rows[start:start + self.bank_size])
+            self.buffers[0] = []
+
+        print(f"Bank spool: {self.total_rows} rows in {self.banks_written} banks, "
+              f"{self.spilled_rows if self.spilling else 0} written before the last row, "
+              f"peak {self.peak_held_rows} rows held (~{self.peak_held_rows * self._row_bytes() / 1024 ** 2:.0f} MB)")
+        self.held_rows = 0
+        return self.banks_written
+
+    def _row_bytes(self) -> float:
+        return self.sampled_bytes / self.sampled_rows if self.sampled_rows else 0.0
+
+    def _read_spilled(self, bank_index: int) -> List:
+        path = self._spill_path(bank_index)
+        if not os.path.exists(path):
+            return []
+        with open(path, encoding='utf-8') as f:
+            return [json.loads(line) for line in f]
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Bank validator - checks every bank of a generated dictionary ZIP against the
+exact row and structured-content shapes the converter produces
+"""
+
+import argparse
+import concurrent.futures
+import json
+import re
+import sys
+import time
+import zipfile
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+BANK_PATTERN = re.compile(r"^(term_bank|term_meta_bank|tag_bank)_(\d+)\.json$")
+
+# Per-bank cap, so a systematically broken bank does not flood the report
+MAX_ISSUES_PER_BANK = 50
+
+# Structured content the section builders emit; Yomitan rejects unknown style properties
+CONTENT_TAGS = {"div", "span", "a", "ol", "ul", "li", "br", "ruby", "rt", "rp",
+                "table", "thead", "tbody", "tfoot", "tr", "td", "th", "details", "summary"}
+NODE_KEYS = {"tag", "content", "style", "data", "lang", "title", "href"}
+STYLE_PROPERTIES = {
+    "fontStyle", "fontWeight", "fontSize", "color", "background", "backgroundColor",
+    "textDecorationLine", "textDecorationStyle", "textDecorationColor", "borderColor", "borderStyle",
+    "borderRadius", "borderWidth", "clipPath", "verticalAlign", "textAlign", "textEmphasis", "textShadow",
+    "margin", "marginTop", "marginLeft", "marginRight", "marginBottom",
+    "padding", "paddingTop", "paddingLeft", "paddingRight", "paddingBottom",
+    "wordBreak", "whiteSpace", "cursor", "listStyleType",
+}
+
+
+@dataclass
+class ValidationIssue:
+    """One invalid row"""
+    bank: str
+    row: int
+    headword: str
+    message: str
+
+
+@dataclass
+class BankResult:
+    """Validation result of one bank"""
+    bank: str
+    rows: int = 0
+    issues: List[ValidationIssue] = field(default_factory=list)
+    truncated: int = 0
+    # Cross-bank facts checked once all banks are read
+    pos_tags: Set[str] = field(default_factory=set)
+    tag_names: Set[str] = field(default_factory=set)
+    sequences: List[Tuple[int, int]] = field(default_factory=list)
+    media: Set[str] = field(default_factory=set)
+
+
+def _is_int(value) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def check_content(node, media: Set[str]) -> Optional[str]:
+    """First problem in a structured-content node, or None; the path is only built for a problem"""
+    if isinstance(node, str):
+        return None
+    if isinstance(node, list):
+        for index, child in enumerate(node):
+            if not isinstance(child, str):
+                problem = check_content(child, media)
+                if problem:
+                    return f"[{index}]{problem}"
+        return None
+    if not isinstance(node, dict):
+        return f": {type(node).__name__} is not a string, list or element"
+
+    tag = node.get("tag")
+    if tag not in CONTENT_TAGS:
+        return f": unsupported tag {tag!r}"
+    if not node.keys() <= NODE_KEYS:
+        return f": unsupported keys {sorted(node.keys() - NODE_KEYS)}"
+
+    style = node.get("style")
+    if style is not None:
+        if not isinstance(style, dict):
+            return ".style: not an object"
+        if not style.keys() <= STYLE_PROPERTIES:
+            return f".style: unsupported properties {sorted(style.keys() - STYLE_PROPERTIES)}"
+        for name, value in style.items():
+            if not isinstance(value, (str, int, float)) or isinstance(value, bool):
+                return f".style.{name}: not a string or number"
+
+    data = node.get("data")
+    if data is not None:
+        if not isinstance(data, dict) or not all(isinstance(v, str) for v in data.values()):
+            return ".data: values must be strings"
+        if "audio" in data:
+            media.add(data["audio"])
+
+    if tag == "a" and not isinstance(node.get("href"), str):
+        return ": link without an href"
+
+    content = node.get("content")
+    if content is not None and not isinstance(content, str):
+        problem = check_content(content, media)
+        if problem:
+            return f".content{problem}"
+    return None
+
+
+def check_term_row(row, media: Set[str]) -> Optional[str]:
+    """First problem in a term row, or None"""
+    if not isinstance(row, list) or len(row) != 8:
+        return "row is not an 8-item array"
+    term, reading, definition_tags, rules, score, definitions, sequence, term_tags = row
+    if not isinstance(term, str) or not term:
+        return "empty or non-string term"
+    if not all(isinstance(value, str) for value in (reading, definition_tags, rules, term_tags)):
+        return "reading, tags and rules must be strings"
+    if not _is_int(score):
+        return "score is not an integer"
+    if not _is_int(sequence) or sequence < 1:
+        return "sequence is not a positive integer"
+    if not isinstance(definitions, list) or not definitions:
+        return "no definitions"
+
+    for index, definition in enumerate(definitions):
+        if isinstance(definition, dict):
+            if definition.get("type") != "structured-content" or set(definition) != {"type", "content"}:
+                return f"definitions[{index}]: not a structured-content definition"
+            problem = check_content(definition["content"], media)
+            if problem:
+                return f"definitions[{index}].content{problem}"
+        elif isinstance(definition, list):
+            # Deinflection pointer: [uninflected term, inflection rule chain]
+            if (len(definition) != 2 or not isinstance(definition[0], str) or not definition[0]
+                    or not isinstance(definition[1], list)):
+                return f"definitions[{index}]: malformed deinflection definition"
+        elif not isinstance(definition, str):
+            return f"definitions[{index}]: unsupported definition type"
+    return None
+
+
+def check_term_meta_row(row) -> Optional[str]:
+    if not isinstance(row, list) or len(row) != 3 or not isinstance(row[0], str) or not row[0]:
+        return "row is not a [term, mode, data] array"
+    if row[1] != "freq":
+        return f"unsupported mode {row[1]!r}"
+    value = row[2]
+    if _is_int(value) or isinstance(value, float) or isinstance(value, str):
+        return None
+    if isinstance(value, dict) and ("value" in value or "frequency" in value):
+        return None
+    return "frequency is not a number, string or frequency object"
+
+
+def check_tag_row(row) -> Optional[str]:
+    if (not isinstance(row, list) or len(row) != 5 or not isinstance(row[0], str) or not row[0]
+            or not isinstance(row[1], str) or not isinstance(row[3], str)
+            or not (_is_int(row[2]) or isinstance(row[2], float)) or not _is_int(row[4])):
+        return "row is not a [name, category, order, notes, score] array"
+    return None
+
+
+def validate_bank(zip_path: str, bank_name: str) -> BankResult:
+    """Validate one bank (runs in a worker process)"""
+    result = BankResult(bank_name)
+    with zipfile.ZipFile(zip_path) as zipf, zipf.open(bank_name) as f:
+        try:
+            rows = json.load(f)
+        except ValueError as e:
+            result.issues.append(ValidationIssue(bank_name, -1, "", f"invalid JSON: {e}"))
+            return result
+    if not isinstance(rows, list):
+        result.issues.append(ValidationIssue(bank_name, -1, "", "bank is not an array"))
+        return result
+
+    kind = BANK_PATTERN.match(bank_name).group(1)
+    result.rows = len(rows)
+    for position, row in enumerate(rows):
+        if kind == "term_bank":
+            problem = check_term_row(row, result.media)
+            if not problem:
+                result.pos_tags.update(row[2].split())
+                result.sequences.append((row[6], position))
+        elif kind == "term_meta_bank":
+            problem = check_term_meta_row(row)
+        else:
+            problem = check_tag_row(row)
+            if not problem:
+                result.tag_names.add(row[0])
+
+        if problem:
+            if len(result.issues) < MAX_ISSUES_PER_BANK:
+                headword = row[0] if isinstance(row, list) and row and isinstance(row[0], str) else ""
+                result.issues.append(ValidationIssue(bank_name, position, headword, problem))
+            else:
+                result.truncated += 1
+    return result
+
+
+def validate_dictionary(zip_path: str, workers: int = 4) -> List[ValidationIssue]:
+    """Validate all banks in parallel, then the references between them"""
+    with zipfile.ZipFile(zip_path) as zipf:
+        members = set(zipf.namelist())
+    bank_names = sorted((name for name in members if BANK_PATTERN.match(name)),
+                        key=lambda name: (BANK_PATTERN.match(name).group(1), int(BANK_PATTERN.match(name).group(2))))
+
+    issues: List[ValidationIssue] = []
+    if "index.json" not in members:
+        issues.append(ValidationIssue("index.json", -1, "", "missing index.json"))
+    if not any(name.startswith("term_bank_") for name in bank_names):
+        issues.append(ValidationIssue("", -1, "", "no term banks"))
+
+    # Banks are independent, so each worker decodes and checks a whole bank
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(validate_bank, [zip_path] * len(bank_names), bank_names))
+
+    tag_names = set().union(*(result.tag_names for result in results))
+    first_seen: Dict[int, Tuple[str, int]] = {}
+    for result in results:
+        issues.extend(result.issues)
+        if result.truncated:
+            issues.append(ValidationIssue(result.bank, -1, "", f"{result.truncated} more invalid rows"))
+        for pos_tag in sorted(result.pos_tags - tag_names):
+            issues.append(ValidationIssue(result.bank, -1, "", f"tag {pos_tag!r} is not in any tag bank"))
+        for media in sorted(result.media - members):
+            issues.append(ValidationIssue(result.bank, -1, "", f"referenced file {media!r} is not in the ZIP"))
+        for sequence, position in result.sequences:
+            if sequence in first_seen:
+                first_bank, first_position = first_seen[sequence]
+                issues.append(ValidationIssue(result.bank, position, "",
+                                              f"sequence {sequence} repeats {first_bank} row {first_position}"))
+            else:
+                first_seen[sequence] = (result.bank, position)
+
+    total_rows = sum(result.rows for result in results)
+    print(f"Validated {len(results)} banks, {total_rows} rows: {len(issues)} issue(s)")
+    return issues
+
+
+def print_issues(issues: List[ValidationIssue], limit: int = 100) -> None:
+    for issue in issues[:limit]:
+        location = f"{issue.bank} row {issue.row}" if issue.row >= 0 else issue.bank
+        headword = f" {issue.headword!r}" if issue.headword else ""
+        print(f"  {location}{headword}: {issue.message}")
+    if len(issues) > limit:
+        print(f"  ... {len(issues) - limit} more")
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Validate the banks of Yomitan dictionary ZIPs")
+    arg_parser.add_argument("zips", nargs="+")
+    arg_parser.add_argument("--workers", type=int, default=4, help="Processes validating banks in parallel")
+    args = arg_parser.parse_args(argv)
+
+    failed = False
+    for zip_path in args.zips:
+        start = time.perf_counter()
+        issues = validate_dictionary(zip_path, args.workers)
+        print(f"{zip_path}: {'OK' if not issues else 'INVALID'} ({time.perf_counter() - start:.2f}s)")
+        print_issues(issues)
+        failed = failed or bool(issues)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,14 +8,15 @@ from typing import List, Dict, Optional
 from models import FolketsEntry
 from definition_builder import DefinitionBuilder
 from synonym_builder import SynonymBuilder
+from derived_attributes import DerivedAttributes
 
 
 class BaseFormBuilder:
     """Builds base form section for inflected entries"""
     
-    def __init__(self):
+    def __init__(self, attributes: Optional[DerivedAttributes] = None):
         self.definition_builder = DefinitionBuilder()
-        self.synonym_builder = SynonymBuilder()
+        self.synonym_builder = SynonymBuilder(attributes)
     
     def build_base_form_section(self, base_entry: FolketsEntry) -> List[Dict]:
         """Build base form section with relevant content"""
@@ -45,7 +46,9 @@ class BaseFormBuilder:
             content_items.extend(idiom_items)
         
         # Base form synonyms
-        base_synonyms = self.synonym_builder.build_base_synonyms_section(base_entry.synonyms)
+        base_synonyms = self.synonym_builder.build_base_synonyms_section(
+            base_entry.synonyms, word_class=base_entry.word_class
+        )
         if base_synonyms:
             content_items.append(base_synonyms)
         
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Overlapped build pipeline - render, bank assembly, serialization and compression
+run as concurrent stages connected by bounded queues with backpressure
+"""
+
+import concurrent.futures
+import json
+import os
+import queue
+import threading
+import time
+import zipfile
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional
+
+from entry_processor import EntryNode
+from entry_store import SharedEntryStore
+from zip_reuse import ZipMemberReuse
+
+
+_END = object()
+
+
+class PipelineAborted(Exception):
+    """Raised in a stage when another stage has failed"""
+
+
+@dataclass
+class StageMetrics:
+    """Throughput and stall statistics of one pipeline stage"""
+    name: str
+    items_in: int = 0
+    items_out: int = 0
+    total_time: float = 0.0
+    input_stall: float = 0.0
+    output_stall: float = 0.0
+
+    @property
+    def busy_time(self) -> float:
+        return max(0.0, self.total_time - self.input_stall - self.output_stall)
+
+
+class StageQueue:
+    """Bounded queue recording depth on every put and get"""
+
+    def __init__(self, name: str, maxsize: int, abort: threading.Event):
+        self.name = name
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.abort = abort
+        self.max_depth = 0
+        self.depth_total = 0
+        self.depth_samples = 0
+
+    def put(self, item) -> float:
+        """Put an item, blocking while the queue is full; returns the time blocked"""
+        start = time.perf_counter()
+        while True:
+            if self.abort.is_set():
+                raise PipelineAborted()
+            try:
+                self.queue.put(item, timeout=0.1)
+                break
+            except queue.Full:
+                pass
+        self._sample()
+        return time.perf_counter() - start
+
+    def get(self):
+        """Get an item, blocking while the queue is empty; returns (item, time blocked)"""
+        start = time.perf_counter()
+        while True:
+            if self.abort.is_set():
+                raise PipelineAborted()
+            try:
+                item = self.queue.get(timeout=0.1)
+                break
+            except queue.Empty:
+                pass
+        self._sample()
+        return item, time.perf_counter() - start
+
+    @property
+    def average_depth(self) -> float:
+        return self.depth_total / self.depth_samples if self.depth_samples else 0.0
+
+    def _sample(self) -> None:
+        depth = self.queue.qsize()
+        self.max_depth = max(self.max_depth, depth)
+        self.depth_total += depth
+        self.depth_samples += 1
+
+
+class PipelineStage(threading.Thread):
+    """Thread running a generator function from an input queue to an output queue"""
+
+    def __init__(self, name: str, func: Callable[[Iterator], Iterator],
+                 input_queue: Optional[StageQueue], output_queue: Optional[StageQueue],
+                 abort: threading.Event):
+        super().__init__(name=f"pipeline-{name}", daemon=True)
+        self.func = func
+        self.input_queue = input_queue
+        self.output_queue = output_queue
+        self.abort = abort
+        self.metrics = StageMetrics(name)
+        self.error: Optional[BaseException] = None
+
+    def _inputs(self) -> Iterator:
+        while True:
+            item, stall = self.input_queue.get()
+            self.metrics.input_stall += stall
+            if item is _END:
+                return
+            self.metrics.items_in += 1
+            yield item
+
+    def run(self):
+        start = time.perf_counter()
+        try:
+            inputs = self._inputs() if self.input_queue else iter(())
+            for output in self.func(inputs):
+                self.metrics.items_out += 1
+                if self.output_queue:
+                    self.metrics.output_stall += self.output_queue.put(output)
+            if self.output_queue:
+                self.metrics.output_stall += self.output_queue.put(_END)
+        except PipelineAborted:
+            pass
+        except BaseException as e:
+            self.error = e
+            self.abort.set()
+        finally:
+            self.metrics.total_time = time.perf_counter() - start
+
+
+class BuildPipeline:
+    """Writes the dictionary ZIP directly from entry nodes through overlapped stages"""
+
+    def __init__(self, converter, queue_size: int = 4, chunk_size: int = 1000, bank_size: int = 10000):
+        self.converter = converter
+        self.queue_size = queue_size
+        self.chunk_size = chunk_size
+        self.bank_size = bank_size
+        self.abort = threading.Event()
+        self.stages: List[PipelineStage] = []
+        self.queues: List[StageQueue] = []
+
+    def run(self, entry_nodes_map: Dict[str, List[EntryNode]], zip_path: str) -> None:
+        """Render, assemble, serialize and compress term banks concurrently into zip_path"""
+        all_nodes = [node for node_list in entry_nodes_map.values() for node in node_list]
+        store = None
+        executor = None
+        if self.converter.render_workers > 1:
+            # Local import: yomitan_converter imports this module
+            from yomitan_converter import _init_render_worker
+            store = SharedEntryStore.create(entry_nodes_map)
+            executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.converter.render_workers,
+                initializer=_init_render_worker,
+                initargs=(store.name, self.converter.worker_options())
+            )
+
+        print(f"Pipeline build: {len(all_nodes)} nodes, queue size {self.queue_size}, "
+              f"{self.converter.render_workers} render worker(s)")
+        start = time.perf_counter()
+        temp_zip_path = f"{zip_path}.tmp"
+        self.reuse = ZipMemberReuse(self.converter.previous_zip)
+        try:
+            with zipfile.ZipFile(temp_zip_path, 'w', zipfile.ZIP_DEFLATED, compresslevel=9) as zipf:
+                self._run_stages(all_nodes, executor, zipf)
+                self._write_metadata_files(all_nodes, zipf)
+                if self.converter.audio_bundle:
+                    self.converter.audio_bundle.write(zipf)
+                self.reuse.finish(zipf)
+            os.replace(temp_zip_path, zip_path)
+        except BaseException:
+            # A failed stage leaves a partial ZIP behind
+            if os.path.exists(temp_zip_path):
+                os.remove(temp_zip_path)
+            raise
+        finally:
+            if executor:
+                executor.shutdown(cancel_futures=True)
+            if store:
+                store.close()
+
+        print(f"Pipeline complete in {time.perf_counter() - start:.2f}s")
+        self.report()
+
+    def _run_stages(self, all_nodes: List[EntryNode], executor, zipf: zipfile.ZipFile) -> None:
+        rendered = self._queue("rendered")
+        banks = self._queue("banks")
+        serialized = self._queue("serialized")
+
+        if executor:
+            render = self._render_parallel(executor, all_nodes)
+        else:
+            render = self._render_serial(all_nodes)
+
+        self.stages = [
+            PipelineStage("render", render, None, rendered, self.abort),
+            PipelineStage("assemble", self._assemble_banks, rendered, banks, self.abort),
+            PipelineStage("serialize", self._serialize_banks, banks, serialized, self.abort),
+            PipelineStage("compress", lambda items: self._compress_banks(items, zipf), serialized, None, self.abort),
+        ]
+        self.first_sequence_number = self.final_sequence_number = self.converter.sequence_number
+        for stage in self.stages:
+            stage.start()
+        for stage in self.stages:
+            stage.join()
+        self.converter.sequence_number = self.final_sequence_number
+
+        for stage in self.stages:
+            if stage.error:
+                raise stage.error
+
+    def _queue(self, name: str) -> StageQueue:
+        stage_queue = StageQueue(name, self.queue_size, self.abort)
+        self.queues.append(stage_queue)
+        return stage_queue
+
+    def _render_serial(self, all_nodes: List[EntryNode]) -> Callable[[Iterator], Iterator]:
+        from yomitan_converter import headword_chunk_ranges
+
+        def render(_inputs):
+            for start, end in headword_chunk_ranges(all_nodes, self.chunk_size):
+                yield self.converter.convert_node_run(all_nodes[start:end])
+        return render
+
+    def _render_parallel(self, executor, all_nodes: List[EntryNode]) -> Callable[[Iterator], Iterator]:
+        from yomitan_converter import _render_node_range, headword_chunk_ranges
+
+        def render(_inputs):
+            # Keep a bounded window of chunks in flight and yield them in submission order
+            pending = []
+            for start, end in headword_chunk_ranges(all_nodes, self.chunk_size):
+                context = self.converter.render_context(all_nodes[start:end])
+                pending.append(executor.submit(_render_node_range, start, end, context))
+                if len(pending) > self.queue_size + self.converter.render_workers:
+                    yield self._merge_worker_result(pending.pop(0).result())
+            for future in pending:
+                yield self._merge_worker_result(future.result())
+        return render
+
+    def _merge_worker_result(self, result) -> List:
+        term_entries, pos_tags, unknown_classes = result
+        self.converter.pos_tags.update(pos_tags)
+        self.converter.pos_mapper.unknown_classes.update(unknown_classes)
+        return term_entries
+
+    def _assemble_banks(self, chunks: Iterator[List]) -> Iterator:
+        """Assign global sequence numbers in node order and cut fixed-size banks"""
+        if self.converter.stable_banks:
+            # Headword-hash banks need every row before any bank is complete
+            all_term_entries = [term_entry for chunk in chunks for term_entry in chunk]
+            for bank_number, bank in enumerate(self.converter.partition_banks(all_term_entries), 1):
+                yield bank_number, bank
+            return
+        
+        # The serial render stage also advances converter.sequence_number, so count locally
+        sequence_number = self.first_sequence_number
+        bank = []
+        bank_number = 1
+        for chunk in chunks:
+            for term_entry in chunk:
+                term_entry[6] = sequence_number
+                sequence_number += 1
+                bank.append(term_entry)
+                if len(bank) == self.bank_size:
+                    yield bank_number, bank
+                    bank_number += 1
+                    bank = []
+        if bank:
+            yield bank_number, bank
+        self.final_sequence_number = sequence_number
+
+    def _serialize_banks(self, banks: Iterator) -> Iterator:
+        for bank_number, bank in banks:
+            yield bank_number, json.dumps(bank, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    def _compress_banks(self, serialized: Iterator, zipf: zipfile.ZipFile) -> Iterator:
+        for bank_number, data in serialized:
+            reused = self.reuse.write(zipf, f"term_bank_{bank_number}.json", data)
+            print(f"{'Copied' if reused else 'Compressed'} term_bank_{bank_number}.json ({len(data)} bytes)")
+            yield bank_number
+
+    def _write_metadata_files(self, all_nodes: List[EntryNode], zipf: zipfile.ZipFile) -> None:
+        """Tag bank, term meta banks, index and inflection index need the complete render pass"""
+        converter = self.converter
+        self.reuse.write(zipf, "tag_bank_1.json", json.dumps(
+            converter.generate_tag_bank(), ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+        for bank_number, bank in enumerate(converter.generate_term_meta_banks(), 1):
+            self.reuse.write(zipf, f"term_meta_bank_{bank_number}.json", json.dumps(
+                bank, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+        self.reuse.write(zipf, "index.json", json.dumps(
+            converter.generate_index_json(), ensure_ascii=False, indent=2).encode('utf-8'))
+        if converter.inflection_mode == "compact":
+            self.reuse.write(zipf, "inflection_index.json", json.dumps(
+                converter.generate_inflection_index(all_nodes), ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+
+    def report(self) -> None:
+        """Print per-stage busy and stall times and queue depths"""
+        print("\n=== Pipeline Stage Metrics ===")
+        print(f"{'stage':<10} {'in':>6} {'out':>6} {'busy s':>8} {'in-stall s':>11} {'out-stall s':>12}")
+        for stage in self.stages:
+            m = stage.metrics
+            print(f"{m.name:<10} {m.items_in:>6} {m.items_out:>6} {m.busy_time:>8.2f} "
+                  f"{m.input_stall:>11.2f} {m.output_stall:>12.2f}")
+        print(f"{'queue':<10} {'max depth':>10} {'avg depth':>10}")
+        for stage_queue in self.queues:
+            print(f"{stage_queue.name:<10} {stage_queue.max_depth:>10} {stage_queue.average_depth:>10.2f}")
+
+        # The stage with the most busy time and least input stall bounds throughput;
+        # a stage that mostly waits for input is held back by the stages before it
+        bottleneck = max(self.stages, key=lambda stage: stage.metrics.busy_time - stage.metrics.input_stall)
+        print(f"Bottleneck stage: {bottleneck.metrics.name}")
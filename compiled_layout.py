@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Compiled entry layout - the structured-content layout described as data and
+compiled once into flat render functions that match the section builders' output
+"""
+
+import sys
+from typing import Callable, Dict, List, Optional, Tuple
+
+from content_builder import StructuredContentBuilder
+from derived_attributes import DerivedAttributes
+from pos_mapper import POSMapper
+from text_cleaner import TextCleaner
+
+
+# Styles of the section builders; rendered items share these dicts, which are never mutated
+STYLES = {
+    "HEADER_STYLE": {"fontSize": "1.0em", "marginBottom": "0.5em"},
+    "HEADWORD_STYLE": {"fontWeight": "bold", "fontSize": "1.3em"},
+    "POS_STYLE": {"color": "DarkBlue", "fontSize": "1.0em", "fontWeight": "bold"},
+    "PRONUNCIATION_STYLE": {"fontSize": "1.0em", "color": "#2563eb", "fontWeight": "bold", "marginBottom": "0.3em"},
+    "USAGE_STYLE": {"fontSize": "0.9em", "color": "#64748b", "fontStyle": "italic", "marginBottom": "0.2em"},
+    "DEFINITION_STYLE": {"fontSize": "1.0em", "marginBottom": "0.2em", "fontWeight": "bold"},
+    "EXAMPLE_STYLE": {"color": "darkgreen", "fontSize": "0.9em", "marginBottom": "0.2em"},
+    "IDIOM_HEADER_STYLE": {"color": "darkorange", "fontSize": "0.9em", "fontWeight": "bold",
+                           "marginTop": "0.3em", "marginBottom": "0.1em"},
+    "IDIOM_STYLE": {"color": "darkorange", "fontSize": "0.9em", "marginBottom": "0.2em"},
+    "SYNONYM_STYLE": {"color": "#22c55e", "fontSize": "0.9em", "marginTop": "0.5em", "marginBottom": "0.5em"},
+    "BASE_SEPARATOR_STYLE": {"fontSize": "1.0em", "color": "#059669", "fontWeight": "bold", "marginTop": "1.0em",
+                             "marginBottom": "0.5em", "textAlign": "center"},
+    "BASE_SYNONYM_STYLE": {"color": "#16a34a", "fontSize": "0.85em", "marginTop": "0.3em"},
+}
+
+# Code for each section, appending items to `out`. {entry} is the entry being rendered,
+# {n} a suffix that keeps the loop variables of repeated sections apart.
+SECTION_CODE = {
+    "header": """
+pos_tag = attributes.pos({entry})
+out.append({{"tag": "div", "content": [
+    {{"tag": "span", "content": [{entry}.headword], "style": HEADWORD_STYLE}},
+    {{"tag": "span", "content": [f" ⟨{{pos_tag}}⟩"], "style": POS_STYLE}}
+], "style": HEADER_STYLE}})
+""",
+    "pronunciation": """
+if {entry}.phonetic:
+    audio{n} = attributes.audio({entry})
+    if audio{n}:
+        out.append({{"tag": "div", "content": [f"[{{attributes.phonetic({entry})}}]"],
+                    "style": PRONUNCIATION_STYLE, "data": {{"audio": audio{n}}}}})
+    else:
+        out.append({{"tag": "div", "content": [f"[{{attributes.phonetic({entry})}}]"],
+                    "style": PRONUNCIATION_STYLE}})
+""",
+    "usage": """
+for part{n} in {entry}.usage + {entry}.usage_annotations:
+    if part{n}:
+        out.append({{"tag": "div", "content": [clean(part{n})], "style": USAGE_STYLE}})
+if {entry}.grammar:
+    out.append({{"tag": "div", "content": [f"Grammar: {{clean({entry}.grammar)}}"], "style": USAGE_STYLE}})
+if {entry}.inflections:
+    out.append({{"tag": "div", "content": [f"Paradigm: {{', '.join({entry}.inflections)}}"], "style": USAGE_STYLE}})
+if {entry}.variants:
+    out.append({{"tag": "div", "content": attributes.reference_content("Also: ", [
+        (v.value, f" ({{v.alt}})" if v.alt else "") for v in {entry}.variants
+    ], {entry}.word_class), "style": USAGE_STYLE}})
+see_also{n} = attributes.see_also_targets({entry})
+if see_also{n}:
+    out.append({{"tag": "div", "content": attributes.reference_content(
+        "See also: ", [(value, "") for value in see_also{n}], ""), "style": USAGE_STYLE}})
+""",
+    "definitions": """
+if {entry}.translations:
+    out.append({{"tag": "div", "content": [definition_text(0, attributes.translation_text({entry}), {entry}.definitions)],
+                "style": DEFINITION_STYLE}})
+    if {entry}.examples:
+        seen{n} = set()
+        for example{n}, text{n} in zip({entry}.examples, attributes.example_keys({entry})):
+            if text{n} and text{n} not in seen{n}:
+                seen{n}.add(text{n})
+                out.append({{"tag": "div", "content": [example_text(text{n}, example{n}.english)],
+                            "style": EXAMPLE_STYLE}})
+""",
+    "base_definitions": """
+for index{n}, translation{n} in enumerate({entry}.translations[:3]):
+    out.append({{"tag": "div", "content": [definition_text(index{n}, clean(translation{n}), {entry}.definitions)],
+                "style": DEFINITION_STYLE}})
+for example{n} in {entry}.examples[:3]:
+    out.append({{"tag": "div", "content": [example_text(clean(example{n}.swedish), example{n}.english)],
+                "style": EXAMPLE_STYLE}})
+""",
+    "base_separator": """
+out.append({{"tag": "div", "content": [f"━━━ Base form: \\"{{{entry}.headword}}\\" ━━━"],
+            "style": BASE_SEPARATOR_STYLE}})
+""",
+    "idioms": """
+if {entry}.idioms:
+    out.append(IDIOM_HEADER)
+    seen{n} = set()
+    for idiom{n} in {entry}.idioms:
+        if len(seen{n}) >= 5:
+            break
+        text{n} = clean(idiom{n}.swedish)
+        if text{n} and text{n} not in seen{n}:
+            seen{n}.add(text{n})
+            out.append({{"tag": "div", "content": [example_text(text{n}, idiom{n}.english)], "style": IDIOM_STYLE}})
+""",
+    "synonyms": """
+if {entry}.synonyms:
+    out.append({{"tag": "div", "content": attributes.reference_content("Synonyms: ", [
+        (s.value, f" ({{s.level}})" if s.level else "") for s in {entry}.synonyms
+    ], {entry}.word_class), "style": SYNONYM_STYLE}})
+""",
+    "base_form": """
+out.extend(base_section({entry}))
+""",
+    "base_synonyms": """
+if {entry}.synonyms:
+    out.append({{"tag": "div", "content": attributes.reference_content("Base synonyms: ", [
+        (s.value, f" ({{s.level}})" if s.level else "") for s in {entry}.synonyms[:5]
+    ], {entry}.word_class), "style": BASE_SYNONYM_STYLE}})
+""",
+}
+
+# Layouts: (section, entry expression, guard). Order and guards follow StructuredContentBuilder.
+BASE_FORM_LAYOUT: List[Tuple[str, str, Optional[str]]] = [
+    ("base_separator", "entry", None),
+    ("base_definitions", "entry", None),
+    ("idioms", "entry", None),
+    ("base_synonyms", "entry", None),
+]
+SENSE_LAYOUT: List[Tuple[str, str, Optional[str]]] = [
+    ("usage", "entry", None),
+    ("definitions", "entry", None),
+    ("base_form", "node.base_form.entry", "node.base_form is not None"),
+    ("idioms", "entry", "entry.translations"),
+    ("synonyms", "entry", "entry.translations"),
+]
+ENTRY_LAYOUT = [("header", "entry", None), ("pronunciation", "entry", None)] + SENSE_LAYOUT
+
+# The base form section depends only on the base entry, which many inflections share
+BASE_SECTION_CACHE_SIZE = 8192
+
+
+def _indent(code: str, spaces: int) -> str:
+    return "".join(" " * spaces + line + "\n" if line.strip() else "\n" for line in code.strip("\n").split("\n"))
+
+
+def generate_source(name: str, layout: List[Tuple[str, str, Optional[str]]], kind: str) -> str:
+    """Python source of a flat render function for a layout
+
+    kind "entry" renders a node's whole content, "sense" a node's items below
+    the header and pronunciation, and "base" the base form items of an entry.
+    """
+    whole_entry = kind == "entry"
+    if kind == "base":
+        lines = [f"def {name}(entry):"]
+    else:
+        lines = [f"def {name}(node):", "    entry = node.entry"]
+    if whole_entry:
+        lines.append("    if not entry.translations and node.base_form is None:")
+        lines.append("        return None")
+    lines.append("    out = []")
+    for n, (section, entry_expression, guard) in enumerate(layout):
+        code = SECTION_CODE[section].format(entry=entry_expression, n=n)
+        if guard:
+            lines.append(f"    if {guard}:")
+            lines.append(_indent(code, 8).rstrip("\n"))
+        else:
+            lines.append(_indent(code, 4).rstrip("\n"))
+    lines.append('    return {"tag": "div", "content": out}' if whole_entry else "    return out")
+    return "\n".join(lines) + "\n"
+
+
+def compile_layout(pos_mapper: POSMapper, attributes: DerivedAttributes) -> Dict[str, Callable]:
+    """Compile the entry and sense layouts into render functions reading the derived attributes"""
+    clean_cached = TextCleaner._clean_cached
+
+    def clean(text: str) -> str:
+        return clean_cached(text) if text else ""
+
+    def definition_text(index: int, cleaned_translation: str, definitions: List) -> str:
+        if index < len(definitions) and definitions[index] and definitions[index].swedish:
+            definition = definitions[index]
+            if definition.english:
+                return f"{clean(definition.swedish)} / {clean(definition.english)} → {cleaned_translation}"
+            return f"{clean(definition.swedish)} → {cleaned_translation}"
+        return f" → {cleaned_translation}"
+
+    def example_text(swedish_text: str, english: str) -> str:
+        if english:
+            return f"「{swedish_text}」 {clean(english)}"
+        return f"「{swedish_text}」"
+
+    base_sections: Dict[int, Tuple] = {}
+
+    def base_section(base_entry) -> List[Dict]:
+        # The entry is kept with its items so its id cannot be reused while cached
+        cached = base_sections.get(id(base_entry))
+        if cached is None:
+            if len(base_sections) >= BASE_SECTION_CACHE_SIZE:
+                base_sections.clear()
+            cached = base_sections[id(base_entry)] = (base_entry, namespace["render_base"](base_entry))
+        return cached[1]
+
+    namespace = dict(STYLES)
+    namespace.update({
+        "attributes": attributes,
+        "clean": clean,
+        "definition_text": definition_text,
+        "example_text": example_text,
+        "base_section": base_section,
+        "IDIOM_HEADER": {"tag": "div", "content": ["Idioms:"], "style": STYLES["IDIOM_HEADER_STYLE"]},
+    })
+    sources = {
+        "render_base": generate_source("render_base", BASE_FORM_LAYOUT, "base"),
+        "render_entry": generate_source("render_entry", ENTRY_LAYOUT, "entry"),
+        "render_sense": generate_source("render_sense", SENSE_LAYOUT, "sense"),
+    }
+    for name, source in sources.items():
+        exec(compile(source, f"<compiled layout {name}>", "exec"), namespace)
+    return {name: namespace[name] for name in sources}
+
+
+class CompiledContentBuilder(StructuredContentBuilder):
+    """StructuredContentBuilder whose entry rendering runs the compiled layout"""
+
+    def __init__(self, pos_mapper: POSMapper, attributes: Optional[DerivedAttributes] = None):
+        super().__init__(pos_mapper, attributes)
+        functions = compile_layout(pos_mapper, self.attributes)
+        self.build_structured_content = functions["render_entry"]
+        self._build_sense_items = functions["render_sense"]
+
+
+def main(argv=None):
+    """Print the generated render functions"""
+    print(generate_source("render_base", BASE_FORM_LAYOUT, "base"))
+    print(generate_source("render_entry", ENTRY_LAYOUT, "entry"))
+    print(generate_source("render_sense", SENSE_LAYOUT, "sense"))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,7 +4,7 @@ Main structured content builder for Yomitan dictionary entries
 Orchestrates all section builders
 """
 
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from models import FolketsEntry
 from pos_mapper import POSMapper
 from header_builder import HeaderBuilder
@@ -13,18 +13,21 @@ from definition_builder import DefinitionBuilder
 from synonym_builder import SynonymBuilder
 from base_form_builder import BaseFormBuilder
 from entry_processor import EntryNode
+from derived_attributes import DerivedAttributes
 
 
 class StructuredContentBuilder:
     """Main builder that orchestrates all section builders"""
     
-    def __init__(self, pos_mapper: POSMapper):
+    def __init__(self, pos_mapper: POSMapper, attributes: Optional[DerivedAttributes] = None):
         self.pos_mapper = pos_mapper
-        self.header_builder = HeaderBuilder(pos_mapper)
-        self.usage_builder = UsageBuilder()
-        self.definition_builder = DefinitionBuilder()
-        self.synonym_builder = SynonymBuilder()
-        self.base_form_builder = BaseFormBuilder()
+        # Shared with the converter, which derives them per render batch
+        self.attributes = attributes or DerivedAttributes(pos_mapper)
+        self.header_builder = HeaderBuilder(pos_mapper, self.attributes)
+        self.usage_builder = UsageBuilder(self.attributes)
+        self.definition_builder = DefinitionBuilder(self.attributes)
+        self.synonym_builder = SynonymBuilder(self.attributes)
+        self.base_form_builder = BaseFormBuilder(self.attributes)
     
     def build_structured_content(self, node: EntryNode) -> Optional[Dict]:
         """Build complete structured content for an entry node"""
@@ -46,29 +49,78 @@ class StructuredContentBuilder:
         pronunciation_items = self.usage_builder.build_pronunciation_section(entry)
         content["content"].extend(pronunciation_items)
         
+        # 4-8. Usage, definitions, base form, idioms and synonyms
+        content["content"].extend(self._build_sense_items(node))
+        
+        return content
+    
+    def build_homograph_content(self, nodes: List[EntryNode]) -> Optional[Dict]:
+        """Build one entry for same-headword, same-POS nodes, with a numbered sense per node"""
+        nodes = [node for node in nodes if node.entry.translations or node.base_form]
+        if not nodes:
+            return None
+        if len(nodes) == 1:
+            return self.build_structured_content(nodes[0])
+        
+        # Header and pronunciation are shared by all senses
+        content = {"tag": "div", "content": [self.header_builder.build_header(nodes[0].entry)]}
+        seen_pronunciations = set()
+        for node in nodes:
+            for item in self.usage_builder.build_pronunciation_section(node.entry):
+                if item["content"][0] not in seen_pronunciations:
+                    seen_pronunciations.add(item["content"][0])
+                    content["content"].append(item)
+        
+        for number, node in enumerate(nodes, 1):
+            content["content"].append({
+                "tag": "div",
+                "content": [self._create_sense_number(number)] + self._build_sense_items(node),
+                "style": {"marginTop": "0.5em"}
+            })
+        
+        return content
+    
+    def _build_sense_items(self, node: EntryNode) -> List[Dict]:
+        """Everything below the header and pronunciation for one node"""
+        entry = node.entry
+        items = []
+        
         # 4. Usage - phonetic, usage, grammar, etc.
         usage_items = self.usage_builder.build_usage_section(entry)
-        content["content"].extend(usage_items)
+        items.extend(usage_items)
         
         # 5. Own definitions section
         if entry.translations:
             definition_items = self.definition_builder.build_definitions_section(entry)
-            content["content"].extend(definition_items)
+            items.extend(definition_items)
         
         # 6. Base form definitions - if applicable
         if node.base_form:
             base_form_items = self.base_form_builder.build_base_form_section(node.base_form.entry)
-            content["content"].extend(base_form_items)
+            items.extend(base_form_items)
         
         # 7. Idioms
         if entry.translations:  # Only show idioms if we have translations
             idiom_items = self.definition_builder.build_idioms_section(entry)
-            content["content"].extend(idiom_items)
+            items.extend(idiom_items)
         
         # 8. Related vocabulary - synonyms
         if entry.translations:  # Only show synonyms if we have translations
             synonyms = self.synonym_builder.build_synonyms_section(entry)
             if synonyms:
-                content["content"].append(synonyms)
+                items.append(synonyms)
         
-        return content
+        return items
+    
+    def _create_sense_number(self, number: int) -> Dict:
+        """Create the label that opens a numbered sense"""
+        return {
+            "tag": "div",
+            "content": [f"{number}."],
+            "style": {
+                "fontSize": "1.0em",
+                "color": "DarkBlue",
+                "fontWeight": "bold",
+                "marginBottom": "0.2em"
+            }
+        }
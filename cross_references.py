@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Cross references - a global headword index that resolves synonyms, variants and
+see-also references once, so they render as Yomitan search links
+"""
+
+import re
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import quote
+
+from entry_processor import EntryNode
+from models import FolketsEntry
+
+# SALDO see-also references name a sense ("hund..1"); the headword is the part before ".."
+SALDO_SENSE_SUFFIX = re.compile(r"\.\.\w*$")
+# See-also types whose values are words rather than URLs or file names
+WORD_SEE_ALSO_TYPES = {"", "saldo", "compound"}
+
+
+def search_link(headword: str, text: str) -> Dict:
+    """Structured-content link that opens a search for the headword in Yomitan"""
+    return {"tag": "a", "href": f"?query={quote(headword, safe='')}&wildcards=off", "content": text}
+
+
+class CrossReferenceIndex:
+    """Resolved reference targets of every entry, built in one pass over the lexicon"""
+
+    def __init__(self, targets: Dict[Tuple[str, str], str], match_word_class: bool = False):
+        # (reference value, referring entry's word class or "") -> headword the link searches for
+        self.targets = targets
+        self.match_word_class = match_word_class
+
+    @staticmethod
+    def headword_classes(entry_nodes_map: Dict[str, List[EntryNode]]) -> Dict[str, Set[str]]:
+        """Headword -> word classes of its nodes"""
+        return {headword: {node.entry.word_class for node in node_list}
+                for headword, node_list in entry_nodes_map.items()}
+
+    @staticmethod
+    def see_also_headword(see_also) -> str:
+        if see_also.type not in WORD_SEE_ALSO_TYPES:
+            return ""
+        return SALDO_SENSE_SUFFIX.sub("", see_also.value).strip()
+
+    @classmethod
+    def build(cls, entry_nodes_map: Dict[str, List[EntryNode]],
+              match_word_class: bool = False) -> "CrossReferenceIndex":
+        """Index the headwords, then resolve each distinct reference of all entries once"""
+        start = time.perf_counter()
+        classes = cls.headword_classes(entry_nodes_map)
+
+        # Collect distinct references first; most recur across senses and inflection nodes
+        class_references: Set[Tuple[str, str]] = set()
+        see_also_references: Set[str] = set()
+        seen_entries: Set[int] = set()
+        for node_list in entry_nodes_map.values():
+            for node in node_list:
+                entry = node.entry
+                if id(entry) in seen_entries:
+                    continue
+                seen_entries.add(id(entry))
+                word_class = entry.word_class if match_word_class else ""
+                for reference in entry.synonyms:
+                    class_references.add((reference.value, word_class))
+                for reference in entry.variants:
+                    class_references.add((reference.value, word_class))
+                for reference in entry.see_also:
+                    see_also_references.add(cls.see_also_headword(reference))
+
+        targets: Dict[Tuple[str, str], str] = {}
+        for value, word_class in class_references:
+            value_classes = classes.get(value)
+            if value_classes and (not word_class or word_class in value_classes):
+                targets[(value, word_class)] = value
+        # See-also references link across word classes
+        for headword in see_also_references:
+            if headword in classes:
+                targets[(headword, "")] = headword
+
+        total = len(class_references) + len(see_also_references)
+        print(f"Cross references: {len(classes)} headwords, {total} distinct references, "
+              f"{len(targets)} resolved in {time.perf_counter() - start:.2f}s")
+        return cls(targets, match_word_class)
+
+    def for_entries(self, entries: Iterable[FolketsEntry]) -> "CrossReferenceIndex":
+        """The resolved targets these entries' references look up, for a render worker"""
+        targets: Dict[Tuple[str, str], str] = {}
+        for entry in entries:
+            word_class = entry.word_class if self.match_word_class else ""
+            keys = [(reference.value, word_class) for reference in entry.synonyms + entry.variants]
+            keys += [(self.see_also_headword(reference), "") for reference in entry.see_also]
+            for key in keys:
+                if key in self.targets:
+                    targets[key] = self.targets[key]
+        return CrossReferenceIndex(targets, self.match_word_class)
+
+    def target(self, value: str, word_class: str = "") -> Optional[str]:
+        """Headword a synonym or variant of an entry of this word class links to"""
+        return self.targets.get((value, word_class if self.match_word_class else ""))
+
+    def see_also_targets(self, entry: FolketsEntry) -> List[str]:
+        """Distinct resolved see-also headwords of an entry, in source order"""
+        headwords = []
+        for reference in entry.see_also:
+            headword = self.targets.get((self.see_also_headword(reference), ""))
+            if headword and headword not in headwords and headword != entry.headword:
+                headwords.append(headword)
+        return headwords
+
+    def reference_content(self, prefix: str, references: List[Tuple[str, str]], word_class: str) -> List:
+        """Content of a "prefix: a (x), b" line whose resolvable values are links"""
+        content: List = [prefix]
+        for index, (value, suffix) in enumerate(references):
+            separator = ", " if index else ""
+            target = self.target(value, word_class)
+            if target:
+                content[-1] += separator
+                content.append(search_link(target, value))
+                content.append(suffix)
+            else:
+                content[-1] += separator + value + suffix
+        # Drop the empty strings left after links
+        return [item for item in content if item != ""]
@@ -4,16 +4,19 @@ Definition section builder for Yomitan dictionary entries
 Handles: translations with their examples (already associated in XML)
 """
 
-from typing import List, Dict
+from typing import List, Dict, Optional
 from models import FolketsEntry
 from text_cleaner import TextCleaner
+from derived_attributes import DerivedAttributes
+from pos_mapper import POSMapper
 
 
 class DefinitionBuilder:
     """Builds definition section with translations and their examples"""
     
-    def __init__(self):
+    def __init__(self, attributes: Optional[DerivedAttributes] = None):
         self.text_cleaner = TextCleaner()
+        self.attributes = attributes or DerivedAttributes(POSMapper())
     
     def build_definitions_section(self, entry: FolketsEntry) -> List[Dict]:
         """Build definitions section - each entry has one translation with its examples"""
@@ -22,27 +25,18 @@ class DefinitionBuilder:
         if not entry.translations:
             return content_items
         
-        # Handle multiple translations - combine them into one definition
-        if len(entry.translations) > 1:
-            # Multiple translations - create one combined definition
-            combined_translation = ", ".join(entry.translations)
-            content_items.append(self._create_definition_item(
-                0, combined_translation, entry.definitions
-            ))
-        else:
-            # Single translation
-            content_items.append(self._create_definition_item(
-                0, entry.translations[0], entry.definitions
-            ))
+        # Multiple translations are combined into one definition, already cleaned
+        content_items.append(self._create_definition_item(
+            0, entry.translations[0], entry.definitions, self.attributes.translation_text(entry)
+        ))
         
         # Examples for this entry (directly associated) - deduplicated
         if entry.examples:
             seen_examples = set()
-            for example in entry.examples:
-                example_text = self.text_cleaner.clean_text(example.swedish)
+            for example, example_text in zip(entry.examples, self.attributes.example_keys(entry)):
                 if example_text and example_text not in seen_examples:
                     seen_examples.add(example_text)
-                    content_items.append(self._create_example_item(example))
+                    content_items.append(self._create_example_item(example, example_text))
         
         return content_items
     
@@ -53,7 +47,8 @@ class DefinitionBuilder:
         
         return self._create_idioms_section(entry.idioms)
     
-    def _create_definition_item(self, index: int, translation: str, definitions: List) -> Dict:
+    def _create_definition_item(self, index: int, translation: str, definitions: List,
+                                cleaned_translation: Optional[str] = None) -> Dict:
         """Create a single definition item with bullet point"""
         definition_parts = []
         
@@ -68,7 +63,9 @@ class DefinitionBuilder:
                 )
         
         # Main English translation
-        definition_parts.append(f" → {self.text_cleaner.clean_text(translation)}")
+        if cleaned_translation is None:
+            cleaned_translation = self.text_cleaner.clean_text(translation)
+        definition_parts.append(f" → {cleaned_translation}")
         
         # Combine all definition parts
         full_definition = "".join(definition_parts)
@@ -83,9 +80,11 @@ class DefinitionBuilder:
             }
         }
     
-    def _create_example_item(self, example) -> Dict:
+    def _create_example_item(self, example, cleaned_swedish: Optional[str] = None) -> Dict:
         """Create a single example item (indented under definition)"""
-        content_parts = [f"「{self.text_cleaner.clean_text(example.swedish)}」"]
+        if cleaned_swedish is None:
+            cleaned_swedish = self.text_cleaner.clean_text(example.swedish)
+        content_parts = [f"「{cleaned_swedish}」"]
         
         if example.english:
             content_parts.append(f" {self.text_cleaner.clean_text(example.english)}")
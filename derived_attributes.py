@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Derived entry attributes - POS tags, normalized phonetics, cleaned translations
+and example keys computed once per render batch and read by the builders
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+from cross_references import CrossReferenceIndex
+from models import FolketsEntry
+from phonetic_normalizer import PhoneticNormalizer
+from pos_mapper import POSMapper
+from text_cleaner import TextCleaner
+
+
+class DerivedAttributes:
+    """Columnar per-entry attributes of the current render batch"""
+
+    def __init__(self, pos_mapper: POSMapper):
+        self.pos_mapper = pos_mapper
+        self.text_cleaner = TextCleaner()
+        self.phonetic_normalizer = PhoneticNormalizer()
+        # Raw value -> derived value, kept across batches so repeated values are derived once
+        self._pos_by_class: Dict[str, str] = {}
+        self._phonetic_by_raw: Dict[str, str] = {}
+        # sound_file reference -> bundled audio member, set when audio is bundled
+        self.audio_members: Dict[str, str] = {}
+        # Resolved synonym, variant and see-also targets, set when references are linked
+        self.cross_references: Optional[CrossReferenceIndex] = None
+        # Current batch: entry id -> row; the entries are held so their ids stay unique
+        self._rows: Dict[int, int] = {}
+        self._entries: List[FolketsEntry] = []
+        self.pos_column: List[str] = []
+        self.phonetic_column: List[str] = []
+        self.translation_column: List[str] = []
+        self.example_key_column: List[List[str]] = []
+
+    def derive(self, nodes: List) -> None:
+        """Replace the batch with these nodes' entries"""
+        # Base form sections render from the base entry's raw fields, so only the nodes' own entries are derived
+        self._rows = {}
+        self._entries = []
+        for node in nodes:
+            self._add(node.entry)
+
+        entries = self._entries
+        self.pos_column = [self._derive_pos(entry.word_class) for entry in entries]
+        self.phonetic_column = [self._derive_phonetic(entry.phonetic) for entry in entries]
+        clean_text = self.text_cleaner.clean_text
+        self.translation_column = [clean_text(", ".join(entry.translations)) for entry in entries]
+        self.example_key_column = [[clean_text(example.swedish) for example in entry.examples] for entry in entries]
+
+    def _add(self, entry: FolketsEntry) -> None:
+        if id(entry) not in self._rows:
+            self._rows[id(entry)] = len(self._entries)
+            self._entries.append(entry)
+
+    def _row(self, entry: FolketsEntry) -> Optional[int]:
+        return self._rows.get(id(entry))
+
+    def _derive_pos(self, word_class: str) -> str:
+        pos_tag = self._pos_by_class.get(word_class)
+        if pos_tag is None:
+            # detect_pos also records unknown classes, so call it once per distinct class
+            pos_tag = self._pos_by_class[word_class] = self.pos_mapper.detect_pos(FolketsEntry("", word_class))
+        return pos_tag
+
+    def _derive_phonetic(self, phonetic: Optional[str]) -> str:
+        if not phonetic:
+            return ""
+        normalized = self._phonetic_by_raw.get(phonetic)
+        if normalized is None:
+            normalized = self._phonetic_by_raw[phonetic] = self.phonetic_normalizer.normalize(phonetic)
+        return normalized
+
+    # Readers fall back to deriving on the spot for entries outside the batch
+
+    def pos(self, entry: FolketsEntry) -> str:
+        row = self._row(entry)
+        return self.pos_column[row] if row is not None else self._derive_pos(entry.word_class)
+
+    def phonetic(self, entry: FolketsEntry) -> str:
+        row = self._row(entry)
+        return self.phonetic_column[row] if row is not None else self._derive_phonetic(entry.phonetic)
+
+    def audio(self, entry: FolketsEntry) -> Optional[str]:
+        """Archive member of the entry's bundled pronunciation audio"""
+        return self.audio_members.get(entry.sound_file) if entry.sound_file else None
+
+    def translation_text(self, entry: FolketsEntry) -> str:
+        """Cleaned translations joined with ', '"""
+        row = self._row(entry)
+        if row is not None:
+            return self.translation_column[row]
+        return self.text_cleaner.clean_text(", ".join(entry.translations))
+
+    def example_keys(self, entry: FolketsEntry) -> List[str]:
+        """Cleaned Swedish text of each example, used to render and deduplicate them"""
+        row = self._row(entry)
+        if row is not None:
+            return self.example_key_column[row]
+        return [self.text_cleaner.clean_text(example.swedish) for example in entry.examples]
+
+    def reference_content(self, prefix: str, references: List[Tuple[str, str]], word_class: str) -> List:
+        """Content of a "prefix: value (suffix), ..." line, with resolved values linked"""
+        if self.cross_references is None:
+            return [prefix + ", ".join(value + suffix for value, suffix in references)]
+        return self.cross_references.reference_content(prefix, references, word_class)
+
+    def see_also_targets(self, entry: FolketsEntry) -> List[str]:
+        """Resolved see-also headwords; see-also lines are only shown when references are linked"""
+        if self.cross_references is None or not entry.see_also:
+            return []
+        return self.cross_references.see_also_targets(entry)
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Dictionary diff - compares two generated dictionary ZIPs by headword
+Streams one term bank at a time and can emit a patch-only dictionary
+"""
+
+import argparse
+import concurrent.futures
+import hashlib
+import json
+import re
+import sys
+import time
+import zipfile
+from typing import Dict, List, Set, Tuple
+
+TERM_BANK_PATTERN = re.compile(r"^term_bank_(\d+)\.json$")
+
+RowKey = Tuple[str, str]
+
+
+def term_bank_names(zip_path: str) -> List[str]:
+    """Term bank member names in bank number order"""
+    with zipfile.ZipFile(zip_path) as zipf:
+        names = [name for name in zipf.namelist() if TERM_BANK_PATTERN.match(name)]
+    return sorted(names, key=lambda name: int(TERM_BANK_PATTERN.match(name).group(1)))
+
+
+def row_digest(row: List) -> bytes:
+    """Content hash of a term row, ignoring its build-specific sequence number"""
+    content = [row[1], row[3], row[4], row[5], row[7]]
+    encoded = json.dumps(content, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return hashlib.blake2b(encoded, digest_size=16).digest()
+
+
+def index_bank(zip_path: str, bank_name: str) -> Dict[RowKey, List[bytes]]:
+    """Index one bank by (headword, pos) -> content digests (runs in a worker process)"""
+    with zipfile.ZipFile(zip_path) as zipf, zipf.open(bank_name) as f:
+        rows = json.load(f)
+    index: Dict[RowKey, List[bytes]] = {}
+    for row in rows:
+        index.setdefault((row[0], row[2]), []).append(row_digest(row))
+    return index
+
+
+def index_dictionary(zip_path: str, executor: concurrent.futures.Executor) -> Dict[RowKey, Tuple[bytes, ...]]:
+    """Digest index of a whole dictionary; only one decoded bank per worker is held at a time"""
+    names = term_bank_names(zip_path)
+    index: Dict[RowKey, List[bytes]] = {}
+    for bank_index in executor.map(index_bank, [zip_path] * len(names), names):
+        for key, digests in bank_index.items():
+            index.setdefault(key, []).extend(digests)
+    # Homograph rows with the same key are compared as a multiset of digests
+    return {key: tuple(sorted(digests)) for key, digests in index.items()}
+
+
+def diff_dictionaries(old_zip: str, new_zip: str, workers: int = 4) -> Dict[str, List[RowKey]]:
+    """Added, removed and changed (headword, pos) keys between two dictionaries"""
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        old_index = index_dictionary(old_zip, executor)
+        new_index = index_dictionary(new_zip, executor)
+
+    return {
+        "added": sorted(new_index.keys() - old_index.keys()),
+        "removed": sorted(old_index.keys() - new_index.keys()),
+        "changed": sorted(key for key in new_index.keys() & old_index.keys() if new_index[key] != old_index[key])
+    }
+
+
+def write_patch_dictionary(new_zip: str, keys: Set[RowKey], patch_zip: str, bank_size: int = 10000) -> int:
+    """Write a dictionary with only the rows of the given keys from new_zip"""
+    with zipfile.ZipFile(new_zip) as source, \
+            zipfile.ZipFile(patch_zip, 'w', zipfile.ZIP_DEFLATED, compresslevel=9) as target:
+        rows = []
+        for name in term_bank_names(new_zip):
+            with source.open(name) as f:
+                rows.extend(row for row in json.load(f) if (row[0], row[2]) in keys)
+
+        for bank_number, start in enumerate(range(0, len(rows), bank_size), 1):
+            target.writestr(f"term_bank_{bank_number}.json", json.dumps(
+                rows[start:start + bank_size], ensure_ascii=False, separators=(',', ':')))
+
+        if "tag_bank_1.json" in source.namelist():
+            target.writestr("tag_bank_1.json", source.read("tag_bank_1.json"))
+
+        index = json.loads(source.read("index.json"))
+        # Yomitan keys dictionaries by title, so the patch must not clash with the full release
+        index["title"] = f"{index['title']} (patch {index['revision']})"
+        index["description"] = f"Entries changed since the previous release. {index.get('description', '')}".strip()
+        target.writestr("index.json", json.dumps(index, ensure_ascii=False, indent=2))
+
+    return len(rows)
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Diff two Folkets Lexikon Yomitan dictionaries")
+    arg_parser.add_argument("old_zip")
+    arg_parser.add_argument("new_zip")
+    arg_parser.add_argument("--workers", type=int, default=4, help="Processes indexing banks in parallel")
+    arg_parser.add_argument("--limit", type=int, default=50, help="Keys listed per category")
+    arg_parser.add_argument("--report", help="Write the full diff as JSON to this file")
+    arg_parser.add_argument("--patch", help="Write a patch dictionary with added and changed entries")
+    args = arg_parser.parse_args(argv)
+
+    start = time.time()
+    diff = diff_dictionaries(args.old_zip, args.new_zip, args.workers)
+    print(f"Diff {args.old_zip} -> {args.new_zip} in {time.time() - start:.2f}s")
+
+    for category, keys in diff.items():
+        print(f"\n{category}: {len(keys)}")
+        for headword, pos in keys[:args.limit]:
+            print(f"  {headword} ⟨{pos}⟩")
+        if len(keys) > args.limit:
+            print(f"  ... {len(keys) - args.limit} more")
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump({category: [list(key) for key in keys] for category, keys in diff.items()},
+                      f, ensure_ascii=False, indent=2)
+
+    if args.patch:
+        patch_keys = set(diff["added"]) | set(diff["changed"])
+        row_count = write_patch_dictionary(args.new_zip, patch_keys, args.patch)
+        print(f"\nPatch dictionary: {row_count} rows -> {args.patch}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -61,13 +61,9 @@ class EntryProcessor:
                             if word_class_match and inflection_node.base_form is None:
                                 inflection_node.base_form = node
                                 # Add usage info
-                                inflection_info = f"inflected form of \"{node.entry.headword}\""
-                                if inflection_node.entry.usage:
-                                    # Clean up before appending
-                                    existing = inflection_node.entry.usage.strip().rstrip(';').strip()
-                                    inflection_node.entry.usage = f"{existing}; {inflection_info}"
-                                else:
-                                    inflection_node.entry.usage = inflection_info
+                                inflection_node.entry.usage_annotations.append(
+                                    f"inflected form of \"{node.entry.headword}\""
+                                )
         
         total_entries = sum(len(nodes) for nodes in entry_nodes_map.values())
         print(f"Built {len(entry_nodes_map)} headwords with {total_entries} total entries (generated {generated_count} missing)")
@@ -86,7 +82,7 @@ class EntryProcessor:
             lang=base_node.entry.lang
         )
         
-        generated_entry.usage = f"inflected form of \"{base_node.entry.headword}\""
+        generated_entry.usage_annotations = [f"inflected form of \"{base_node.entry.headword}\""]
         generated_entry.inflections = []  # Inflections don't have inflections
         
         # Create node with reference to base
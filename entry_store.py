@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Entry stores - snapshot-encoded entry graph in shared memory or a mapped file
+Workers attach read-only and decode nodes by index on demand
+"""
+
+import mmap
+from collections import OrderedDict
+from multiprocessing import shared_memory
+from typing import Dict, List
+
+from entry_processor import EntryNode
+from lexicon_snapshot import SnapshotWriter, SnapshotReader, NO_VALUE
+
+
+class EntryStore:
+    """Random access to snapshot-encoded nodes, resolving base_form links lazily"""
+
+    def __init__(self, reader: SnapshotReader, base_cache_size: int = 4096):
+        self.reader = reader
+        self.base_cache_size = base_cache_size
+        self._base_nodes: "OrderedDict[int, EntryNode]" = OrderedDict()
+
+    @classmethod
+    def open_file(cls, snapshot_path: str) -> 'EntryStore':
+        """Memory-map a snapshot file read-only"""
+        with open(snapshot_path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(SnapshotReader(mapped))
+
+    def __len__(self) -> int:
+        return self.reader.node_count
+
+    def get_node(self, index: int) -> EntryNode:
+        """Decode a node by index, resolving its base_form link"""
+        node = EntryNode(entry=self.reader.get_entry(index))
+        base_index = self.reader.base_form_index(index)
+        if base_index != NO_VALUE:
+            node.base_form = self._get_base_node(base_index)
+        return node
+
+    def _get_base_node(self, index: int) -> EntryNode:
+        """Base nodes are shared by many inflections, so keep recent ones decoded"""
+        node = self._base_nodes.get(index)
+        if node is not None:
+            self._base_nodes.move_to_end(index)
+            return node
+
+        # Cache before resolving further links so base_form cycles terminate
+        node = EntryNode(entry=self.reader.get_entry(index))
+        self._base_nodes[index] = node
+        if len(self._base_nodes) > self.base_cache_size:
+            self._base_nodes.popitem(last=False)
+
+        base_index = self.reader.base_form_index(index)
+        if base_index != NO_VALUE:
+            node.base_form = self._get_base_node(base_index)
+        return node
+
+    def close(self) -> None:
+        """Release decoded nodes and column views"""
+        self.reader = None
+        self._base_nodes.clear()
+
+
+class SharedEntryStore(EntryStore):
+    """Entry graph held once in shared memory, readable from any process"""
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool):
+        super().__init__(SnapshotReader(shm.buf))
+        self.shm = shm
+        self.owner = owner
+
+    @classmethod
+    def create(cls, entry_nodes_map: Dict[str, List[EntryNode]]) -> 'SharedEntryStore':
+        """Encode the entry graph into a new shared memory block"""
+        data = SnapshotWriter().encode(entry_nodes_map, source_hash="")
+        shm = shared_memory.SharedMemory(create=True, size=len(data))
+        shm.buf[:len(data)] = data
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> 'SharedEntryStore':
+        """Attach to an existing store created by another process"""
+        return cls(shared_memory.SharedMemory(name=name), owner=False)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def close(self) -> None:
+        """Detach from the block, and free it if this process created it"""
+        # Column views into the buffer must be released before closing
+        super().close()
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
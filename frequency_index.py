@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Frequency index - counts Swedish word forms in the lexicon's examples and idioms
+and an optional plain-text corpus, and maps them to base forms for term scores
+"""
+
+import argparse
+import concurrent.futures
+import mmap
+import os
+import re
+import sys
+import time
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from entry_processor import EntryNode
+from models import FolketsEntry
+from lexicon_snapshot import load_entry_nodes
+
+# Letters, optionally joined by hyphens ("e-post"); digits and punctuation split tokens
+TOKEN_PATTERN = re.compile(r"[^\W\d_]+(?:-[^\W\d_]+)*")
+CORPUS_BLOCK_SIZE = 4 * 1024 * 1024
+TERM_META_BANK_SIZE = 10000
+
+
+# Known forms of the current worker process, set once by _init_count_worker
+_worker_known_forms: Set[str] = set()
+
+
+def iter_corpus_blocks(corpus_path: str, start: int = 0, end: Optional[int] = None,
+                       block_size: int = CORPUS_BLOCK_SIZE) -> Iterator[str]:
+    """Read a byte range of a UTF-8 text file in blocks cut on whitespace, so no token or character is split"""
+    with open(corpus_path, 'rb') as f:
+        f.seek(start)
+        remaining = (os.fstat(f.fileno()).st_size if end is None else end) - start
+        carry = b""
+        while remaining > 0:
+            block = f.read(min(block_size, remaining))
+            if not block:
+                break
+            remaining -= len(block)
+            block = carry + block
+            cut = max(block.rfind(b" "), block.rfind(b"\n"), block.rfind(b"\t"))
+            if cut < 0:
+                carry = block
+                continue
+            carry = block[cut:]
+            yield block[:cut].decode('utf-8', errors='replace')
+        if carry:
+            yield carry.decode('utf-8', errors='replace')
+
+
+def split_corpus_ranges(corpus_path: str, chunk_count: int) -> List[Tuple[int, int]]:
+    """Split a text file into byte ranges that start after a newline"""
+    size = os.path.getsize(corpus_path)
+    if size == 0:
+        return []
+    with open(corpus_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        boundaries = [0]
+        chunk_size = max(1, size // chunk_count)
+        for i in range(1, chunk_count):
+            newline = data.find(b"\n", max(i * chunk_size, boundaries[-1]))
+            if newline < 0:
+                break
+            if newline + 1 > boundaries[-1] and newline + 1 < size:
+                boundaries.append(newline + 1)
+        boundaries.append(size)
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+
+def _init_count_worker(known_forms: Set[str]) -> None:
+    global _worker_known_forms
+    _worker_known_forms = known_forms
+
+
+def _count_corpus_range(corpus_path: str, start: int, end: int) -> Tuple[Counter, int]:
+    """Known form counts and character count of a byte range (runs in a worker process)"""
+    characters = 0
+    counts = Counter()
+    is_known = _worker_known_forms.__contains__
+    for block in iter_corpus_blocks(corpus_path, start, end):
+        characters += len(block)
+        counts.update(filter(is_known, TOKEN_PATTERN.findall(block.lower())))
+    return counts, characters
+
+
+class FrequencyIndex:
+    """Word form counts and the base form totals used as term scores"""
+
+    def __init__(self, form_counts: Dict[str, int], lemma_counts: Dict[str, int], term_meta: List[List]):
+        # Lowercased surface form -> occurrences
+        self.form_counts = form_counts
+        # Headword -> occurrences of all forms linked to it
+        self.lemma_counts = lemma_counts
+        # [headword, "freq", score] rows of the dictionary's headwords that occur
+        self.term_meta = term_meta
+
+    @staticmethod
+    def form_lemmas(entry_nodes_map: Dict[str, List[EntryNode]]) -> Dict[str, Set[str]]:
+        """Lowercased headword -> headwords its occurrences count towards"""
+        lemmas: Dict[str, Set[str]] = {}
+        for headword, node_list in entry_nodes_map.items():
+            targets = lemmas.setdefault(headword.lower(), set())
+            for node in node_list:
+                # Inflections count towards their base form as well as themselves
+                targets.add(headword)
+                if node.base_form is not None:
+                    targets.add(node.base_form.entry.headword)
+        return lemmas
+
+    @staticmethod
+    def iter_lexicon_text(entry_nodes_map: Dict[str, List[EntryNode]]) -> Iterator[str]:
+        """Swedish example and idiom text of every distinct entry"""
+        seen = set()
+        for node_list in entry_nodes_map.values():
+            for node in node_list:
+                if id(node.entry) in seen:
+                    continue
+                seen.add(id(node.entry))
+                for example in node.entry.examples:
+                    yield example.swedish
+                for idiom in node.entry.idioms:
+                    yield idiom.swedish
+
+    @staticmethod
+    def count_forms(texts: Iterable[str], known_forms: Set[str], counts: Optional[Counter] = None) -> Counter:
+        """Count tokens of the texts that are known forms; memory stays bounded by the lexicon"""
+        counts = Counter() if counts is None else counts
+        is_known = known_forms.__contains__
+        for text in texts:
+            # Counter.update counts an iterable in C
+            counts.update(filter(is_known, TOKEN_PATTERN.findall(text.lower())))
+        return counts
+
+    @staticmethod
+    def count_corpus(corpus_path: str, known_forms: Set[str], counts: Counter, workers: int = 1) -> int:
+        """Add a corpus file's known form counts, in byte ranges across worker processes; returns its characters"""
+        ranges = split_corpus_ranges(corpus_path, workers * 4)
+        if workers <= 1:
+            _init_count_worker(known_forms)
+            results = (_count_corpus_range(corpus_path, start, end) for start, end in ranges)
+            return FrequencyIndex._merge_counts(results, counts)
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_count_worker, initargs=(known_forms,)
+        ) as executor:
+            results = executor.map(_count_corpus_range, [corpus_path] * len(ranges),
+                                   [start for start, _ in ranges], [end for _, end in ranges])
+            return FrequencyIndex._merge_counts(results, counts)
+
+    @staticmethod
+    def _merge_counts(results: Iterable[Tuple[Counter, int]], counts: Counter) -> int:
+        characters = 0
+        for range_counts, range_characters in results:
+            characters += range_characters
+            counts.update(range_counts)
+        return characters
+
+    @classmethod
+    def build(cls, entry_nodes_map: Dict[str, List[EntryNode]], corpus_path: Optional[str] = None,
+              workers: int = 1) -> "FrequencyIndex":
+        """Count the lexicon's own text and the corpus, then total the counts per base form"""
+        start = time.perf_counter()
+        lemmas = cls.form_lemmas(entry_nodes_map)
+        known_forms = set(lemmas)
+
+        # Examples are short, so joining them keeps the regex calls few
+        counts = cls.count_forms(["\n".join(cls.iter_lexicon_text(entry_nodes_map))], known_forms)
+        lexicon_time = time.perf_counter() - start
+        print(f"Frequency index: {sum(counts.values())} known tokens in examples and idioms ({lexicon_time:.2f}s)")
+
+        if corpus_path:
+            corpus_start = time.perf_counter()
+            before = sum(counts.values())
+            characters = cls.count_corpus(corpus_path, known_forms, counts, workers)
+            corpus_time = time.perf_counter() - corpus_start
+            print(f"Frequency index: {sum(counts.values()) - before} known tokens in {corpus_path} "
+                  f"({characters / 1024 / 1024:.0f}M chars, {corpus_time:.2f}s, "
+                  f"{characters / 1024 / 1024 / max(corpus_time, 1e-9):.1f}M chars/s, {workers} worker(s))")
+
+        lemma_counts: Dict[str, int] = {}
+        for form, count in counts.items():
+            for lemma in lemmas[form]:
+                lemma_counts[lemma] = lemma_counts.get(lemma, 0) + count
+        index = cls(counts, lemma_counts, [])
+        # The displayed frequency is the headword's highest row score, so it ranks like the rows;
+        # only headwords that get a term row count, as entries without translations or base form are skipped
+        for headword in sorted(entry_nodes_map):
+            count = max((index.score(node) for node in entry_nodes_map[headword]
+                         if node.entry.translations or node.base_form), default=0)
+            if count:
+                index.term_meta.append([headword, "freq", count])
+        print(f"Frequency index: {len(counts)} forms, {len(lemma_counts)} base forms "
+              f"in {time.perf_counter() - start:.2f}s")
+        return index
+
+    def for_entries(self, entries: Iterable[FolketsEntry]) -> "FrequencyIndex":
+        """The counts scoring these entries, for a render worker; term_meta stays with the parent"""
+        form_counts: Dict[str, int] = {}
+        lemma_counts: Dict[str, int] = {}
+        for entry in entries:
+            form = entry.headword.lower()
+            if form in self.form_counts:
+                form_counts[form] = self.form_counts[form]
+            if entry.headword in self.lemma_counts:
+                lemma_counts[entry.headword] = self.lemma_counts[entry.headword]
+        return FrequencyIndex(form_counts, lemma_counts, [])
+
+    def score(self, node: EntryNode) -> int:
+        """Row score: inflection stubs by their own form, entries by all forms of the word"""
+        entry = node.entry
+        if node.base_form is not None and not entry.translations:
+            return self.form_counts.get(entry.headword.lower(), 0)
+        return self.lemma_counts.get(entry.headword, 0)
+
+    def term_meta_banks(self) -> List[List[List]]:
+        """term_meta_bank contents, in banks of TERM_META_BANK_SIZE rows"""
+        rows = self.term_meta
+        return [rows[i:i + TERM_META_BANK_SIZE] for i in range(0, len(rows), TERM_META_BANK_SIZE)]
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Count word form frequencies for Folkets Lexikon")
+    arg_parser.add_argument("--xml", default="folkets_sv_en_public.xml")
+    arg_parser.add_argument("--cache-dir", default=".lexicon_cache")
+    arg_parser.add_argument("--corpus", help="Plain-text Swedish corpus to count as well as the lexicon's examples")
+    arg_parser.add_argument("--workers", type=int, default=1, help="Processes counting corpus byte ranges")
+    arg_parser.add_argument("--top", type=int, default=20, help="Number of most frequent base forms to print")
+    args = arg_parser.parse_args(argv)
+
+    entry_nodes_map = load_entry_nodes(args.xml, args.cache_dir)
+    index = FrequencyIndex.build(entry_nodes_map, args.corpus, args.workers)
+
+    print("\n=== Most frequent base forms ===")
+    for headword, count in Counter(index.lemma_counts).most_common(args.top):
+        print(f"{count:>10} {headword}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,16 +4,18 @@ Header section builder for Yomitan dictionary entries
 Handles: headword <pos> formatting
 """
 
-from typing import Dict
+from typing import Dict, Optional
 from models import FolketsEntry
 from pos_mapper import POSMapper
+from derived_attributes import DerivedAttributes
 
 
 class HeaderBuilder:
     """Builds header section with headword and POS tag"""
     
-    def __init__(self, pos_mapper: POSMapper):
+    def __init__(self, pos_mapper: POSMapper, attributes: Optional[DerivedAttributes] = None):
         self.pos_mapper = pos_mapper
+        self.attributes = attributes or DerivedAttributes(pos_mapper)
     
     def build_header(self, entry: FolketsEntry) -> Dict:
         """Build header section: headword <pos>"""
@@ -27,7 +29,7 @@ class HeaderBuilder:
         })
         
         # POS tag
-        pos_tag = self.pos_mapper.detect_pos(entry)
+        pos_tag = self.attributes.pos(entry)
         header_content.append({
             "tag": "span",
             "content": [f" ⟨{pos_tag}⟩"],
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Import simulator - replays a Yomitan dictionary import offline to measure
+per-bank decompression, parse and insert cost and peak memory
+"""
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+import zipfile
+from dataclasses import dataclass
+from typing import List, Optional
+
+BANK_PATTERN = re.compile(r"^(term_bank|term_meta_bank|tag_bank)_(\d+)\.json$")
+READ_CHUNK_SIZE = 64 * 1024
+
+# Stand-in for the importer's IndexedDB object stores and their indexes
+SCHEMA = """
+CREATE TABLE terms (
+    dictionary TEXT, expression TEXT, reading TEXT, expressionReverse TEXT, readingReverse TEXT,
+    definitionTags TEXT, rules TEXT, score INTEGER, glossary TEXT, sequence INTEGER, termTags TEXT
+);
+CREATE INDEX terms_dictionary ON terms(dictionary);
+CREATE INDEX terms_expression ON terms(expression);
+CREATE INDEX terms_reading ON terms(reading);
+CREATE INDEX terms_sequence ON terms(sequence);
+CREATE INDEX terms_expressionReverse ON terms(expressionReverse);
+CREATE INDEX terms_readingReverse ON terms(readingReverse);
+CREATE TABLE termMeta (dictionary TEXT, expression TEXT, mode TEXT, data TEXT);
+CREATE INDEX termMeta_expression ON termMeta(expression);
+CREATE TABLE tagMeta (dictionary TEXT, name TEXT, category TEXT, ord INTEGER, notes TEXT, score INTEGER);
+CREATE INDEX tagMeta_name ON tagMeta(name);
+"""
+
+
+@dataclass
+class BankImportStats:
+    """Cost of importing one bank member"""
+    name: str
+    rows: int
+    compressed_bytes: int
+    uncompressed_bytes: int
+    decompress_time: float
+    parse_time: float
+    insert_time: float
+    peak_memory: int = 0
+
+    @property
+    def total_time(self) -> float:
+        return self.decompress_time + self.parse_time + self.insert_time
+
+
+def bank_sort_key(name: str):
+    """Import order: tags, then terms, then term metadata, each in bank number order"""
+    kind, number = BANK_PATTERN.match(name).groups()
+    return ["tag_bank", "term_bank", "term_meta_bank"].index(kind), int(number)
+
+
+class ImportSimulator:
+    """Reads a dictionary ZIP bank by bank and inserts its rows like an importer would"""
+
+    def __init__(self, db_path: str, trace_memory: bool = True):
+        self.connection = sqlite3.connect(db_path, isolation_level=None)
+        self.connection.executescript(SCHEMA)
+        self.trace_memory = trace_memory
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def import_zip(self, zip_path: str) -> List[BankImportStats]:
+        """Import every bank of a dictionary, returning per-bank statistics"""
+        with zipfile.ZipFile(zip_path) as zipf:
+            index = json.loads(zipf.read("index.json"))
+            title = index.get("title", os.path.basename(zip_path))
+            names = sorted((name for name in zipf.namelist() if BANK_PATTERN.match(name)), key=bank_sort_key)
+
+            if self.trace_memory:
+                tracemalloc.start()
+            try:
+                return [self._import_bank(zipf, name, title) for name in names]
+            finally:
+                if self.trace_memory:
+                    tracemalloc.stop()
+
+    def _import_bank(self, zipf: zipfile.ZipFile, name: str, title: str) -> BankImportStats:
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+
+        start = time.perf_counter()
+        chunks = []
+        with zipf.open(name) as f:
+            while True:
+                chunk = f.read(READ_CHUNK_SIZE)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+        data = b"".join(chunks)
+        del chunks
+        decompressed = time.perf_counter()
+
+        rows = json.loads(data)
+        parsed = time.perf_counter()
+
+        kind = BANK_PATTERN.match(name).group(1)
+        self.connection.execute("BEGIN")
+        if kind == "term_bank":
+            self.connection.executemany(
+                "INSERT INTO terms VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                ((title, row[0], row[1], row[0][::-1], row[1][::-1], row[2], row[3], row[4],
+                  json.dumps(row[5], ensure_ascii=False), row[6], row[7]) for row in rows))
+        elif kind == "term_meta_bank":
+            self.connection.executemany(
+                "INSERT INTO termMeta VALUES (?, ?, ?, ?)",
+                ((title, row[0], row[1], json.dumps(row[2], ensure_ascii=False)) for row in rows))
+        else:
+            self.connection.executemany(
+                "INSERT INTO tagMeta VALUES (?, ?, ?, ?, ?, ?)", ((title, *row[:5]) for row in rows))
+        self.connection.execute("COMMIT")
+        inserted = time.perf_counter()
+
+        peak_memory = 0
+        if self.trace_memory:
+            peak_memory = tracemalloc.get_traced_memory()[1] - baseline
+
+        return BankImportStats(
+            name=name,
+            rows=len(rows),
+            compressed_bytes=zipf.getinfo(name).compress_size,
+            uncompressed_bytes=len(data),
+            decompress_time=decompressed - start,
+            parse_time=parsed - decompressed,
+            insert_time=inserted - parsed,
+            peak_memory=peak_memory
+        )
+
+
+def simulate_import(zip_path: str, db_path: Optional[str] = None, trace_memory: bool = True) -> List[BankImportStats]:
+    """Import a dictionary into a fresh stand-in database"""
+    with tempfile.TemporaryDirectory(prefix="import_sim_") as temp_dir:
+        simulator = ImportSimulator(db_path or os.path.join(temp_dir, "import.sqlite"), trace_memory)
+        try:
+            return simulator.import_zip(zip_path)
+        finally:
+            simulator.close()
+
+
+def print_report(zip_path: str, stats: List[BankImportStats]) -> None:
+    """Per-bank table and totals"""
+    print(f"\n=== Import Simulation: {zip_path} ===")
+    print(f"{'bank':<22} {'rows':>7} {'zip KB':>8} {'json KB':>8} {'inflate s':>10} "
+          f"{'parse s':>8} {'insert s':>9} {'peak MB':>8}")
+    for bank in stats:
+        print(f"{bank.name:<22} {bank.rows:>7} {bank.compressed_bytes / 1024:>8.0f} "
+              f"{bank.uncompressed_bytes / 1024:>8.0f} {bank.decompress_time:>10.3f} {bank.parse_time:>8.3f} "
+              f"{bank.insert_time:>9.3f} {bank.peak_memory / 1024 / 1024:>8.1f}")
+
+    total_rows = sum(bank.rows for bank in stats)
+    total_time = sum(bank.total_time for bank in stats)
+    peak = max((bank.peak_memory for bank in stats), default=0)
+    print(f"Total: {len(stats)} banks, {total_rows} rows, {total_time:.2f}s "
+          f"(inflate {sum(b.decompress_time for b in stats):.2f}s, parse {sum(b.parse_time for b in stats):.2f}s, "
+          f"insert {sum(b.insert_time for b in stats):.2f}s), peak bank memory {peak / 1024 / 1024:.1f} MB")
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Simulate importing Yomitan dictionaries")
+    arg_parser.add_argument("zips", nargs="+", help="Dictionary ZIPs to import, each into a fresh database")
+    arg_parser.add_argument("--db", help="Keep the stand-in database at this path (single ZIP only)")
+    arg_parser.add_argument("--no-trace-memory", action="store_true",
+                            help="Skip tracemalloc, which slows parsing, to time imports alone")
+    args = arg_parser.parse_args(argv)
+
+    if args.db and len(args.zips) > 1:
+        arg_parser.error("--db can only be used with a single ZIP")
+
+    for zip_path in args.zips:
+        stats = simulate_import(zip_path, args.db, trace_memory=not args.no_trace_memory)
+        print_report(zip_path, stats)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Inflection layout comparison - builds the full and compact inflection layouts
+Reports row counts, dictionary size and bank load time for each
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import zipfile
+from typing import Dict, List
+
+from entry_processor import EntryNode
+from lexicon_snapshot import load_entry_nodes
+from yomitan_converter import YomitanConverter
+
+
+def measure_layout(entry_nodes_map: Dict[str, List[EntryNode]], inflection_mode: str, work_dir: str) -> Dict:
+    """Build one layout and measure its output"""
+    zip_path = os.path.join(work_dir, f"{inflection_mode}.zip")
+    converter = YomitanConverter(inflection_mode=inflection_mode)
+
+    start = time.perf_counter()
+    converter.convert_entry_nodes(entry_nodes_map, zip_path)
+    build_time = time.perf_counter() - start
+
+    # Decompress and parse every term bank, the first step of a Yomitan import
+    rows = 0
+    uncompressed = 0
+    start = time.perf_counter()
+    with zipfile.ZipFile(zip_path) as zipf:
+        for info in zipf.infolist():
+            if info.filename.startswith("term_bank_"):
+                uncompressed += info.file_size
+                with zipf.open(info) as f:
+                    rows += len(json.load(f))
+    load_time = time.perf_counter() - start
+
+    return {
+        "mode": inflection_mode,
+        "rows": rows,
+        "term_bank_bytes": uncompressed,
+        "zip_bytes": os.path.getsize(zip_path),
+        "build_s": build_time,
+        "bank_load_s": load_time
+    }
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Compare full and compact inflection layouts")
+    arg_parser.add_argument("--xml", default="folkets_sv_en_public.xml")
+    args = arg_parser.parse_args(argv)
+
+    entry_nodes_map = load_entry_nodes(args.xml)
+    with tempfile.TemporaryDirectory() as work_dir:
+        results = [measure_layout(entry_nodes_map, mode, work_dir) for mode in ("full", "compact")]
+
+    print(f"\n{'mode':<8} {'rows':>8} {'bank MB':>9} {'zip MB':>8} {'build s':>8} {'load s':>8}")
+    for result in results:
+        print(f"{result['mode']:<8} {result['rows']:>8} {result['term_bank_bytes'] / 1e6:>9.1f} "
+              f"{result['zip_bytes'] / 1e6:>8.1f} {result['build_s']:>8.2f} {result['bank_load_s']:>8.2f}")
+
+    full, compact = results
+    print(f"Compact layout: {compact['zip_bytes'] / full['zip_bytes']:.0%} of full ZIP size, "
+          f"{compact['bank_load_s'] / full['bank_load_s']:.0%} of full bank load time")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Lexicon snapshot - persists the processed entry graph for fast warm starts
+Entries are stored as array-backed columns referencing a shared string table
+"""
+
+import functools
+import hashlib
+import inspect
+import json
+import mmap
+import os
+import struct
+from array import array
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from models import FolketsEntry, Example, Idiom, Definition, Synonym, Variant, SeeAlso
+from entry_processor import EntryProcessor, EntryNode
+from string_table import StringTableBuilder, StringTable, NO_STRING
+from xml_parser import FolketsXMLParser
+
+
+SNAPSHOT_MAGIC = b"FLXSNAP1"
+SNAPSHOT_VERSION = 2
+NO_VALUE = NO_STRING
+
+# Code that shapes the processed entry graph; editing any of these modules invalidates snapshots
+PROCESSING_CODE = (FolketsEntry, FolketsXMLParser, EntryProcessor)
+
+# Optional single string fields, stored as one string id per node
+SCALAR_FIELDS = ("headword", "word_class", "lang", "phonetic", "sound_file", "grammar")
+
+# List of string fields, stored as per-node offsets into a flat id column
+LIST_FIELDS = ("translations", "inflections", "usage", "usage_annotations")
+
+# List of two-string records, stored like list fields with two ids per item
+RECORD_FIELDS = {
+    "examples": (Example, ("swedish", "english")),
+    "idioms": (Idiom, ("swedish", "english")),
+    "definitions": (Definition, ("swedish", "english")),
+    "synonyms": (Synonym, ("value", "level")),
+    "variants": (Variant, ("value", "alt")),
+    "see_also": (SeeAlso, ("value", "type")),
+}
+
+
+@functools.lru_cache(maxsize=None)
+def processing_version() -> str:
+    """Digest of the snapshot layout version and the parser, processor and model sources"""
+    digest = hashlib.sha256(str(SNAPSHOT_VERSION).encode('ascii'))
+    for code in PROCESSING_CODE:
+        with open(inspect.getfile(code), 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+class SnapshotWriter:
+    """Encodes an entry graph into the columnar snapshot layout"""
+
+    def __init__(self):
+        self.strings = StringTableBuilder()
+        self.columns: Dict[str, array] = {}
+
+    def encode(self, entry_nodes_map: Dict[str, List[EntryNode]], source_hash: str) -> bytes:
+        """Encode all nodes, keeping headword grouping and base_form links"""
+        nodes = [node for node_list in entry_nodes_map.values() for node in node_list]
+        node_index = {id(node): i for i, node in enumerate(nodes)}
+
+        for name in SCALAR_FIELDS:
+            self.columns[name] = array('i')
+        for name in list(LIST_FIELDS) + list(RECORD_FIELDS):
+            self.columns[f"{name}.offsets"] = array('I', [0])
+            self.columns[f"{name}.values"] = array('i')
+        self.columns["base_form"] = array('i')
+
+        intern = self.strings.intern
+        for node in nodes:
+            entry = node.entry
+            for name in SCALAR_FIELDS:
+                self.columns[name].append(intern(getattr(entry, name)))
+
+            for name in LIST_FIELDS:
+                values = self.columns[f"{name}.values"]
+                values.extend(intern(value) for value in getattr(entry, name))
+                self.columns[f"{name}.offsets"].append(len(values))
+
+            for name, (_, attributes) in RECORD_FIELDS.items():
+                values = self.columns[f"{name}.values"]
+                for record in getattr(entry, name):
+                    values.extend(intern(getattr(record, attr)) for attr in attributes)
+                self.columns[f"{name}.offsets"].append(len(values))
+
+            base_form = node.base_form
+            self.columns["base_form"].append(
+                node_index[id(base_form)] if base_form is not None else NO_VALUE
+            )
+
+        self.columns["strings.offsets"] = self.strings.offsets
+        self.columns["strings.data"] = array('B', self.strings.data)
+        return self._pack(source_hash, len(nodes))
+
+    def _pack(self, source_hash: str, node_count: int) -> bytes:
+        """Lay out header, manifest and 8-byte aligned column data"""
+        layout = {}
+        data = bytearray()
+        for name, column in self.columns.items():
+            data += b"\0" * (-len(data) % 8)
+            layout[name] = [column.typecode, len(data), len(column)]
+            data += column.tobytes()
+
+        manifest = json.dumps({
+            "version": SNAPSHOT_VERSION,
+            "source_hash": source_hash,
+            "node_count": node_count,
+            "string_count": len(self.strings),
+            "columns": layout
+        }).encode('utf-8')
+        header = SNAPSHOT_MAGIC + struct.pack('<I', len(manifest)) + manifest
+        header += b"\0" * (-len(header) % 8)
+        return bytes(header) + bytes(data)
+
+
+class SnapshotReader:
+    """Decodes entries from a snapshot buffer without copying the columns"""
+
+    def __init__(self, buffer):
+        view = memoryview(buffer)
+        if bytes(view[:len(SNAPSHOT_MAGIC)]) != SNAPSHOT_MAGIC:
+            raise ValueError("Not a lexicon snapshot")
+
+        manifest_start = len(SNAPSHOT_MAGIC) + 4
+        manifest_length = struct.unpack('<I', view[len(SNAPSHOT_MAGIC):manifest_start])[0]
+        self.manifest = json.loads(bytes(view[manifest_start:manifest_start + manifest_length]))
+        if self.manifest["version"] != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version: {self.manifest['version']}")
+
+        data_start = manifest_start + manifest_length
+        data_start += -data_start % 8
+        self.columns = {}
+        for name, (typecode, offset, length) in self.manifest["columns"].items():
+            itemsize = array(typecode).itemsize
+            start = data_start + offset
+            self.columns[name] = view[start:start + length * itemsize].cast(typecode)
+
+        self.node_count: int = self.manifest["node_count"]
+        self.source_hash: str = self.manifest["source_hash"]
+        self.strings = StringTable(self.columns.pop("strings.offsets"), self.columns.pop("strings.data"))
+        self.string = self.strings.get
+        self._prepare_field_columns()
+
+    def get_entry(self, index: int) -> FolketsEntry:
+        """Decode a single entry by node index"""
+        columns = self.columns
+        string = self.string
+        entry = FolketsEntry(headword=string(columns["headword"][index]))
+        for name in SCALAR_FIELDS[1:]:
+            setattr(entry, name, string(columns[name][index]))
+
+        for name, offsets, values in self._list_columns:
+            setattr(entry, name, [string(value) for value in values[offsets[index]:offsets[index + 1]]])
+
+        for name, record_type, offsets, values in self._record_columns:
+            ids = values[offsets[index]:offsets[index + 1]]
+            setattr(entry, name, [
+                record_type(string(ids[i]), string(ids[i + 1])) for i in range(0, len(ids), 2)
+            ])
+
+        return entry
+
+    def materialize(self) -> None:
+        """Decode every string and copy columns into lists for fast bulk decoding"""
+        self.strings.decode_all()
+        self.columns = {name: column.tolist() for name, column in self.columns.items()}
+        self._prepare_field_columns()
+
+    def _prepare_field_columns(self) -> None:
+        """Resolve list and record column pairs once instead of per entry"""
+        self._list_columns = [
+            (name, self.columns[f"{name}.offsets"], self.columns[f"{name}.values"])
+            for name in LIST_FIELDS
+        ]
+        self._record_columns = [
+            (name, record_type, self.columns[f"{name}.offsets"], self.columns[f"{name}.values"])
+            for name, (record_type, _) in RECORD_FIELDS.items()
+        ]
+
+    def base_form_index(self, index: int) -> int:
+        """Node index of the base form, or NO_VALUE"""
+        return self.columns["base_form"][index]
+
+    def load_entry_graph(self) -> Dict[str, List[EntryNode]]:
+        """Rebuild the full headword -> nodes map with base_form links"""
+        self.materialize()
+        nodes = [EntryNode(entry=self.get_entry(i)) for i in range(self.node_count)]
+        base_forms = self.columns["base_form"]
+
+        entry_nodes_map = defaultdict(list)
+        for i, node in enumerate(nodes):
+            if base_forms[i] != NO_VALUE:
+                node.base_form = nodes[base_forms[i]]
+            entry_nodes_map[node.entry.headword].append(node)
+
+        return dict(entry_nodes_map)
+
+
+class LexiconSnapshot:
+    """Snapshot cache of processed entries keyed by the source XML hash"""
+
+    def __init__(self, cache_dir: str = ".lexicon_cache"):
+        self.cache_dir = cache_dir
+
+    @staticmethod
+    def hash_source(xml_file_path: str) -> str:
+        """SHA-256 of the source XML file"""
+        digest = hashlib.sha256()
+        with open(xml_file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @classmethod
+    def cache_key(cls, xml_file_path: str) -> str:
+        """Snapshot key: the source XML hash combined with the version of the code that processes it"""
+        return hashlib.sha256(f"{cls.hash_source(xml_file_path)}:{processing_version()}".encode('ascii')).hexdigest()
+
+    def snapshot_path(self, source_hash: str) -> str:
+        """Path of the snapshot file for a given cache key"""
+        return os.path.join(self.cache_dir, f"lexicon_{source_hash[:16]}.snap")
+
+    def load(self, source_hash: str) -> Optional[Dict[str, List[EntryNode]]]:
+        """Load the entry graph for a cache key, or None if no valid snapshot exists"""
+        path = self.snapshot_path(source_hash)
+        if not os.path.exists(path):
+            return None
+
+        with open(path, 'rb') as f:
+            buffer = f.read()
+
+        try:
+            reader = SnapshotReader(buffer)
+        except ValueError as e:
+            print(f"Ignoring snapshot {path}: {e}")
+            return None
+
+        if reader.source_hash != source_hash:
+            return None
+
+        return reader.load_entry_graph()
+
+    def open(self, source_hash: str) -> Optional[SnapshotReader]:
+        """Memory-map a snapshot for lazy, zero-copy access to individual entries"""
+        path = self.snapshot_path(source_hash)
+        if not os.path.exists(path):
+            return None
+
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            reader = SnapshotReader(mapped)
+        except ValueError as e:
+            print(f"Ignoring snapshot {path}: {e}")
+            reader = None
+
+        if reader is not None and reader.source_hash == source_hash:
+            return reader
+        # Views into the mapping must be released before it can be closed
+        del reader
+        mapped.close()
+        return None
+
+    def save(self, source_hash: str, entry_nodes_map: Dict[str, List[EntryNode]]) -> str:
+        """Write the entry graph snapshot atomically and return its path"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self.snapshot_path(source_hash)
+        temp_path = f"{path}.tmp"
+
+        with open(temp_path, 'wb') as f:
+            f.write(SnapshotWriter().encode(entry_nodes_map, source_hash))
+        os.replace(temp_path, path)
+
+        return path
+
+
+def load_entry_nodes(xml_file: str, cache_dir: str = ".lexicon_cache") -> Dict[str, List[EntryNode]]:
+    """Load processed entries from a snapshot, or parse and process the XML"""
+    snapshot = LexiconSnapshot(cache_dir)
+    source_hash = snapshot.cache_key(xml_file)
+    entry_nodes_map = snapshot.load(source_hash)
+    if entry_nodes_map is None:
+        entries = FolketsXMLParser().parse_xml(xml_file)
+        entry_nodes_map = EntryProcessor().process_entries(entries)
+        snapshot.save(source_hash, entry_nodes_map)
+    return entry_nodes_map
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Local lookup server - answers ad-hoc lookups over the processed lexicon
+Serves the same structured content as the dictionary over HTTP or a Unix socket
+"""
+
+import argparse
+import bisect
+import gc
+import http.client
+import http.server
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from urllib.parse import urlparse, parse_qs, quote
+
+from entry_processor import EntryNode
+from pos_mapper import POSMapper
+from content_builder import StructuredContentBuilder
+from lexicon_snapshot import load_entry_nodes
+
+
+class LexiconIndex:
+    """Surface form index over processed entry nodes, with a sorted prefix index"""
+
+    def __init__(self, entry_nodes_map: Dict[str, List[EntryNode]]):
+        # Generated inflections are already nodes of their own in the map
+        self.forms = entry_nodes_map
+        self.folded: Dict[str, List[str]] = defaultdict(list)
+        for form in entry_nodes_map:
+            self.folded[form.casefold()].append(form)
+        self.sorted_keys = sorted(self.folded)
+
+    def lookup(self, term: str) -> List[EntryNode]:
+        """Exact surface form lookup, falling back to case-insensitive matches"""
+        nodes = self.forms.get(term)
+        if nodes:
+            return nodes
+        return [node for form in self.folded.get(term.casefold(), []) for node in self.forms[form]]
+
+    def prefix(self, prefix: str, limit: int = 20) -> List[str]:
+        """Surface forms starting with prefix (case-insensitive), in sorted order"""
+        key = prefix.casefold()
+        results = []
+        i = bisect.bisect_left(self.sorted_keys, key)
+        while i < len(self.sorted_keys) and len(results) < limit:
+            folded = self.sorted_keys[i]
+            if not folded.startswith(key):
+                break
+            results.extend(self.folded[folded][:limit - len(results)])
+            i += 1
+        return results
+
+
+class LookupService:
+    """Renders lookup responses, with an LRU cache of encoded responses"""
+
+    def __init__(self, index: LexiconIndex, cache_size: int = 4096):
+        self.index = index
+        self.pos_mapper = POSMapper()
+        self.content_builder = StructuredContentBuilder(self.pos_mapper)
+        self.cache_size = cache_size
+        self.cache: "OrderedDict[tuple, bytes]" = OrderedDict()
+        self.cache_lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def lookup(self, term: str) -> bytes:
+        """JSON response with structured content for every entry of a surface form"""
+        return self._cached(("lookup", term), lambda: self._render_lookup(term))
+
+    def prefix(self, prefix: str, limit: int) -> bytes:
+        """JSON response with surface forms matching a prefix"""
+        return self._cached(("prefix", prefix, limit), lambda: self._encode({
+            "prefix": prefix,
+            "forms": self.index.prefix(prefix, limit)
+        }))
+
+    def _render_lookup(self, term: str) -> bytes:
+        entries = []
+        for node in self.index.lookup(term):
+            content = self.content_builder.build_structured_content(node)
+            if content is None:
+                continue
+            entries.append({
+                "headword": node.entry.headword,
+                "pos": self.pos_mapper.detect_pos(node.entry),
+                "base_form": node.base_form.entry.headword if node.base_form else None,
+                "content": content
+            })
+        return self._encode({"term": term, "entries": entries})
+
+    def _cached(self, key: tuple, render) -> bytes:
+        with self.cache_lock:
+            response = self.cache.get(key)
+            if response is not None:
+                self.cache.move_to_end(key)
+                self.cache_hits += 1
+                return response
+            self.cache_misses += 1
+
+        response = render()
+        with self.cache_lock:
+            self.cache[key] = response
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        return response
+
+    def stats(self) -> bytes:
+        return self._encode({
+            "forms": len(self.index.forms),
+            "cache_entries": len(self.cache),
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses
+        })
+
+    @staticmethod
+    def _encode(data: Dict) -> bytes:
+        return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+# Prefix results per request; the limit is part of the cache key, so it is bounded as well
+DEFAULT_PREFIX_LIMIT = 20
+MAX_PREFIX_LIMIT = 1000
+
+
+class LookupRequestHandler(http.server.BaseHTTPRequestHandler):
+    """GET /lookup?term=..., /prefix?q=...&limit=..., /stats"""
+
+    protocol_version = "HTTP/1.1"
+    # Buffer the response so headers and body leave in one write: on keep-alive connections a
+    # small second write waits for the client's delayed ACK (Nagle), about 40 ms per request
+    wbufsize = -1
+    service: LookupService = None
+
+    def setup(self):
+        super().setup()
+        # Bodies larger than the write buffer still go out in several writes; Unix sockets have no Nagle
+        if self.connection.family != socket.AF_UNIX:
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, True)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = parse_qs(url.query)
+
+        if url.path == "/lookup" and "term" in params:
+            self._respond(200, self.service.lookup(params["term"][0]))
+        elif url.path == "/prefix" and "q" in params:
+            try:
+                limit = int(params.get("limit", [str(DEFAULT_PREFIX_LIMIT)])[0])
+            except ValueError:
+                self._respond(400, b'{"error":"limit must be an integer"}')
+                return
+            limit = max(1, min(limit, MAX_PREFIX_LIMIT))
+            self._respond(200, self.service.prefix(params["q"][0], limit))
+        elif url.path == "/stats":
+            self._respond(200, self.service.stats())
+        else:
+            self._respond(404, b'{"error":"not found"}')
+
+    def _respond(self, status: int, body: bytes) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        self.wfile.flush()
+
+    def address_string(self) -> str:
+        # Unix socket peers have no host address
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """HTTP server listening on a Unix domain socket"""
+
+    daemon_threads = True
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTP client connection over a Unix domain socket"""
+
+    def __init__(self, socket_path: str, timeout: float = 10.0):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+def create_server(service: LookupService, host: str = "127.0.0.1", port: int = 8765,
+                  socket_path: Optional[str] = None) -> socketserver.BaseServer:
+    """Create a threaded HTTP server on a TCP port or a Unix socket"""
+    handler = type("BoundLookupRequestHandler", (LookupRequestHandler,), {"service": service})
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        return ThreadingUnixHTTPServer(socket_path, handler)
+    return http.server.ThreadingHTTPServer((host, port), handler)
+
+
+def run_load_test(terms: List[str], qps: float, duration: float, host: str = "127.0.0.1",
+                  port: int = 8765, socket_path: Optional[str] = None, concurrency: int = 16) -> Dict:
+    """Open-loop load test: issue lookups at a fixed rate and report latency percentiles"""
+    local = threading.local()
+    latencies: List[float] = []
+    errors = [0]
+    lock = threading.Lock()
+
+    def connection():
+        if not hasattr(local, "conn"):
+            local.conn = UnixHTTPConnection(socket_path) if socket_path else http.client.HTTPConnection(host, port, timeout=10)
+        return local.conn
+
+    def send(term: str, scheduled: float):
+        try:
+            conn = connection()
+            conn.request("GET", f"/lookup?term={quote(term)}")
+            response = conn.getresponse()
+            response.read()
+            ok = response.status == 200
+        except (OSError, http.client.HTTPException):
+            local.__dict__.pop("conn", None)
+            ok = False
+        # Measure from the scheduled send time so queueing delay counts as latency
+        latency = time.perf_counter() - scheduled
+        with lock:
+            latencies.append(latency)
+            if not ok:
+                errors[0] += 1
+
+    total_requests = int(qps * duration)
+    interval = 1.0 / qps
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for i in range(total_requests):
+            scheduled = start + i * interval
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            executor.submit(send, terms[i % len(terms)], scheduled)
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+
+    def percentile(q: float) -> float:
+        return latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000 if latencies else 0.0
+
+    return {
+        "requests": len(latencies),
+        "errors": errors[0],
+        "target_qps": qps,
+        "achieved_qps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(0.50),
+        "p99_ms": percentile(0.99),
+        "max_ms": latencies[-1] * 1000 if latencies else 0.0
+    }
+
+
+def main(argv=None):
+    """Serve lookups, or load test a running (or in-process) server"""
+    arg_parser = argparse.ArgumentParser(description="Local Folkets Lexikon lookup server")
+    arg_parser.add_argument("command", choices=["serve", "loadtest"])
+    arg_parser.add_argument("--xml", default="folkets_sv_en_public.xml")
+    arg_parser.add_argument("--host", default="127.0.0.1")
+    arg_parser.add_argument("--port", type=int, default=8765)
+    arg_parser.add_argument("--socket", help="Listen on / connect to this Unix socket instead of TCP")
+    arg_parser.add_argument("--cache-size", type=int, default=4096, help="LRU response cache entries")
+    arg_parser.add_argument("--qps", type=float, default=200.0, help="Load test request rate")
+    arg_parser.add_argument("--duration", type=float, default=10.0, help="Load test duration in seconds")
+    arg_parser.add_argument("--in-process", action="store_true",
+                            help="Load test a server started in this process from --xml")
+    args = arg_parser.parse_args(argv)
+
+    if args.command == "loadtest" and not args.in_process:
+        # Sample terms from the server itself so the test needs no lexicon locally
+        conn = UnixHTTPConnection(args.socket) if args.socket else http.client.HTTPConnection(args.host, args.port)
+        terms = []
+        for letter in "abcdefghijklmnopqrstuvwxyzåäö":
+            conn.request("GET", f"/prefix?q={quote(letter)}&limit=50")
+            terms.extend(json.loads(conn.getresponse().read())["forms"])
+        result = run_load_test(terms, args.qps, args.duration, args.host, args.port, args.socket)
+        print(json.dumps(result, indent=2))
+        return 0
+
+    if not os.path.exists(args.xml):
+        print(f"XML file not found: {args.xml}")
+        return 1
+
+    print(f"Loading lexicon: {args.xml}")
+    index = LexiconIndex(load_entry_nodes(args.xml))
+    service = LookupService(index, args.cache_size)
+    # The lexicon lives as long as the server; full collections scanning it stall every request
+    gc.freeze()
+    server = create_server(service, args.host, args.port, args.socket)
+    address = args.socket or f"http://{args.host}:{server.server_address[1]}"
+    print(f"Indexed {len(index.forms)} surface forms, serving on {address}")
+
+    if args.command == "serve":
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+        return 0
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        result = run_load_test(list(index.forms), args.qps, args.duration, args.host,
+                               server.server_address[1] if not args.socket else 0, args.socket)
+        print(json.dumps(result, indent=2))
+        print(f"Cache: {service.stats().decode('utf-8')}")
+    finally:
+        server.shutdown()
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
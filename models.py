@@ -62,7 +62,9 @@ class FolketsEntry:
     examples: List[Example] = field(default_factory=list)
     idioms: List[Idiom] = field(default_factory=list)
     definitions: List[Definition] = field(default_factory=list)
-    usage: Optional[str] = None
+    # Source usage text split into parts; annotations are added by EntryProcessor
+    usage: List[str] = field(default_factory=list)
+    usage_annotations: List[str] = field(default_factory=list)
     synonyms: List[Synonym] = field(default_factory=list)
     variants: List[Variant] = field(default_factory=list)
     see_also: List[SeeAlso] = field(default_factory=list)
@@ -38,6 +38,10 @@ class PhoneticNormalizer:
             "1": "",
             "el.": "",
         }
+        # Longer strings first to avoid partial matches; sorted once rather than per call
+        self.sorted_mappings = sorted(
+            self.ipa_mappings.items(), key=lambda x: len(x[0]), reverse=True
+        )
     
     def normalize(self, phonetic: str) -> str:
         """Normalize phonetic transcription to standard IPA"""
@@ -47,10 +51,7 @@ class PhoneticNormalizer:
         normalized = phonetic
         
         # Apply mappings in order (longer strings first to avoid partial matches)
-        sorted_mappings = sorted(
-            self.ipa_mappings.items(), key=lambda x: len(x[0]), reverse=True
-        )
-        for folkets, ipa in sorted_mappings:
+        for folkets, ipa in self.sorted_mappings:
             if folkets in normalized:
                 normalized = normalized.replace(folkets, ipa)
         
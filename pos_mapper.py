@@ -84,6 +84,7 @@ class POSMapper:
             'prefix': 'Prefix',
             'suffix': 'Suffix',
             'abbr': 'Abbreviation',
+            'idiom': 'Idiom',
             'unknown': 'Unknown',
             'misc': 'Other'
         }
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Golden-output regression harness - builds a fixed synthetic lexicon in every
+execution mode and checks that all modes produce byte-identical dictionary files
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+import tempfile
+import zipfile
+from typing import Callable, Dict, List
+
+from entry_processor import EntryProcessor
+from lexicon_snapshot import SnapshotWriter, SnapshotReader
+from xml_parser import FolketsXMLParser
+from yomitan_converter import YomitanConverter
+from zip_reuse import MANIFEST_MEMBER
+from variant_build import MultiVariantBuild
+import shard_build
+
+
+GOLDEN_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "regression_golden.json")
+# Enough words for several 10000-row term banks, so bank boundaries and per-bank threads are exercised
+SAMPLE_WORDS = 15000
+SAMPLE_SEED = 7
+# Default pool sizes follow the host's CPUs; modes pin them so every host runs the same code paths
+PINNED_WORKERS = {"serialize_workers": 1, "compress_workers": 1}
+THREADED_WORKERS = {"serialize_workers": 4, "compress_workers": 4}
+
+# index.json carries the build date; it is the only member allowed to differ between runs
+NORMALIZED_REVISION = "0000.00.00"
+
+
+def generate_sample_xml(path: str, words: int = SAMPLE_WORDS, seed: int = SAMPLE_SEED) -> None:
+    """Write a deterministic synthetic lexicon covering every element the parser reads"""
+    rng = random.Random(seed)
+    classes = ["nn", "vb", "jj", "ab", "pp", "pn", "kn", "", "xx", "abbrev"]
+    syllables = ["ka", "lo", "mi", "för", "sä", "by", "nå", "tu", "re", "va", "hö", "ä",
+                 "ste", "gal", "ning", "bor", "ut", "in", "pa", "sk", "ral", "tö", "fi", "ly"]
+    english = ["run", "house", "big", "quick", "go", "see", "dog", "cat", "to be", "small",
+               "light", "the &quot;best&quot;", "A &amp; B", "twenty-one"]
+    usages = ["vardagligt", "om person; formellt", "&amp;quot;x&amp;quot; ; slang", "a;b",
+              "om &quot;ja; nej&quot; i tal", "  ;ledande semikolon", "&#229;lderdomligt"]
+
+    headwords = ["".join(rng.choice(syllables) for _ in range(rng.randint(1, 4))) for _ in range(words)]
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>',
+             '<dictionary source-language="sv" target-language="en" name="Folkets lexikon">']
+    for headword in headwords:
+        lines.append(f'<word value="{headword}" lang="sv" class="{rng.choice(classes)}">')
+        for _ in range(rng.randint(0, 3)):
+            lines.append(f'  <translation value="{rng.choice(english)}"/>')
+        if rng.random() < 0.6:
+            lines.append(f'  <phonetic value="{headword}:@²E$ el. 2{headword}" soundFile="{headword}.swf"/>')
+        if rng.random() < 0.5:
+            inflections = [headword + "en", headword + "ar", rng.choice(headwords), headword]
+            lines.append("  <paradigm>" + "".join(f'<inflection value="{form}"/>' for form in inflections)
+                         + "</paradigm>")
+        for _ in range(rng.randint(0, 4)):
+            lines.append(f'  <example value="{headword} {rng.choice(headwords)}  ."><translation '
+                         f'value="{rng.choice(english)} ,now"/></example>')
+        for _ in range(rng.randint(0, 7) // 3):
+            lines.append(f'  <idiom value="ta {rng.choice(headwords)}"><translation '
+                         f'value="take {rng.choice(english)}"/></idiom>')
+        if rng.random() < 0.3:
+            lines.append(f'  <definition value="en {headword} som är {rng.choice(headwords)}">'
+                         f'<translation value="a thing ( that is )"/></definition>')
+        if rng.random() < 0.3:
+            lines.append(f'  <use value="{rng.choice(usages)}"/>')
+        for _ in range(rng.randint(0, 2)):
+            lines.append(f'  <synonym value="{rng.choice(headwords)}" level="{rng.choice(["", "3.5", "4.0"])}"/>')
+        if rng.random() < 0.2:
+            lines.append(f'  <variant value="{rng.choice(headwords)}" alt="{rng.choice(["", "also"])}"/>')
+        if rng.random() < 0.2:
+            lines.append(f'  <see value="{rng.choice(headwords)}" type="saldo"/>')
+        if rng.random() < 0.2:
+            lines.append('  <grammar value="A &amp; B, [ något ]"/>')
+        lines.append('</word>')
+    lines.append('</dictionary>')
+
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("\n".join(lines))
+
+
+def member_digests(zip_path: str) -> Dict[str, str]:
+    """SHA-256 of every dictionary member, with index.json's revision normalized
+
+    The reuse manifest is skipped: it lists the other members' digests, including the dated index.json.
+    """
+    digests = {}
+    with zipfile.ZipFile(zip_path) as zipf:
+        for name in sorted(zipf.namelist()):
+            if name == MANIFEST_MEMBER:
+                continue
+            data = zipf.read(name)
+            if name == "index.json":
+                index = json.loads(data)
+                index["revision"] = NORMALIZED_REVISION
+                data = json.dumps(index, ensure_ascii=False, indent=2).encode('utf-8')
+            digests[name] = hashlib.sha256(data).hexdigest()
+    return digests
+
+
+def _build_from_entries(xml_path: str, zip_path: str, **options) -> None:
+    entries = FolketsXMLParser().parse_xml(xml_path)
+    YomitanConverter(**{**PINNED_WORKERS, **options}).convert_dictionary(entries, zip_path)
+
+
+def _build_snapshot_round_trip(xml_path: str, zip_path: str) -> None:
+    entry_nodes_map = EntryProcessor().process_entries(FolketsXMLParser().parse_xml(xml_path))
+    reader = SnapshotReader(SnapshotWriter().encode(entry_nodes_map, source_hash=""))
+    YomitanConverter(**PINNED_WORKERS).convert_entry_nodes(reader.load_entry_graph(), zip_path)
+
+
+def _build_parallel_parse(xml_path: str, zip_path: str) -> None:
+    entries = FolketsXMLParser().parse_xml_parallel(xml_path, workers=2)
+    YomitanConverter(**PINNED_WORKERS).convert_dictionary(entries, zip_path)
+
+
+def _build_reusing_previous(xml_path: str, zip_path: str, **options) -> None:
+    previous_zip = f"{zip_path}.previous"
+    _build_from_entries(xml_path, previous_zip, **options)
+    _build_from_entries(xml_path, zip_path, previous_zip=previous_zip, **options)
+
+
+def _build_variants(xml_path: str, zip_path: str, render_workers: int = 1) -> None:
+    """Full variant of a full+lite build; the lite ZIP is written beside it"""
+    entry_nodes_map = EntryProcessor().process_entries(FolketsXMLParser().parse_xml(xml_path))
+    MultiVariantBuild(["full", "lite"], render_workers=render_workers, **PINNED_WORKERS).run(entry_nodes_map, zip_path)
+
+
+# Every execution mode must reproduce the serial build's files byte for byte
+BUILD_MODES: Dict[str, Callable[[str, str], None]] = {
+    "serial": lambda xml, out: _build_from_entries(xml, out),
+    # Term banks serialized and members deflated by thread pools
+    "threaded": lambda xml, out: _build_from_entries(xml, out, **THREADED_WORKERS),
+    "process-pool": lambda xml, out: _build_from_entries(xml, out, render_workers=2),
+    # Streaming: render, serialize and compress stages overlap and write the ZIP directly
+    "pipeline": lambda xml, out: _build_from_entries(xml, out, pipeline=True),
+    "pipeline-process-pool": lambda xml, out: _build_from_entries(xml, out, pipeline=True, render_workers=2),
+    "parallel-parse": _build_parallel_parse,
+    "snapshot": _build_snapshot_round_trip,
+    "zip-reuse": _build_reusing_previous,
+    "zip-reuse-threaded": lambda xml, out: _build_reusing_previous(xml, out, **THREADED_WORKERS),
+    "sharded": lambda xml, out: shard_build.run_local(xml, 2, out, "full", **PINNED_WORKERS),
+    "compiled-layout": lambda xml, out: _build_from_entries(xml, out, compiled_layout=True),
+    "compiled-layout-pipeline": lambda xml, out: _build_from_entries(xml, out, compiled_layout=True, pipeline=True,
+                                                                   render_workers=2),
+    "variants": _build_variants,
+    "variants-process-pool": lambda xml, out: _build_variants(xml, out, render_workers=2),
+    # A 1-byte budget spills from the first chunk on
+    "memory-budget": lambda xml, out: _build_from_entries(xml, out, memory_budget=1),
+    "memory-budget-process-pool": lambda xml, out: _build_from_entries(xml, out, memory_budget=1, render_workers=2),
+}
+
+
+def run_modes(modes: List[str], work_dir: str) -> Dict[str, Dict[str, str]]:
+    """Build the sample in each mode and return member digests per mode"""
+    xml_path = os.path.join(work_dir, "sample.xml")
+    generate_sample_xml(xml_path)
+
+    results = {}
+    for mode in modes:
+        print(f"\n=== Regression build: {mode} ===")
+        zip_path = os.path.join(work_dir, f"{mode}.zip")
+        BUILD_MODES[mode](xml_path, zip_path)
+        results[mode] = member_digests(zip_path)
+    return results
+
+
+def compare_digests(expected: Dict[str, str], actual: Dict[str, str]) -> List[str]:
+    """Names of members that are missing, extra or different"""
+    return sorted(name for name in expected.keys() | actual.keys() if expected.get(name) != actual.get(name))
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Byte-identical output check across build modes")
+    arg_parser.add_argument("--modes", default=",".join(BUILD_MODES),
+                            help="Comma-separated modes to run (default: all)")
+    arg_parser.add_argument("--record", action="store_true",
+                            help="Record the serial build's digests as the new golden output")
+    args = arg_parser.parse_args(argv)
+
+    modes = [mode.strip() for mode in args.modes.split(",") if mode.strip()]
+    if "serial" not in modes:
+        modes.insert(0, "serial")
+
+    with tempfile.TemporaryDirectory(prefix="regression_") as work_dir:
+        results = run_modes(modes, work_dir)
+
+    reference = results["serial"]
+    if args.record:
+        with open(GOLDEN_FILE, 'w', encoding='utf-8') as f:
+            json.dump({"words": SAMPLE_WORDS, "seed": SAMPLE_SEED, "sha256": reference}, f, indent=2)
+            f.write("\n")
+        print(f"\nRecorded golden digests for {len(reference)} members: {GOLDEN_FILE}")
+
+    failures = []
+    with open(GOLDEN_FILE, encoding='utf-8') as f:
+        golden = json.load(f)["sha256"]
+
+    print("\n=== Regression Summary ===")
+    for mode, digests in results.items():
+        mismatches = compare_digests(golden, digests)
+        print(f"{mode:<26} {'OK' if not mismatches else 'MISMATCH: ' + ', '.join(mismatches)}")
+        if mismatches:
+            failures.append(mode)
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Resource scheduler - sizes the worker pools of each build stage from the CPUs
+and memory this process may actually use (CPU affinity, cgroup quotas, free memory)
+"""
+
+import argparse
+import functools
+import math
+import os
+import sys
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+CGROUP_ROOT = "/sys/fs/cgroup"
+# "hierarchy-id:controllers:path" lines naming this process's cgroups
+PROC_CGROUP = "/proc/self/cgroup"
+# cgroup v1 reports "no limit" as a huge page-aligned number
+UNLIMITED_MEMORY = 1 << 60
+
+# Rough peak memory of one worker; bounds the pools on small runners
+PARSE_WORKER_MEMORY = 384 * 1024 * 1024
+RENDER_WORKER_MEMORY = 256 * 1024 * 1024
+# Serialize threads each hold one encoded bank; compress threads one bank and its deflated copy
+SERIALIZE_THREAD_MEMORY = 96 * 1024 * 1024
+COMPRESS_THREAD_MEMORY = 128 * 1024 * 1024
+# json.dumps holds the GIL, so serialize threads beyond a few only overlap file writes
+MAX_SERIALIZE_THREADS = 4
+
+STAGES = ("parse", "render", "serialize", "compress")
+
+
+def _read_text(path: str) -> Optional[str]:
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def _cgroup_paths(cgroup_root: str, proc_cgroup: str = PROC_CGROUP) -> Dict[str, str]:
+    """Controller -> directory of this process's cgroup ("" for the v2 unified hierarchy)"""
+    paths: Dict[str, str] = {}
+    for line in (_read_text(proc_cgroup) or "").splitlines():
+        hierarchy, controllers, path = line.split(":", 2)
+        for controller in (controllers.split(",") if controllers else [""]):
+            base = os.path.join(cgroup_root, controller) if controller else cgroup_root
+            nested = os.path.join(base, path.lstrip("/"))
+            # Inside a container the cgroup namespace may hide the nested directory
+            paths[controller] = nested if os.path.isdir(nested) else base
+    return paths
+
+
+def _cgroup_file(paths: Dict[str, str], controller: str, name: str) -> Optional[str]:
+    directory = paths.get(controller)
+    return _read_text(os.path.join(directory, name)) if directory else None
+
+
+def _meminfo_available() -> Optional[int]:
+    for line in (_read_text("/proc/meminfo") or "").splitlines():
+        if line.startswith("MemAvailable:"):
+            return int(line.split()[1]) * 1024
+    return None
+
+
+@dataclass
+class ResourceLimits:
+    """CPUs and memory available to this process"""
+    affinity_cpus: int
+    quota_cpus: Optional[float] = None
+    memory_limit: Optional[int] = None
+    available_memory: Optional[int] = None
+
+    @property
+    def cpus(self) -> int:
+        """Whole CPUs the build may keep busy"""
+        if self.quota_cpus is None:
+            return self.affinity_cpus
+        return max(1, min(self.affinity_cpus, math.floor(self.quota_cpus)))
+
+    def describe(self) -> str:
+        parts = [f"{self.affinity_cpus} CPU(s) in affinity mask"]
+        if self.quota_cpus is not None:
+            parts.append(f"cgroup CPU quota {self.quota_cpus:g}")
+        if self.memory_limit is not None:
+            parts.append(f"cgroup memory limit {self.memory_limit / 1024 ** 3:.1f} GiB")
+        if self.available_memory is not None:
+            parts.append(f"{self.available_memory / 1024 ** 3:.1f} GiB available")
+        return ", ".join(parts)
+
+
+def detect_limits(cgroup_root: str = CGROUP_ROOT, proc_cgroup: str = PROC_CGROUP) -> ResourceLimits:
+    """Read the CPU affinity mask, cgroup v2 or v1 CPU quota and memory limit, and free memory"""
+    if hasattr(os, "sched_getaffinity"):
+        affinity_cpus = len(os.sched_getaffinity(0))
+    else:
+        affinity_cpus = os.cpu_count() or 1
+    limits = ResourceLimits(affinity_cpus)
+    paths = _cgroup_paths(cgroup_root, proc_cgroup)
+
+    # v2: "quota period" or "max period"; v1: cfs_quota_us is -1 without a quota
+    cpu_max = _cgroup_file(paths, "", "cpu.max")
+    if cpu_max:
+        quota, period = cpu_max.split()
+        if quota != "max":
+            limits.quota_cpus = int(quota) / int(period)
+    else:
+        quota = _cgroup_file(paths, "cpu", "cpu.cfs_quota_us")
+        period = _cgroup_file(paths, "cpu", "cpu.cfs_period_us")
+        if quota and period and int(quota) > 0:
+            limits.quota_cpus = int(quota) / int(period)
+
+    memory_max = _cgroup_file(paths, "", "memory.max")
+    memory_current = _cgroup_file(paths, "", "memory.current")
+    if memory_max is None:
+        memory_max = _cgroup_file(paths, "memory", "memory.limit_in_bytes")
+        memory_current = _cgroup_file(paths, "memory", "memory.usage_in_bytes")
+    if memory_max and memory_max != "max" and int(memory_max) < UNLIMITED_MEMORY:
+        limits.memory_limit = int(memory_max)
+
+    available = _meminfo_available()
+    if limits.memory_limit is not None:
+        cgroup_available = limits.memory_limit - int(memory_current or 0)
+        available = cgroup_available if available is None else min(available, cgroup_available)
+    limits.available_memory = max(0, available) if available is not None else None
+    return limits
+
+
+@dataclass
+class WorkerPlan:
+    """Pool size of each build stage, and why it was chosen"""
+    parse: int
+    render: int
+    serialize: int
+    compress: int
+    limits: ResourceLimits
+    reasons: Dict[str, str] = field(default_factory=dict)
+
+    def report(self) -> None:
+        print(f"Resources: {self.limits.describe()}")
+        for stage in STAGES:
+            print(f"  {stage:<10} {getattr(self, stage):>3}  ({self.reasons.get(stage, '')})")
+
+
+def _stage_size(cpus: int, available_memory: Optional[int], worker_memory: int,
+                cap: Optional[int] = None) -> Tuple[int, str]:
+    size, reason = cpus, f"{cpus} usable CPU(s)"
+    if cap is not None and cap < size:
+        size, reason = cap, f"capped at {cap}"
+    if available_memory is not None:
+        memory_bound = max(1, available_memory // worker_memory)
+        if memory_bound < size:
+            size, reason = memory_bound, f"memory for {memory_bound} of {worker_memory // 1024 ** 2} MiB"
+    return size, reason
+
+
+def positive_int(value: str) -> int:
+    """argparse type for pool sizes, which must be at least 1"""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer: {value}")
+    return number
+
+
+def plan_workers(limits: Optional[ResourceLimits] = None,
+                 overrides: Optional[Dict[str, Optional[int]]] = None) -> WorkerPlan:
+    """Size each stage's pool; a positive override replaces the detected size, None keeps it"""
+    overrides = overrides or {}
+    for stage, size in overrides.items():
+        if size is not None and size < 1:
+            raise ValueError(f"{stage} workers must be a positive integer, got {size}")
+    limits = limits or detect_limits()
+    cpus = limits.cpus
+    sizes = {
+        "parse": _stage_size(cpus, limits.available_memory, PARSE_WORKER_MEMORY),
+        "render": _stage_size(cpus, limits.available_memory, RENDER_WORKER_MEMORY),
+        "serialize": _stage_size(cpus, limits.available_memory, SERIALIZE_THREAD_MEMORY, MAX_SERIALIZE_THREADS),
+        "compress": _stage_size(cpus, limits.available_memory, COMPRESS_THREAD_MEMORY),
+    }
+    reasons = {}
+    for stage in STAGES:
+        if overrides.get(stage) is not None:
+            sizes[stage] = (overrides[stage], "")
+            reasons[stage] = "command line"
+        else:
+            reasons[stage] = sizes[stage][1]
+    return WorkerPlan(*(sizes[stage][0] for stage in STAGES), limits=limits, reasons=reasons)
+
+
+@functools.lru_cache(maxsize=None)
+def default_plan() -> WorkerPlan:
+    """Detected plan without overrides, for components built without explicit pool sizes"""
+    return plan_workers()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Print the detected resources and the worker plan"""
+    plan_workers().report()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
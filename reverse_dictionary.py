@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Reverse dictionary - English-to-Swedish Yomitan dictionary built from the
+same processed entries as the Swedish-English one
+"""
+
+import os
+import shutil
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+from entry_processor import EntryNode
+from text_cleaner import TextCleaner
+from yomitan_converter import YomitanConverter
+
+
+# POS tag of rows built from idiom translations
+IDIOM_POS = "idiom"
+
+ReverseKey = Tuple[str, str]
+
+
+class ReverseDictionaryConverter(YomitanConverter):
+    """Inverts translations and idioms into English headwords with Swedish senses"""
+
+    def __init__(self, max_examples: int = 2, **options):
+        super().__init__(**options)
+        self.max_examples = max_examples
+        # Shares the process-wide cleaning cache warmed by the forward build
+        self.text_cleaner = TextCleaner()
+
+    def build_reverse_index(self, entry_nodes_map: Dict[str, List[EntryNode]]) -> Dict[ReverseKey, List]:
+        """(English term, pos) -> senses, each (node, idiom or None), in node order"""
+        reverse_index: Dict[ReverseKey, List] = {}
+        seen = set()
+        for node_list in entry_nodes_map.values():
+            for node in node_list:
+                entry = node.entry
+                pos_tag = self.pos_mapper.detect_pos(entry)
+                for translation in entry.translations:
+                    term = self.text_cleaner.clean_text(translation)
+                    # Repeated translations of one entry add a single sense
+                    if term and (term, pos_tag, id(node)) not in seen:
+                        seen.add((term, pos_tag, id(node)))
+                        reverse_index.setdefault((term, pos_tag), []).append((node, None))
+                for idiom in entry.idioms:
+                    term = self.text_cleaner.clean_text(idiom.english)
+                    if term and idiom.swedish:
+                        reverse_index.setdefault((term, IDIOM_POS), []).append((node, idiom))
+        return reverse_index
+
+    def convert_reverse_entry(self, term: str, pos_tag: str, senses: List) -> List:
+        """Render one English term with its Swedish senses as a Yomitan term row"""
+        self.pos_tags.add(pos_tag)
+        content = [self._create_header(term, pos_tag)]
+        for number, (node, idiom) in enumerate(senses, 1):
+            if idiom is None:
+                content.extend(self._create_entry_sense(number, node, term))
+            else:
+                content.append(self._create_idiom_sense(number, node, idiom))
+
+        yomitan_entry = [
+            term,
+            "",
+            pos_tag,
+            "",
+            0,
+            [{"type": "structured-content", "content": {"tag": "div", "content": content}}],
+            self.sequence_number,
+            ""
+        ]
+        self.sequence_number += 1
+        return yomitan_entry
+
+    def convert_reverse(self, entry_nodes_map: Dict[str, List[EntryNode]], output_zip_path: str) -> None:
+        """Build the reverse index and write the English-Swedish dictionary ZIP"""
+        start = time.time()
+        reverse_index = self.build_reverse_index(entry_nodes_map)
+        print(f"Reverse index: {len(reverse_index)} English terms in {time.time() - start:.2f}s")
+
+        all_term_entries = [
+            self.convert_reverse_entry(term, pos_tag, reverse_index[(term, pos_tag)])
+            for term, pos_tag in sorted(reverse_index, key=lambda key: (key[0].casefold(), key))
+        ]
+        print(f"Reverse conversion complete: {len(all_term_entries)} Yomitan entries created")
+
+        temp_dir = tempfile.mkdtemp(prefix="reverse_dict_files_")
+        try:
+            self.write_rendered_files(all_term_entries, temp_dir)
+            print(f"Creating ZIP dictionary: {output_zip_path}")
+            self.create_zip_dictionary(temp_dir, output_zip_path)
+        finally:
+            shutil.rmtree(temp_dir)
+
+        cache = TextCleaner.cache_info()
+        print(f"Reverse dictionary saved as: {output_zip_path} ({time.time() - start:.2f}s, "
+              f"text cleaning cache {cache.hits} hits / {cache.misses} misses)")
+
+    def generate_index_json(self) -> Dict:
+        """Generate index.json metadata for the English-Swedish direction"""
+        index = super().generate_index_json()
+        index.update({
+            "title": "Folkets Lexikon Yomitanized (English-Swedish)",
+            "description": "English-Swedish dictionary inverted from Folkets Lexikon XML data.",
+            "sourceLanguage": "en",
+            "targetLanguage": "sv"
+        })
+        return index
+
+    def _create_header(self, term: str, pos_tag: str) -> Dict:
+        """Header with the English term and POS tag"""
+        return {
+            "tag": "div",
+            "content": [
+                {"tag": "span", "content": [term], "style": {"fontWeight": "bold", "fontSize": "1.3em"}},
+                {"tag": "span", "content": [f" ⟨{pos_tag}⟩"],
+                 "style": {"color": "DarkBlue", "fontSize": "1.0em", "fontWeight": "bold"}}
+            ],
+            "style": {"fontSize": "1.0em", "marginBottom": "0.5em"}
+        }
+
+    def _create_entry_sense(self, number: int, node: EntryNode, term: str) -> List[Dict]:
+        """Swedish headword, its other translations and a few examples"""
+        entry = node.entry
+        items = [{
+            "tag": "div",
+            "content": [f"{number}. → {entry.headword}"],
+            "style": {"fontSize": "1.0em", "marginBottom": "0.2em", "fontWeight": "bold"}
+        }]
+
+        other_translations = [
+            cleaned for cleaned in (self.text_cleaner.clean_text(translation) for translation in entry.translations)
+            if cleaned and cleaned != term
+        ]
+        if other_translations:
+            items.append({
+                "tag": "div",
+                "content": [f"Also: {', '.join(dict.fromkeys(other_translations))}"],
+                "style": {"fontSize": "0.9em", "color": "#64748b", "fontStyle": "italic", "marginBottom": "0.2em"}
+            })
+
+        for example in entry.examples[:self.max_examples]:
+            example_text = f"「{self.text_cleaner.clean_text(example.swedish)}」"
+            if example.english:
+                example_text += f" {self.text_cleaner.clean_text(example.english)}"
+            items.append({
+                "tag": "div",
+                "content": [example_text],
+                "style": {"color": "darkgreen", "fontSize": "0.9em", "marginBottom": "0.2em"}
+            })
+
+        return items
+
+    def _create_idiom_sense(self, number: int, node: EntryNode, idiom) -> Dict:
+        """Swedish idiom and the headword it belongs to"""
+        return {
+            "tag": "div",
+            "content": [f"{number}. 「{self.text_cleaner.clean_text(idiom.swedish)}」 ({node.entry.headword})"],
+            "style": {"color": "darkorange", "fontSize": "1.0em", "marginBottom": "0.2em"}
+        }
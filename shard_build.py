@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Sharded dictionary build - render headword-hash partitions on separate nodes
+and merge the pre-rendered fragments into the final dictionary ZIP
+"""
+
+import argparse
+import heapq
+import itertools
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+from typing import List, Optional
+
+from entry_processor import EntryProcessor
+from entry_store import EntryStore
+from lexicon_snapshot import LexiconSnapshot, SnapshotWriter
+from xml_parser import FolketsXMLParser
+from yomitan_converter import YomitanConverter
+
+
+def shard_of(headword: str, shard_count: int) -> int:
+    """Deterministic headword partition, stable across machines and Python runs"""
+    return zlib.crc32(headword.encode('utf-8')) % shard_count
+
+
+def prepare(xml_file: str, snapshot_path: str) -> None:
+    """Parse and process the lexicon once into the snapshot shared by all shards"""
+    source_hash = LexiconSnapshot.hash_source(xml_file)
+    entries = FolketsXMLParser().parse_xml(xml_file)
+    entry_nodes_map = EntryProcessor().process_entries(entries)
+    with open(snapshot_path, 'wb') as f:
+        f.write(SnapshotWriter().encode(entry_nodes_map, source_hash))
+    print(f"Prepared shared snapshot: {snapshot_path}")
+
+
+def render_shard(snapshot_path: str, shard_index: int, shard_count: int,
+                 fragment_path: str, inflection_mode: str = "full", merge_homographs: bool = False) -> None:
+    """Render one partition into a fragment of [node index, term row] pairs"""
+    # The snapshot's base_form column is the shared inflection index: base nodes
+    # from other partitions are decoded from the mapped snapshot on demand
+    store = EntryStore.open_file(snapshot_path)
+    reader = store.reader
+    converter = YomitanConverter(inflection_mode=inflection_mode, merge_homographs=merge_homographs)
+
+    start = time.time()
+    rows = []
+    inflection_index = []
+    headwords = reader.columns["headword"]
+    indices = [index for index in range(len(store))
+               if shard_of(reader.string(headwords[index]), shard_count) == shard_index]
+    # A headword's nodes are adjacent and in one shard; its rows are ordered by its first node
+    for _, run in itertools.groupby(indices, key=lambda index: headwords[index]):
+        run = list(run)
+        nodes = [store.get_node(index) for index in run]
+        for term_entry in converter.convert_node_run(nodes):
+            rows.append([run[0], term_entry])
+        for node in nodes:
+            if inflection_mode == "compact" and converter.is_pointer_node(node):
+                inflection_index.append([node.entry.headword, node.base_form.entry.headword,
+                                         converter.pos_mapper.detect_pos(node.entry)])
+
+    fragment = {
+        "source_hash": reader.source_hash,
+        "shard_index": shard_index,
+        "shard_count": shard_count,
+        "inflection_mode": inflection_mode,
+        "merge_homographs": merge_homographs,
+        "pos_tags": sorted(converter.pos_tags),
+        "unknown_classes": sorted(converter.pos_mapper.unknown_classes),
+        "inflection_index": inflection_index,
+        "rows": rows
+    }
+    store.close()
+
+    with open(fragment_path, 'w', encoding='utf-8') as f:
+        json.dump(fragment, f, ensure_ascii=False, separators=(',', ':'))
+    print(f"Shard {shard_index}/{shard_count}: {len(rows)} rows in {time.time() - start:.2f}s -> {fragment_path}")
+
+
+def merge_fragments(fragment_paths: List[str], output_zip_path: str,
+                    previous_zip: Optional[str] = None, stable_banks: int = 0, **converter_options) -> None:
+    """Merge shard fragments in global node order and write the dictionary ZIP
+
+    converter_options are passed to the merging converter, e.g. its pool sizes.
+    """
+    fragments = []
+    for path in fragment_paths:
+        with open(path, encoding='utf-8') as f:
+            fragments.append(json.load(f))
+
+    first = fragments[0]
+    shard_count = first["shard_count"]
+    for fragment in fragments:
+        for key in ("source_hash", "shard_count", "inflection_mode", "merge_homographs"):
+            if fragment[key] != first[key]:
+                raise ValueError(f"Fragment {fragment['shard_index']} has a different {key}")
+    missing = set(range(shard_count)) - {fragment["shard_index"] for fragment in fragments}
+    if missing or len(fragments) != shard_count:
+        raise ValueError(f"Expected one fragment per shard, missing shards: {sorted(missing)}")
+
+    converter = YomitanConverter(inflection_mode=first["inflection_mode"], previous_zip=previous_zip,
+                                 stable_banks=stable_banks, **converter_options)
+    all_term_entries = []
+    # Each fragment is in node order, so a k-way merge restores the single-machine order
+    for _, term_entry in heapq.merge(*(fragment["rows"] for fragment in fragments), key=lambda row: row[0]):
+        term_entry[6] = converter.sequence_number
+        converter.sequence_number += 1
+        all_term_entries.append(term_entry)
+
+    for fragment in fragments:
+        converter.pos_tags.update(fragment["pos_tags"])
+        converter.pos_mapper.unknown_classes.update(fragment["unknown_classes"])
+
+    inflection_index = None
+    if first["inflection_mode"] == "compact":
+        inflection_index = sorted(
+            {tuple(row) for fragment in fragments for row in fragment["inflection_index"]}
+        )
+        inflection_index = [list(row) for row in inflection_index]
+
+    temp_dir = tempfile.mkdtemp(prefix="merge_dict_files_")
+    try:
+        converter.write_rendered_files(all_term_entries, temp_dir, inflection_index)
+        converter.create_zip_dictionary(temp_dir, output_zip_path)
+    finally:
+        shutil.rmtree(temp_dir)
+
+    print(f"Merged {len(fragments)} fragments, {len(all_term_entries)} rows -> {output_zip_path}")
+    converter.pos_mapper.report_unknown_classes()
+
+
+def run_local(xml_file: str, shard_count: int, output_zip_path: str, inflection_mode: str,
+              previous_zip: Optional[str] = None, stable_banks: int = 0, merge_homographs: bool = False,
+              **converter_options) -> None:
+    """Run prepare, one shard process per partition, and merge on this machine"""
+    work_dir = tempfile.mkdtemp(prefix="shard_build_")
+    try:
+        snapshot_path = os.path.join(work_dir, "lexicon.snap")
+        prepare(xml_file, snapshot_path)
+
+        fragment_paths = [os.path.join(work_dir, f"fragment_{i}.json") for i in range(shard_count)]
+        shard_options = ["--inflection-mode", inflection_mode] + (["--merge-homographs"] if merge_homographs else [])
+        processes = [
+            subprocess.Popen([
+                sys.executable, os.path.abspath(__file__), "shard",
+                "--snapshot", snapshot_path, "--index", str(i), "--count", str(shard_count),
+                "--fragment", fragment_paths[i]
+            ] + shard_options)
+            for i in range(shard_count)
+        ]
+        failed = [i for i, process in enumerate(processes) if process.wait() != 0]
+        if failed:
+            raise RuntimeError(f"Shard processes failed: {failed}")
+
+        merge_fragments(fragment_paths, output_zip_path, previous_zip, stable_banks, **converter_options)
+    finally:
+        shutil.rmtree(work_dir)
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Sharded Folkets Lexikon dictionary build")
+    commands = arg_parser.add_subparsers(dest="command", required=True)
+
+    prepare_parser = commands.add_parser("prepare", help="Parse the XML into the shared snapshot")
+    prepare_parser.add_argument("--xml", default="folkets_sv_en_public.xml")
+    prepare_parser.add_argument("--snapshot", required=True)
+
+    shard_parser = commands.add_parser("shard", help="Render one headword-hash partition")
+    shard_parser.add_argument("--snapshot", required=True)
+    shard_parser.add_argument("--index", type=int, required=True)
+    shard_parser.add_argument("--count", type=int, required=True)
+    shard_parser.add_argument("--fragment", required=True)
+    shard_parser.add_argument("--inflection-mode", choices=["full", "compact"], default="full")
+    shard_parser.add_argument("--merge-homographs", action="store_true")
+
+    merge_parser = commands.add_parser("merge", help="Merge fragments into the dictionary ZIP")
+    merge_parser.add_argument("fragments", nargs="+")
+    merge_parser.add_argument("--output", default="Folkets_Lexikon.zip")
+    merge_parser.add_argument("--previous-zip")
+    merge_parser.add_argument("--stable-banks", type=int, default=0)
+
+    local_parser = commands.add_parser("local", help="Run a sharded build with local processes as nodes")
+    local_parser.add_argument("--xml", default="folkets_sv_en_public.xml")
+    local_parser.add_argument("--shards", type=int, default=4)
+    local_parser.add_argument("--output", default="Folkets_Lexikon.zip")
+    local_parser.add_argument("--inflection-mode", choices=["full", "compact"], default="full")
+    local_parser.add_argument("--merge-homographs", action="store_true")
+    local_parser.add_argument("--previous-zip")
+    local_parser.add_argument("--stable-banks", type=int, default=0)
+
+    args = arg_parser.parse_args(argv)
+    if args.command == "prepare":
+        prepare(args.xml, args.snapshot)
+    elif args.command == "shard":
+        render_shard(args.snapshot, args.index, args.count, args.fragment, args.inflection_mode,
+                     args.merge_homographs)
+    elif args.command == "merge":
+        merge_fragments(args.fragments, args.output, args.previous_zip, args.stable_banks)
+    else:
+        run_local(args.xml, args.shards, args.output, args.inflection_mode, args.previous_zip, args.stable_banks,
+                  args.merge_homographs)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
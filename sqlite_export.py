@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+SQLite export - bulk-loads the processed lexicon into a queryable database
+with full-text indexes on translations and examples
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import time
+from typing import Dict, Iterator, List, Tuple
+
+from entry_processor import EntryNode
+from lexicon_snapshot import load_entry_nodes
+from pos_mapper import POSMapper
+
+
+SCHEMA = """
+CREATE TABLE entries (
+    id INTEGER PRIMARY KEY,
+    headword TEXT NOT NULL,
+    word_class TEXT,
+    pos TEXT,
+    lang TEXT,
+    phonetic TEXT,
+    sound_file TEXT,
+    grammar TEXT,
+    base_id INTEGER REFERENCES entries(id)
+);
+CREATE TABLE translations (
+    id INTEGER PRIMARY KEY,
+    entry_id INTEGER NOT NULL REFERENCES entries(id),
+    position INTEGER NOT NULL,
+    value TEXT NOT NULL
+);
+CREATE TABLE usage_notes (
+    id INTEGER PRIMARY KEY,
+    entry_id INTEGER NOT NULL REFERENCES entries(id),
+    position INTEGER NOT NULL,
+    value TEXT NOT NULL,
+    annotation INTEGER NOT NULL
+);
+CREATE TABLE examples (
+    id INTEGER PRIMARY KEY,
+    entry_id INTEGER NOT NULL REFERENCES entries(id),
+    position INTEGER NOT NULL,
+    swedish TEXT NOT NULL,
+    english TEXT
+);
+CREATE TABLE idioms (
+    id INTEGER PRIMARY KEY,
+    entry_id INTEGER NOT NULL REFERENCES entries(id),
+    position INTEGER NOT NULL,
+    swedish TEXT NOT NULL,
+    english TEXT
+);
+CREATE TABLE synonyms (
+    id INTEGER PRIMARY KEY,
+    entry_id INTEGER NOT NULL REFERENCES entries(id),
+    value TEXT NOT NULL,
+    level TEXT
+);
+"""
+
+# Secondary indexes are built after the load; maintaining them row by row is slower
+INDEXES = """
+CREATE INDEX entries_headword ON entries(headword COLLATE NOCASE);
+CREATE INDEX entries_base ON entries(base_id);
+CREATE INDEX translations_entry ON translations(entry_id);
+CREATE INDEX usage_notes_entry ON usage_notes(entry_id);
+CREATE INDEX examples_entry ON examples(entry_id);
+CREATE INDEX idioms_entry ON idioms(entry_id);
+CREATE INDEX synonyms_entry ON synonyms(entry_id);
+"""
+
+FULL_TEXT_INDEXES = """
+CREATE VIRTUAL TABLE translations_fts USING fts5(value, content='translations', content_rowid='id');
+CREATE VIRTUAL TABLE examples_fts USING fts5(swedish, english, content='examples', content_rowid='id');
+INSERT INTO translations_fts(translations_fts) VALUES('rebuild');
+INSERT INTO examples_fts(examples_fts) VALUES('rebuild');
+"""
+
+# Named lookups offered to internal services
+HEADWORD_QUERY = "SELECT id, headword, pos FROM entries WHERE headword = ? COLLATE NOCASE"
+INFLECTION_QUERY = """
+SELECT base.id, base.headword, base.pos FROM entries AS inflection
+JOIN entries AS base ON base.id = inflection.base_id
+WHERE inflection.headword = ? COLLATE NOCASE
+"""
+REVERSE_QUERY = """
+SELECT entries.id, entries.headword, translations.value FROM translations_fts
+JOIN translations ON translations.id = translations_fts.rowid
+JOIN entries ON entries.id = translations.entry_id
+WHERE translations_fts MATCH ? LIMIT 50
+"""
+
+
+class SQLiteExporter:
+    """Writes processed entry nodes to a SQLite database"""
+
+    def __init__(self, batch_size: int = 10000):
+        self.batch_size = batch_size
+        self.pos_mapper = POSMapper()
+
+    def export(self, entry_nodes_map: Dict[str, List[EntryNode]], db_path: str) -> Dict[str, float]:
+        """Load all entries in one transaction, then build indexes; returns phase timings"""
+        all_nodes = [node for node_list in entry_nodes_map.values() for node in node_list]
+        # Row ids follow node order, so base_form links can be resolved before insertion
+        node_ids = {id(node): entry_id for entry_id, node in enumerate(all_nodes, 1)}
+
+        temp_path = f"{db_path}.tmp"
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        connection = sqlite3.connect(temp_path, isolation_level=None)
+        timings = {}
+        try:
+            # The file is only moved into place once complete, so durability is not needed while loading
+            connection.execute("PRAGMA journal_mode = OFF")
+            connection.execute("PRAGMA synchronous = OFF")
+            connection.executescript(SCHEMA)
+
+            start = time.perf_counter()
+            connection.execute("BEGIN")
+            for batch_start in range(0, len(all_nodes), self.batch_size):
+                batch = all_nodes[batch_start:batch_start + self.batch_size]
+                self._insert_batch(connection, batch, batch_start + 1, node_ids)
+            connection.execute("COMMIT")
+            timings["load"] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            connection.executescript(INDEXES)
+            timings["indexes"] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            connection.executescript(FULL_TEXT_INDEXES)
+            timings["full_text"] = time.perf_counter() - start
+
+            connection.execute("ANALYZE")
+        finally:
+            connection.close()
+        os.replace(temp_path, db_path)
+
+        print(f"SQLite export: {len(all_nodes)} entries -> {db_path} "
+              f"(load {timings['load']:.2f}s, indexes {timings['indexes']:.2f}s, "
+              f"full-text {timings['full_text']:.2f}s)")
+        return timings
+
+    def _insert_batch(self, connection: sqlite3.Connection, batch: List[EntryNode],
+                      first_id: int, node_ids: Dict[int, int]) -> None:
+        """Insert one batch of nodes and their child rows with executemany"""
+        entries = []
+        translations = []
+        usage_notes = []
+        examples = []
+        idioms = []
+        synonyms = []
+        for entry_id, node in enumerate(batch, first_id):
+            entry = node.entry
+            base_id = node_ids.get(id(node.base_form)) if node.base_form else None
+            entries.append((entry_id, entry.headword, entry.word_class, self.pos_mapper.detect_pos(entry),
+                            entry.lang, entry.phonetic, entry.sound_file, entry.grammar, base_id))
+            translations.extend((entry_id, position, value) for position, value in enumerate(entry.translations))
+            # Source usage parts first, then processor annotations such as "inflected form of"
+            usage_notes.extend((entry_id, position, value, int(position >= len(entry.usage)))
+                               for position, value in enumerate(entry.usage + entry.usage_annotations))
+            examples.extend((entry_id, position, example.swedish, example.english)
+                            for position, example in enumerate(entry.examples))
+            idioms.extend((entry_id, position, idiom.swedish, idiom.english)
+                          for position, idiom in enumerate(entry.idioms))
+            synonyms.extend((entry_id, synonym.value, synonym.level) for synonym in entry.synonyms)
+
+        connection.executemany("INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", entries)
+        connection.executemany(
+            "INSERT INTO translations (entry_id, position, value) VALUES (?, ?, ?)", translations)
+        connection.executemany(
+            "INSERT INTO usage_notes (entry_id, position, value, annotation) VALUES (?, ?, ?, ?)", usage_notes)
+        connection.executemany(
+            "INSERT INTO examples (entry_id, position, swedish, english) VALUES (?, ?, ?, ?)", examples)
+        connection.executemany(
+            "INSERT INTO idioms (entry_id, position, swedish, english) VALUES (?, ?, ?, ?)", idioms)
+        connection.executemany(
+            "INSERT INTO synonyms (entry_id, value, level) VALUES (?, ?, ?)", synonyms)
+
+
+def _fts_phrase(text: str) -> str:
+    """Quote a search term as an FTS5 phrase so punctuation is not parsed as query syntax"""
+    return '"' + text.replace('"', '""') + '"'
+
+
+def benchmark_lookups(db_path: str, samples: int = 1000, seed: int = 1) -> Dict[str, float]:
+    """Average milliseconds per headword, inflection and reverse (English) lookup"""
+    connection = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        rng = random.Random(seed)
+        headwords = [row[0] for row in connection.execute("SELECT headword FROM entries")]
+        inflections = [row[0] for row in connection.execute(
+            "SELECT headword FROM entries WHERE base_id IS NOT NULL")] or headwords
+        english = [row[0] for row in connection.execute("SELECT value FROM translations")]
+
+        queries: List[Tuple[str, str, List[str]]] = [
+            ("headword", HEADWORD_QUERY, [rng.choice(headwords) for _ in range(samples)]),
+            ("inflection", INFLECTION_QUERY, [rng.choice(inflections) for _ in range(samples)]),
+            ("reverse", REVERSE_QUERY, [_fts_phrase(rng.choice(english)) for _ in range(samples)]),
+        ]
+        results = {}
+        for name, query, terms in queries:
+            start = time.perf_counter()
+            for term in terms:
+                connection.execute(query, (term,)).fetchall()
+            results[name] = (time.perf_counter() - start) / samples * 1000
+        return results
+    finally:
+        connection.close()
+
+
+def iter_table_counts(db_path: str) -> Iterator[Tuple[str, int]]:
+    """Row count of each exported table"""
+    connection = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        for table in ("entries", "translations", "usage_notes", "examples", "idioms", "synonyms"):
+            yield table, connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    finally:
+        connection.close()
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Export Folkets Lexikon to SQLite")
+    arg_parser.add_argument("--xml", default="folkets_sv_en_public.xml")
+    arg_parser.add_argument("--db", default="folkets_lexikon.sqlite")
+    arg_parser.add_argument("--cache-dir", default=".lexicon_cache")
+    arg_parser.add_argument("--batch-size", type=int, default=10000, help="Nodes per executemany batch")
+    arg_parser.add_argument("--benchmark", action="store_true", help="Time sample lookups after the export")
+    args = arg_parser.parse_args(argv)
+
+    start = time.perf_counter()
+    entry_nodes_map = load_entry_nodes(args.xml, args.cache_dir)
+    print(f"Loaded lexicon in {time.perf_counter() - start:.2f}s")
+
+    SQLiteExporter(args.batch_size).export(entry_nodes_map, args.db)
+    for table, count in iter_table_counts(args.db):
+        print(f"  {table:<13} {count:>8} rows")
+
+    if args.benchmark:
+        print("\n=== Lookup Benchmark ===")
+        for name, milliseconds in benchmark_lookups(args.db).items():
+            print(f"{name:<11} {milliseconds:.3f} ms/lookup")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Interned string table - one contiguous UTF-8 buffer addressed by integer ids
+The buffer can be memory-mapped and shared read-only between processes
+"""
+
+from array import array
+from typing import Dict, List, Optional
+
+
+NO_STRING = -1
+
+
+class StringTableBuilder:
+    """Interns strings into a contiguous UTF-8 buffer with an offset column"""
+
+    def __init__(self):
+        self.string_ids: Dict[str, int] = {}
+        self.offsets = array('I', [0])
+        self.data = bytearray()
+
+    def __len__(self) -> int:
+        return len(self.string_ids)
+
+    def intern(self, value: Optional[str]) -> int:
+        """Return the id of a value, adding it to the table if needed"""
+        if value is None:
+            return NO_STRING
+        string_id = self.string_ids.get(value)
+        if string_id is None:
+            string_id = len(self.string_ids)
+            self.string_ids[value] = string_id
+            self.data += value.encode('utf-8')
+            self.offsets.append(len(self.data))
+        return string_id
+
+
+class StringTable:
+    """Read-only string table over offset and data buffers (arrays, memoryviews or mmaps)"""
+
+    def __init__(self, offsets, data):
+        self.offsets = offsets
+        self.data = data
+        self._strings: List[Optional[str]] = [None] * (len(offsets) - 1)
+
+    def __len__(self) -> int:
+        return len(self._strings)
+
+    def get(self, string_id: int) -> Optional[str]:
+        """Decode a string by id, returning one shared str object per id"""
+        if string_id == NO_STRING:
+            return None
+        value = self._strings[string_id]
+        if value is None:
+            value = str(self.data[self.offsets[string_id]:self.offsets[string_id + 1]], 'utf-8')
+            self._strings[string_id] = value
+        return value
+
+    def decode_all(self) -> List[str]:
+        """Decode every string at once, e.g. before bulk loading"""
+        offsets = self.offsets.tolist()
+        data = bytes(self.data)
+        self._strings = [
+            str(data[offsets[i]:offsets[i + 1]], 'utf-8') for i in range(len(offsets) - 1)
+        ]
+        return self._strings
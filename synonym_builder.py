@@ -6,26 +6,27 @@ Handles: synonyms formatting
 
 from typing import List, Dict, Optional
 from models import FolketsEntry
+from derived_attributes import DerivedAttributes
+from pos_mapper import POSMapper
 
 
 class SynonymBuilder:
     """Builds synonym section"""
     
+    def __init__(self, attributes: Optional[DerivedAttributes] = None):
+        self.attributes = attributes or DerivedAttributes(POSMapper())
+    
     def build_synonyms_section(self, entry: FolketsEntry) -> Optional[Dict]:
         """Build synonyms section"""
         if not entry.synonyms:
             return None
             
-        synonym_items = []
-        for synonym in entry.synonyms:
-            synonym_text = synonym.value
-            if synonym.level:
-                synonym_text += f" ({synonym.level})"
-            synonym_items.append(synonym_text)
+        synonym_items = [(synonym.value, f" ({synonym.level})" if synonym.level else "")
+                         for synonym in entry.synonyms]
         
         return {
             "tag": "div",
-            "content": [f"Synonyms: {', '.join(synonym_items)}"],
+            "content": self.attributes.reference_content("Synonyms: ", synonym_items, entry.word_class),
             "style": {
                 "color": "#22c55e",
                 "fontSize": "0.9em",
@@ -34,24 +35,21 @@ class SynonymBuilder:
             }
         }
     
-    def build_base_synonyms_section(self, synonyms: List, max_synonyms: int = 5) -> Optional[Dict]:
+    def build_base_synonyms_section(self, synonyms: List, max_synonyms: int = 5,
+                                    word_class: str = "") -> Optional[Dict]:
         """Build base form synonyms section"""
         if not synonyms:
             return None
             
-        synonym_items = []
-        for synonym in synonyms[:max_synonyms]:
-            synonym_text = synonym.value
-            if synonym.level:
-                synonym_text += f" ({synonym.level})"
-            synonym_items.append(synonym_text)
+        synonym_items = [(synonym.value, f" ({synonym.level})" if synonym.level else "")
+                         for synonym in synonyms[:max_synonyms]]
         
         if not synonym_items:
             return None
         
         return {
             "tag": "div",
-            "content": [f"Base synonyms: {', '.join(synonym_items)}"],
+            "content": self.attributes.reference_content("Base synonyms: ", synonym_items, word_class),
             "style": {
                 "color": "#16a34a",
                 "fontSize": "0.85em",
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Tests for term row validation
+"""
+
+import copy
+
+import pytest
+
+from bank_validator import check_term_row
+from cross_references import search_link
+from models import Example, FolketsEntry, Synonym
+from yomitan_converter import YomitanConverter
+
+CONTENT = [
+    {"tag": "div", "style": {"fontWeight": "bold", "marginTop": 0.5}, "content": "hund"},
+    {"tag": "div", "data": {"audio": "audio/abc.mp3"}, "content": "[hʊnd]"},
+    {"tag": "ul", "content": [{"tag": "li", "content": ["Synonymer: ", search_link("vovve", "vovve")]}]},
+]
+VALID_ROW = ["hund", "", "n", "", 0, [{"type": "structured-content", "content": CONTENT}], 1, ""]
+
+
+def row_with(index, value):
+    row = copy.deepcopy(VALID_ROW)
+    row[index] = value
+    return row
+
+
+def content_row(node):
+    return row_with(5, [{"type": "structured-content", "content": [node]}])
+
+
+def test_valid_row_passes_and_collects_audio():
+    media = set()
+    assert check_term_row(VALID_ROW, media) is None
+    assert media == {"audio/abc.mp3"}
+
+
+def test_plain_and_deinflection_definitions_pass():
+    assert check_term_row(row_with(5, ["dog", ["hund", []]]), set()) is None
+
+
+def test_converter_rows_pass():
+    converter = YomitanConverter(serialize_workers=1, compress_workers=1)
+    entry = FolketsEntry("hund", "nn", translations=["dog"], inflections=["hunden", "hundar"],
+                         examples=[Example("en stor hund", "a big dog")], synonyms=[Synonym("vovve", "4.0")])
+    rows = [row for node_list in converter.entry_processor.process_entries([entry]).values()
+            for row in converter.convert_node_run(node_list)]
+    assert len(rows) == 3
+    for row in rows:
+        assert check_term_row(row, set()) is None, row
+
+
+@pytest.mark.parametrize("row, problem", [
+    ({"term": "hund"}, "row is not an 8-item array"),
+    (VALID_ROW[:7], "row is not an 8-item array"),
+    (row_with(0, ""), "empty or non-string term"),
+    (row_with(0, None), "empty or non-string term"),
+    (row_with(2, ["n"]), "reading, tags and rules must be strings"),
+    (row_with(4, "10"), "score is not an integer"),
+    (row_with(4, True), "score is not an integer"),
+    (row_with(6, 0), "sequence is not a positive integer"),
+    (row_with(6, 1.0), "sequence is not a positive integer"),
+    (row_with(5, []), "no definitions"),
+    (row_with(5, [{"type": "text", "text": "dog"}]), "definitions[0]: not a structured-content definition"),
+    (row_with(5, ["dog", ["hund"]]), "definitions[1]: malformed deinflection definition"),
+    (row_with(5, [["", []]]), "definitions[0]: malformed deinflection definition"),
+    (row_with(5, [42]), "definitions[0]: unsupported definition type"),
+    (content_row({"tag": "script", "content": "x"}), "definitions[0].content[0]: unsupported tag 'script'"),
+    (content_row({"tag": "div", "class": "x"}), "definitions[0].content[0]: unsupported keys ['class']"),
+    (content_row({"tag": "div", "style": {"float": "left"}}),
+     "definitions[0].content[0].style: unsupported properties ['float']"),
+    (content_row({"tag": "div", "style": {"fontSize": None}}),
+     "definitions[0].content[0].style.fontSize: not a string or number"),
+    (content_row({"tag": "div", "data": {"n": 1}}), "definitions[0].content[0].data: values must be strings"),
+    (content_row({"tag": "a", "content": "x"}), "definitions[0].content[0]: link without an href"),
+    (content_row({"tag": "ul", "content": [{"tag": "li", "content": ["a", 5]}]}),
+     "definitions[0].content[0].content[0].content[1]: int is not a string, list or element"),
+])
+def test_bad_rows_are_rejected_with_their_first_problem(row, problem):
+    assert check_term_row(row, set()) == problem
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Tests for the streaming build pipeline's failure handling and bottleneck report
+"""
+
+import zipfile
+
+import pytest
+
+from build_pipeline import BuildPipeline, StageMetrics
+from entry_processor import EntryProcessor
+from models import FolketsEntry
+from yomitan_converter import YomitanConverter
+
+
+def sample_nodes():
+    return EntryProcessor().process_entries([
+        FolketsEntry(f"ord{i:03d}", "nn", translations=["word"], inflections=[f"ord{i:03d}en"]) for i in range(50)
+    ])
+
+
+def test_pipeline_writes_the_zip(tmp_path):
+    zip_path = tmp_path / "dict.zip"
+    BuildPipeline(YomitanConverter(serialize_workers=1, compress_workers=1), chunk_size=10).run(
+        sample_nodes(), str(zip_path))
+    with zipfile.ZipFile(zip_path) as zipf:
+        assert "term_bank_1.json" in zipf.namelist()
+    assert [path.name for path in tmp_path.iterdir()] == ["dict.zip"]
+
+
+def test_failed_stage_removes_the_temporary_zip(tmp_path):
+    converter = YomitanConverter(serialize_workers=1, compress_workers=1)
+
+    def fail(nodes):
+        raise RuntimeError("render failed")
+    converter.convert_node_run = fail
+
+    with pytest.raises(RuntimeError, match="render failed"):
+        BuildPipeline(converter, chunk_size=10).run(sample_nodes(), str(tmp_path / "dict.zip"))
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_bottleneck_is_not_a_stage_waiting_for_input(capsys):
+    class Stage:
+        def __init__(self, metrics):
+            self.metrics = metrics
+
+    pipeline = BuildPipeline(YomitanConverter())
+    # compress is busy slightly longer, but only because it waited on serialize for most of the run
+    pipeline.stages = [
+        Stage(StageMetrics("serialize", total_time=10.0, input_stall=1.0, output_stall=0.5)),
+        Stage(StageMetrics("compress", total_time=18.0, input_stall=8.0)),
+    ]
+    pipeline.report()
+    assert "Bottleneck stage: serialize" in capsys.readouterr().out
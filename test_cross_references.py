@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Tests for cross reference resolution and Yomitan search links
+"""
+
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from cross_references import CrossReferenceIndex, search_link
+from entry_processor import EntryNode
+from models import FolketsEntry, SeeAlso, Synonym, Variant
+
+
+@pytest.mark.parametrize("headword, query", [
+    ("hund", "hund"),
+    ("gå ut", "g%C3%A5%20ut"),
+    ("A & B", "A%20%26%20B"),
+    ("och/eller", "och%2Feller"),
+    ("vad?", "vad%3F"),
+    ("a=b#c", "a%3Db%23c"),
+    ("100%", "100%25"),
+    ("e-post", "e-post"),
+])
+def test_search_link_escapes_the_whole_headword(headword, query):
+    link = search_link(headword, "text")
+    assert link == {"tag": "a", "href": f"?query={query}&wildcards=off", "content": "text"}
+    # The query parameter decodes back to the headword, and nothing leaks into other parameters
+    assert parse_qs(urlparse(link["href"]).query) == {"query": [headword], "wildcards": ["off"]}
+
+
+def entry_nodes_map(*entries):
+    nodes = {}
+    for entry in entries:
+        nodes.setdefault(entry.headword, []).append(EntryNode(entry=entry))
+    return nodes
+
+
+def test_references_resolve_only_to_existing_headwords():
+    index = CrossReferenceIndex.build(entry_nodes_map(
+        FolketsEntry("hund", "nn", synonyms=[Synonym("vovve"), Synonym("jycke")],
+                     variants=[Variant("hundar")], see_also=[SeeAlso("katt..1", "saldo"), SeeAlso("x.html", "url")]),
+        FolketsEntry("vovve", "nn"),
+        FolketsEntry("katt", "nn"),
+    ))
+    assert index.target("vovve", "nn") == "vovve"
+    assert index.target("jycke", "nn") is None
+    assert index.target("hundar", "nn") is None
+    assert index.see_also_targets(FolketsEntry("hund", see_also=[SeeAlso("katt..1", "saldo"),
+                                                                 SeeAlso("katt", ""), SeeAlso("hund", "")])) == ["katt"]
+
+
+def test_same_class_matching_requires_the_referring_word_class():
+    index = CrossReferenceIndex.build(entry_nodes_map(
+        FolketsEntry("springa", "vb", synonyms=[Synonym("lopp")]),
+        FolketsEntry("löpning", "nn", synonyms=[Synonym("lopp")]),
+        FolketsEntry("lopp", "nn"),
+    ), match_word_class=True)
+    assert index.target("lopp", "vb") is None
+    assert index.target("lopp", "nn") == "lopp"
+
+
+def test_reference_content_links_resolved_values_and_keeps_suffixes():
+    index = CrossReferenceIndex({("vovve", ""): "vovve", ("A & B", ""): "A & B"})
+    content = index.reference_content("Synonymer: ", [("vovve", " (3.5)"), ("jycke", ""), ("A & B", "")], "nn")
+    assert content == [
+        "Synonymer: ",
+        search_link("vovve", "vovve"),
+        " (3.5), jycke, ",
+        search_link("A & B", "A & B"),
+    ]
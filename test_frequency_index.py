@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+Tests for frequency counts, row scores and the term_meta frequencies
+"""
+
+from entry_processor import EntryProcessor
+from frequency_index import FrequencyIndex
+from models import Example, FolketsEntry
+
+
+def sample_nodes():
+    return EntryProcessor().process_entries([
+        FolketsEntry("hund", "nn", translations=["dog"], inflections=["hunden", "hundar"],
+                     examples=[Example("hunden och hundar"), Example("hundar och hundarna")]),
+        FolketsEntry("katt", "nn", translations=["cat"], examples=[Example("katt och hund")]),
+        FolketsEntry("tom", "nn"),
+    ])
+
+
+def test_lemma_counts_include_inflections():
+    index = FrequencyIndex.build(sample_nodes())
+    assert index.form_counts == {"hunden": 1, "hundar": 2, "katt": 1, "hund": 1}
+    assert index.lemma_counts == {"hund": 4, "hunden": 1, "hundar": 2, "katt": 1}
+
+
+def test_term_meta_shows_the_row_scores():
+    entry_nodes_map = sample_nodes()
+    index = FrequencyIndex.build(entry_nodes_map)
+    # hund is scored by all its forms, not by the one bare "hund" token
+    assert index.term_meta == [["hund", "freq", 4], ["hundar", "freq", 2], ["hunden", "freq", 1], ["katt", "freq", 1]]
+    for headword, _, frequency in index.term_meta:
+        assert frequency == max(index.score(node) for node in entry_nodes_map[headword])
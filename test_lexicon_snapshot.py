@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Tests for the lexicon snapshot cache key and round trips
+"""
+
+import lexicon_snapshot
+from entry_processor import EntryProcessor
+from lexicon_snapshot import LexiconSnapshot
+from models import FolketsEntry, Synonym
+
+XML = ('<?xml version="1.0" encoding="UTF-8"?>\n<dictionary>\n'
+       '<word value="hund" lang="sv" class="nn"><translation value="dog"/>'
+       '<paradigm><inflection value="hunden"/></paradigm></word>\n</dictionary>\n')
+
+
+def sample_nodes():
+    return EntryProcessor().process_entries([
+        FolketsEntry("hund", "nn", translations=["dog"], inflections=["hunden"], synonyms=[Synonym("vovve", "4.0")]),
+    ])
+
+
+def test_snapshot_round_trip(tmp_path):
+    snapshot = LexiconSnapshot(str(tmp_path))
+    nodes = sample_nodes()
+    snapshot.save("k" * 64, nodes)
+    loaded = snapshot.load("k" * 64)
+    assert {headword: [node.entry for node in node_list] for headword, node_list in loaded.items()} == \
+           {headword: [node.entry for node in node_list] for headword, node_list in nodes.items()}
+    assert loaded["hunden"][0].base_form is loaded["hund"][0]
+
+
+def test_cache_key_changes_with_the_processing_code(tmp_path, monkeypatch):
+    xml_path = tmp_path / "lexicon.xml"
+    xml_path.write_text(XML, encoding='utf-8')
+    snapshot = LexiconSnapshot(str(tmp_path / "cache"))
+    key = snapshot.cache_key(str(xml_path))
+    assert key == snapshot.cache_key(str(xml_path))
+    snapshot.save(key, sample_nodes())
+    assert snapshot.load(key) is not None
+
+    monkeypatch.setattr(lexicon_snapshot, "processing_version", lambda: "changed parser")
+    changed_key = snapshot.cache_key(str(xml_path))
+    assert changed_key != key
+    assert snapshot.load(changed_key) is None
+    assert snapshot.open(changed_key) is None
+
+
+def test_open_rejects_a_snapshot_of_another_key(tmp_path):
+    snapshot = LexiconSnapshot(str(tmp_path))
+    snapshot.save("a" * 64, sample_nodes())
+    # Same 16-character file name prefix, different full key
+    assert snapshot.open("a" * 16 + "b" * 48) is None
+    reader = snapshot.open("a" * 64)
+    assert reader.get_entry(0).headword == "hund"
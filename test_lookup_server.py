@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Tests for the lookup server's request handling
+"""
+
+import json
+import threading
+
+import pytest
+
+from entry_processor import EntryProcessor
+from lookup_server import (LexiconIndex, LookupService, MAX_PREFIX_LIMIT, UnixHTTPConnection, create_server)
+from models import FolketsEntry
+
+
+@pytest.fixture(scope="module")
+def server(tmp_path_factory):
+    entries = [FolketsEntry(f"ord{i:04d}", "nn", translations=["word"]) for i in range(1200)]
+    service = LookupService(LexiconIndex(EntryProcessor().process_entries(entries)), 64)
+    socket_path = str(tmp_path_factory.mktemp("lookup") / "lookup.sock")
+    httpd = create_server(service, socket_path=socket_path)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield socket_path
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def get(socket_path, path):
+    conn = UnixHTTPConnection(socket_path)
+    try:
+        conn.request("GET", path)
+        response = conn.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        conn.close()
+
+
+@pytest.mark.parametrize("query", ["q=ord", "q=ord&limit="])
+def test_prefix_default_limit(server, query):
+    status, body = get(server, f"/prefix?{query}")
+    assert status == 200 and len(body["forms"]) == 20
+
+
+@pytest.mark.parametrize("limit, count", [("5", 5), ("0", 1), ("-3", 1), ("100000", MAX_PREFIX_LIMIT)])
+def test_prefix_limit_is_clamped(server, limit, count):
+    status, body = get(server, f"/prefix?q=ord&limit={limit}")
+    assert status == 200 and len(body["forms"]) == count
+
+
+@pytest.mark.parametrize("limit", ["abc", "1.5", "1e3"])
+def test_prefix_rejects_non_integer_limits(server, limit):
+    status, body = get(server, f"/prefix?q=ord&limit={limit}")
+    assert status == 400 and "limit" in body["error"]
+    # The connection handling survives and later requests still work
+    assert get(server, "/prefix?q=ord&limit=2")[1]["forms"] == ["ord0000", "ord0001"]
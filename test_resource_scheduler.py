@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Tests for cgroup v1/v2 limit detection against fake cgroup trees and pool size overrides
+"""
+
+import argparse
+import os
+
+import pytest
+
+from resource_scheduler import ResourceLimits, _cgroup_paths, detect_limits, plan_workers, positive_int
+
+GIB = 1024 ** 3
+
+
+def write_files(root, files):
+    for relative_path, text in files.items():
+        path = os.path.join(root, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(text + "\n")
+
+
+def fake_cgroup(tmp_path, proc_lines, files):
+    """Cgroup root and /proc/self/cgroup file for a fake hierarchy"""
+    root = str(tmp_path / "cgroup")
+    os.makedirs(root, exist_ok=True)
+    write_files(root, files)
+    proc_cgroup = str(tmp_path / "proc_cgroup")
+    with open(proc_cgroup, 'w') as f:
+        f.write("\n".join(proc_lines) + "\n")
+    return root, proc_cgroup
+
+
+def test_v2_paths_use_the_nested_unified_cgroup(tmp_path):
+    root, proc_cgroup = fake_cgroup(tmp_path, ["0::/build.slice/job"], {"build.slice/job/cpu.max": "max 100000"})
+    assert _cgroup_paths(root, proc_cgroup) == {"": os.path.join(root, "build.slice/job")}
+
+
+def test_v2_quota_and_memory_limit(tmp_path):
+    root, proc_cgroup = fake_cgroup(tmp_path, ["0::/build.slice/job"], {
+        "build.slice/job/cpu.max": "150000 100000",
+        "build.slice/job/memory.max": str(2 * GIB),
+        "build.slice/job/memory.current": str(GIB // 2),
+    })
+    limits = detect_limits(root, proc_cgroup)
+    assert limits.quota_cpus == 1.5
+    assert limits.memory_limit == 2 * GIB
+    assert limits.available_memory <= 2 * GIB - GIB // 2
+
+
+def test_v2_without_limits(tmp_path):
+    root, proc_cgroup = fake_cgroup(tmp_path, ["0::/"], {"cpu.max": "max 100000", "memory.max": "max"})
+    limits = detect_limits(root, proc_cgroup)
+    assert limits.quota_cpus is None
+    assert limits.memory_limit is None
+
+
+def test_v1_paths_map_every_controller_of_a_hierarchy(tmp_path):
+    root, proc_cgroup = fake_cgroup(tmp_path, ["4:cpu,cpuacct:/docker/abc", "9:memory:/docker/abc"], {
+        "cpu/docker/abc/cpu.cfs_quota_us": "-1",
+        "memory/docker/abc/memory.limit_in_bytes": str(GIB),
+    })
+    assert _cgroup_paths(root, proc_cgroup) == {
+        "cpu": os.path.join(root, "cpu/docker/abc"),
+        # No cpuacct directory in the fake tree, so it falls back to the controller root
+        "cpuacct": os.path.join(root, "cpuacct"),
+        "memory": os.path.join(root, "memory/docker/abc"),
+    }
+
+
+def test_v1_quota_and_memory_limit(tmp_path):
+    root, proc_cgroup = fake_cgroup(tmp_path, ["4:cpu,cpuacct:/docker/abc", "9:memory:/docker/abc"], {
+        "cpu/docker/abc/cpu.cfs_quota_us": "250000",
+        "cpu/docker/abc/cpu.cfs_period_us": "100000",
+        "memory/docker/abc/memory.limit_in_bytes": str(GIB),
+        "memory/docker/abc/memory.usage_in_bytes": str(GIB // 4),
+    })
+    limits = detect_limits(root, proc_cgroup)
+    assert limits.quota_cpus == 2.5
+    assert limits.memory_limit == GIB
+    assert limits.available_memory <= GIB - GIB // 4
+
+
+def test_v1_hidden_nested_directory_falls_back_to_the_controller_root(tmp_path):
+    # Inside a cgroup namespace the host path in /proc/self/cgroup does not exist
+    root, proc_cgroup = fake_cgroup(tmp_path, ["4:cpu:/docker/abc", "9:memory:/docker/abc"], {
+        "cpu/cpu.cfs_quota_us": "100000",
+        "cpu/cpu.cfs_period_us": "100000",
+        "memory/memory.limit_in_bytes": str(GIB),
+    })
+    assert _cgroup_paths(root, proc_cgroup)["cpu"] == os.path.join(root, "cpu")
+    limits = detect_limits(root, proc_cgroup)
+    assert limits.quota_cpus == 1.0
+    assert limits.memory_limit == GIB
+
+
+def test_v1_without_limits(tmp_path):
+    # No quota is -1; no memory limit is a huge page-aligned number
+    root, proc_cgroup = fake_cgroup(tmp_path, ["4:cpu:/", "9:memory:/"], {
+        "cpu/cpu.cfs_quota_us": "-1",
+        "cpu/cpu.cfs_period_us": "100000",
+        "memory/memory.limit_in_bytes": "9223372036854771712",
+    })
+    limits = detect_limits(root, proc_cgroup)
+    assert limits.quota_cpus is None
+    assert limits.memory_limit is None
+
+
+def test_missing_proc_cgroup_means_no_cgroup_limits(tmp_path):
+    assert _cgroup_paths(str(tmp_path), str(tmp_path / "missing")) == {}
+    limits = detect_limits(str(tmp_path), str(tmp_path / "missing"))
+    assert limits.quota_cpus is None
+    assert limits.memory_limit is None
+
+
+def test_fractional_quota_rounds_down_but_keeps_one_cpu():
+    assert ResourceLimits(8, quota_cpus=2.5).cpus == 2
+    assert ResourceLimits(8, quota_cpus=0.5).cpus == 1
+    assert ResourceLimits(2, quota_cpus=4.0).cpus == 2
+
+
+def test_overrides_replace_detected_sizes():
+    plan = plan_workers(ResourceLimits(4), {"render": 3, "compress": None})
+    assert (plan.render, plan.reasons["render"]) == (3, "command line")
+    assert plan.compress == 4 and plan.reasons["compress"] != "command line"
+
+
+@pytest.mark.parametrize("size", [0, -1])
+def test_non_positive_overrides_are_rejected(size):
+    with pytest.raises(ValueError, match="render workers must be a positive integer"):
+        plan_workers(ResourceLimits(4), {"render": size})
+
+
+@pytest.mark.parametrize("value", ["0", "-2", "x"])
+def test_positive_int_rejects_other_values(value):
+    with pytest.raises((argparse.ArgumentTypeError, ValueError)):
+        positive_int(value)
+    assert positive_int("2") == 2
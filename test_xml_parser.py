@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Tests for splitting the XML into <word> byte ranges for parallel parsing
+"""
+
+import pytest
+
+from xml_parser import FolketsXMLParser, WORD_START
+
+HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n<dictionary source-language="sv" target-language="en">\n'
+FOOTER = '</dictionary>\n'
+
+
+def write_lexicon(tmp_path, words, header=HEADER, encoding="utf-8"):
+    body = "".join(f'<word value="{word}" lang="sv" class="nn"><translation value="t{index}"/></word>\n'
+                   for index, word in enumerate(words))
+    path = tmp_path / "lexicon.xml"
+    path.write_bytes((header + body + FOOTER).encode(encoding))
+    return str(path), path.read_bytes()
+
+
+@pytest.mark.parametrize("chunk_count", [1, 2, 3, 7, 50])
+def test_ranges_cover_every_word_exactly_once(tmp_path, chunk_count):
+    path, data = write_lexicon(tmp_path, [f"ord{i}" for i in range(20)])
+    ranges, encoding = FolketsXMLParser().split_word_ranges(path, chunk_count)
+
+    assert encoding == "UTF-8"
+    assert 1 <= len(ranges) <= min(chunk_count, 20)
+    assert ranges[0][0] == data.find(WORD_START)
+    assert ranges[-1][1] == data.rfind(b"</dictionary>")
+    for (_, end), (start, _) in zip(ranges, ranges[1:]):
+        assert end == start
+    for start, end in ranges:
+        assert start < end
+        assert data[start:start + len(WORD_START)] == WORD_START
+    assert sum(data[start:end].count(WORD_START) for start, end in ranges) == 20
+
+
+def test_more_chunks_than_words_gives_one_range_per_word(tmp_path):
+    path, data = write_lexicon(tmp_path, ["a", "b", "c"])
+    ranges, _ = FolketsXMLParser().split_word_ranges(path, 10)
+    assert [data[start:end].count(WORD_START) for start, end in ranges] == [1, 1, 1]
+
+
+def test_boundaries_skip_word_start_text_inside_a_range(tmp_path):
+    # A long word shifts the even split point into its middle; the boundary moves to the next <word
+    path, data = write_lexicon(tmp_path, ["x" * 5000, "kort", "ord"])
+    ranges, _ = FolketsXMLParser().split_word_ranges(path, 2)
+    assert len(ranges) == 2
+    assert data[ranges[1][0]:].startswith(b'<word value="kort"')
+
+
+def test_no_words_gives_no_ranges(tmp_path):
+    path, _ = write_lexicon(tmp_path, [])
+    assert FolketsXMLParser().split_word_ranges(path, 4) == ([], "UTF-8")
+
+
+def test_encoding_from_declaration_and_default(tmp_path):
+    latin1_header = HEADER.replace("UTF-8", "ISO-8859-1")
+    path, _ = write_lexicon(tmp_path, ["hälsa"], header=latin1_header, encoding="latin-1")
+    assert FolketsXMLParser().split_word_ranges(path, 2)[1] == "ISO-8859-1"
+
+    path, _ = write_lexicon(tmp_path, ["hälsa"], header='<dictionary>\n')
+    assert FolketsXMLParser().split_word_ranges(path, 2)[1] == "utf-8"
+
+
+def test_parallel_parse_matches_serial_parse(tmp_path):
+    path, _ = write_lexicon(tmp_path, [f"ord{i}" for i in range(30)])
+    parser = FolketsXMLParser()
+    serial = [(entry.headword, entry.translations) for entry in parser.parse_xml(path)]
+    parallel = [(entry.headword, entry.translations) for entry in parser.parse_xml_parallel(path, workers=3)]
+    assert parallel == serial
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Tests for the per-chunk render context handed to render workers and compact pointer rows
+"""
+
+import pickle
+
+from audio_bundle import AudioBundle
+from cross_references import CrossReferenceIndex
+from entry_processor import EntryProcessor
+from frequency_index import FrequencyIndex
+from models import FolketsEntry, SeeAlso, Synonym, Variant
+from yomitan_converter import YomitanConverter
+
+
+def sample_nodes():
+    return EntryProcessor().process_entries([
+        FolketsEntry("hund", "nn", translations=["dog"], inflections=["hunden", "hundar"], sound_file="hund.swf",
+                     synonyms=[Synonym("vovve", "4.0")], see_also=[SeeAlso("katt..1", "saldo")]),
+        FolketsEntry("vovve", "nn", translations=["doggy"], variants=[Variant("hund")]),
+        FolketsEntry("katt", "nn", translations=["cat"], sound_file="katt.swf"),
+    ])
+
+
+def indexed_converter(entry_nodes_map):
+    frequency_index = FrequencyIndex({"hund": 3, "hunden": 2, "katt": 1}, {"hund": 5, "katt": 1}, [])
+    audio_bundle = AudioBundle({"hund.swf": "audio/aa.mp3", "katt.swf": "audio/bb.mp3"}, {})
+    return YomitanConverter(frequency_index=frequency_index, audio_bundle=audio_bundle,
+                            cross_references=CrossReferenceIndex.build(entry_nodes_map))
+
+
+def test_rendered_entries_include_base_forms_once():
+    entry_nodes_map = sample_nodes()
+    inflections = entry_nodes_map["hunden"] + entry_nodes_map["hundar"]
+    entries = YomitanConverter.rendered_entries(inflections)
+    assert [entry.headword for entry in entries] == ["hunden", "hund", "hundar"]
+
+
+def test_chunk_context_renders_like_the_whole_indexes():
+    entry_nodes_map = sample_nodes()
+    for headword in ("hunden", "vovve"):
+        converter = indexed_converter(entry_nodes_map)
+        nodes = entry_nodes_map[headword]
+        expected = converter.convert_node_run(nodes)
+
+        worker = YomitanConverter(**converter.worker_options())
+        worker.use_render_context(pickle.loads(pickle.dumps(converter.render_context(nodes))))
+        assert worker.convert_node_run(nodes) == expected
+
+
+def test_chunk_context_holds_only_what_the_chunk_reads():
+    entry_nodes_map = sample_nodes()
+    converter = indexed_converter(entry_nodes_map)
+    frequency_index, audio_bundle, cross_references = converter.render_context(entry_nodes_map["vovve"])
+    assert frequency_index.lemma_counts == {} and frequency_index.term_meta == []
+    assert audio_bundle.members == {} and audio_bundle.member_paths == {}
+    assert cross_references.targets == {("hund", ""): "hund"}
+
+
+def test_context_without_indexes_is_empty():
+    assert YomitanConverter().render_context(sample_nodes()["hund"]) == (None, None, None)
+
+
+def test_only_inflections_without_own_content_become_pointer_rows():
+    entry_nodes_map = EntryProcessor().process_entries([
+        FolketsEntry("hund", "nn", translations=["dog"], inflections=["hunden", "hundar", "hundars"]),
+        FolketsEntry("hundar", "nn", grammar="plural"),
+        FolketsEntry("hundars", "nn", variants=[Variant("hundarnas")]),
+    ])
+    converter = YomitanConverter(inflection_mode="compact")
+    assert converter.convert_node_run(entry_nodes_map["hunden"])[0][5] == [["hund", []]]
+    for headword in ("hundar", "hundars"):
+        node = entry_nodes_map[headword][0]
+        assert node.base_form is entry_nodes_map["hund"][0]
+        assert not YomitanConverter.is_pointer_node(node)
+        assert converter.convert_node_run([node])[0][5][0]["type"] == "structured-content"
+    assert converter.generate_inflection_index(
+        [node for node_list in entry_nodes_map.values() for node in node_list]) == [["hunden", "hund", "noun"]]
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Tests for raw ZIP member copies and previous-ZIP member reuse
+"""
+
+import io
+import json
+import zipfile
+
+import zip_reuse
+from zip_reuse import MANIFEST_MEMBER, ZipMemberReuse, deflate_member, read_raw_member, write_raw_member
+
+MEMBERS = {
+    "term_bank_1.json": json.dumps([["hund", "", "n", "", 0, ["dog"], 1, ""]] * 200).encode('utf-8'),
+    "tag_bank_1.json": b"[]",
+    "empty.json": b"",
+}
+
+
+class UnseekableWriter(io.RawIOBase):
+    """Write-only stream without seek, so zipfile writes data descriptors"""
+
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.buffer += data
+        return len(data)
+
+
+def copy_raw(source_path, target_path):
+    with zipfile.ZipFile(source_path) as source, zipfile.ZipFile(target_path, 'w') as target:
+        for info in source.infolist():
+            write_raw_member(target, info, read_raw_member(source, info))
+
+
+def read_all(path):
+    with zipfile.ZipFile(path) as zipf:
+        assert zipf.testzip() is None
+        return {name: zipf.read(name) for name in zipf.namelist()}
+
+
+def test_raw_copy_round_trips_deflated_and_stored_members(tmp_path):
+    source_path = tmp_path / "source.zip"
+    with zipfile.ZipFile(source_path, 'w') as zipf:
+        for name, data in MEMBERS.items():
+            zipf.writestr(name, data, compress_type=zipfile.ZIP_DEFLATED)
+        zipf.writestr("audio/a.mp3", b"\xff\xfb" * 500, compress_type=zipfile.ZIP_STORED)
+
+    copy_raw(source_path, tmp_path / "copy.zip")
+    assert read_all(tmp_path / "copy.zip") == read_all(source_path)
+    with zipfile.ZipFile(source_path) as source, zipfile.ZipFile(tmp_path / "copy.zip") as copy:
+        for original, copied in zip(source.infolist(), copy.infolist()):
+            assert (copied.filename, copied.compress_type, copied.CRC, copied.compress_size) == \
+                   (original.filename, original.compress_type, original.CRC, original.compress_size)
+
+
+def test_raw_copy_drops_the_data_descriptor_flag(tmp_path):
+    stream = UnseekableWriter()
+    with zipfile.ZipFile(stream, 'w', zipfile.ZIP_DEFLATED) as zipf:
+        for name, data in MEMBERS.items():
+            zipf.writestr(name, data)
+    source_path = tmp_path / "streamed.zip"
+    source_path.write_bytes(bytes(stream.buffer))
+    with zipfile.ZipFile(source_path) as source:
+        assert all(info.flag_bits & 0x08 for info in source.infolist())
+
+    copy_raw(source_path, tmp_path / "copy.zip")
+    assert read_all(tmp_path / "copy.zip") == MEMBERS
+    with zipfile.ZipFile(tmp_path / "copy.zip") as copy:
+        assert not any(info.flag_bits & 0x08 for info in copy.infolist())
+
+
+def test_deflated_member_matches_writestr(tmp_path):
+    path = tmp_path / "deflated.zip"
+    with zipfile.ZipFile(path, 'w') as zipf:
+        for name, data in MEMBERS.items():
+            write_raw_member(zipf, *deflate_member(name, data))
+    assert read_all(path) == MEMBERS
+
+
+def build_with_reuse(path, members, previous=None):
+    reuse = ZipMemberReuse(str(previous) if previous else None)
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+        for name, data in members.items():
+            reuse.write(zipf, name, data)
+        reuse.finish(zipf)
+    return reuse
+
+
+def test_reuse_copies_only_unchanged_members(tmp_path):
+    build_with_reuse(tmp_path / "v1.zip", MEMBERS)
+    changed = dict(MEMBERS, **{"tag_bank_1.json": b'[["n","partOfSpeech",0,"noun",0]]'})
+    reuse = build_with_reuse(tmp_path / "v2.zip", changed, previous=tmp_path / "v1.zip")
+
+    assert (reuse.reused, reuse.compressed) == (2, 1)
+    members = read_all(tmp_path / "v2.zip")
+    assert json.loads(members.pop(MANIFEST_MEMBER))["sha256"] == reuse.hashes
+    assert members == changed
+    with zipfile.ZipFile(tmp_path / "v2.zip") as zipf:
+        assert ZipMemberReuse.read_manifest(zipf) == {name: ZipMemberReuse.digest(data)
+                                                      for name, data in changed.items()}
+
+
+def write_with_manifest(path, members, manifest, as_comment=False):
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+        for name, data in members.items():
+            zipf.writestr(name, data)
+        if as_comment:
+            zipf.comment = json.dumps({"sha256": manifest}).encode('utf-8')
+        else:
+            zipf.writestr(MANIFEST_MEMBER, json.dumps({"sha256": manifest}))
+
+
+def test_manifest_entry_without_member_counts_as_changed(tmp_path):
+    manifest = {name: ZipMemberReuse.digest(data) for name, data in MEMBERS.items()}
+    manifest["term_bank_2.json"] = ZipMemberReuse.digest(b"[]")
+    write_with_manifest(tmp_path / "v1.zip", MEMBERS, manifest)
+
+    reuse = build_with_reuse(tmp_path / "v2.zip", dict(MEMBERS, **{"term_bank_2.json": b"[]"}),
+                             previous=tmp_path / "v1.zip")
+    assert (reuse.reused, reuse.compressed) == (3, 1)
+    assert read_all(tmp_path / "v2.zip")["term_bank_2.json"] == b"[]"
+
+
+def test_manifest_beyond_the_comment_limit_is_kept(tmp_path):
+    members = {f"term_bank_{number}.json": f"[{number}]".encode('utf-8') for number in range(1, 1001)}
+    build_with_reuse(tmp_path / "v1.zip", members)
+    with zipfile.ZipFile(tmp_path / "v1.zip") as zipf:
+        assert len(zipf.read(MANIFEST_MEMBER)) > 65535
+    reuse = build_with_reuse(tmp_path / "v2.zip", members, previous=tmp_path / "v1.zip")
+    assert (reuse.reused, reuse.compressed) == (1000, 0)
+
+
+def test_comment_manifest_of_older_zips_is_read(tmp_path):
+    write_with_manifest(tmp_path / "v1.zip", MEMBERS,
+                        {name: ZipMemberReuse.digest(data) for name, data in MEMBERS.items()}, as_comment=True)
+    reuse = build_with_reuse(tmp_path / "v2.zip", MEMBERS, previous=tmp_path / "v1.zip")
+    assert (reuse.reused, reuse.compressed) == (3, 0)
+
+
+def test_unreadable_manifest_is_reported(tmp_path, capsys):
+    with zipfile.ZipFile(tmp_path / "v1.zip", 'w') as zipf:
+        zipf.writestr(MANIFEST_MEMBER, '{"sha256": {"term_bank_1.json": "ab')
+    with zipfile.ZipFile(tmp_path / "v1.zip") as zipf:
+        assert ZipMemberReuse.read_manifest(zipf) == {}
+    assert "WARNING: unreadable reuse manifest" in capsys.readouterr().out
+
+
+def test_members_are_compressed_without_raw_write_support(tmp_path, monkeypatch):
+    build_with_reuse(tmp_path / "v1.zip", MEMBERS)
+    monkeypatch.setattr(zip_reuse, "supports_raw_write", lambda target: False)
+    reuse = build_with_reuse(tmp_path / "v2.zip", MEMBERS, previous=tmp_path / "v1.zip")
+    assert (reuse.reused, reuse.compressed) == (0, 3)
+    members = read_all(tmp_path / "v2.zip")
+    assert json.loads(members.pop(MANIFEST_MEMBER))["sha256"] == reuse.hashes
+    assert members == MEMBERS
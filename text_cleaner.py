@@ -4,6 +4,7 @@ Text cleaning utility for dictionary entries
 Handles HTML entities and text formatting
 """
 
+import functools
 import re
 
 
@@ -14,7 +15,18 @@ class TextCleaner:
         """Clean up text by handling HTML entities and formatting"""
         if not text:
             return ""
-        
+        return self._clean_cached(text)
+    
+    @staticmethod
+    def cache_info():
+        """Hit/miss statistics of the process-wide cleaning cache"""
+        return TextCleaner._clean_cached.cache_info()
+    
+    # Shared by every TextCleaner in the process, so builders and dictionary
+    # directions that clean the same translation pay for it once
+    @staticmethod
+    @functools.lru_cache(maxsize=1 << 18)
+    def _clean_cached(text: str) -> str:
         # Handle common HTML entities
         # Handle compound entities first (like &amp;quot)
         text = text.replace("&amp;quot;", '"')
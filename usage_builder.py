@@ -4,18 +4,21 @@ Usage section builder for Yomitan dictionary entries
 Handles: phonetic, usage info, grammar, paradigm, variants
 """
 
-from typing import List, Dict
+from typing import List, Dict, Optional
 from models import FolketsEntry
 from text_cleaner import TextCleaner
 from phonetic_normalizer import PhoneticNormalizer
+from derived_attributes import DerivedAttributes
+from pos_mapper import POSMapper
 
 
 class UsageBuilder:
     """Builds usage section with phonetic, usage, grammar info"""
     
-    def __init__(self):
+    def __init__(self, attributes: Optional[DerivedAttributes] = None):
         self.text_cleaner = TextCleaner()
         self.phonetic_normalizer = PhoneticNormalizer()
+        self.attributes = attributes or DerivedAttributes(POSMapper())
     
     def build_pronunciation_section(self, entry: FolketsEntry) -> List[Dict]:
         """Build pronunciation section separately"""
@@ -23,8 +26,10 @@ class UsageBuilder:
         
         # Phonetic
         if entry.phonetic:
-            cleaned_phonetic = self.phonetic_normalizer.normalize(entry.phonetic)
-            pronunciation_items.append(self._create_pronunciation_item(f"[{cleaned_phonetic}]"))
+            cleaned_phonetic = self.attributes.phonetic(entry)
+            pronunciation_items.append(self._create_pronunciation_item(
+                f"[{cleaned_phonetic}]", self.attributes.audio(entry)
+            ))
         
         return pronunciation_items
     
@@ -32,44 +37,48 @@ class UsageBuilder:
         """Build usage section with multiple lines (excluding pronunciation)"""
         usage_items = []
         
-        # Usage info (split by semicolon, but not inside quotes)
-        if entry.usage:
-            usage_parts = self._smart_split_usage(entry.usage)
-            for usage_part in usage_parts:
-                if usage_part:
-                    usage_items.append(self._create_usage_item(
-                        self.text_cleaner.clean_text(usage_part)
-                    ))
+        # Usage info: parts from the source, then annotations added during processing
+        for usage_part in entry.usage + entry.usage_annotations:
+            if usage_part:
+                usage_items.append(self._create_usage_item(
+                    [self.text_cleaner.clean_text(usage_part)]
+                ))
         
         # Grammar
         if entry.grammar:
             usage_items.append(self._create_usage_item(
-                f"Grammar: {self.text_cleaner.clean_text(entry.grammar)}"
+                [f"Grammar: {self.text_cleaner.clean_text(entry.grammar)}"]
             ))
         
         # Paradigm (inflections)
         if entry.inflections:
             usage_items.append(self._create_usage_item(
-                f"Paradigm: {', '.join(entry.inflections)}"
+                [f"Paradigm: {', '.join(entry.inflections)}"]
             ))
         
         # Variants
         if entry.variants:
-            variants_text = []
-            for variant in entry.variants:
-                variant_text = variant.value
-                if variant.alt:
-                    variant_text += f" ({variant.alt})"
-                variants_text.append(variant_text)
+            variant_items = [(variant.value, f" ({variant.alt})" if variant.alt else "")
+                             for variant in entry.variants]
+            usage_items.append(self._create_usage_item(
+                self.attributes.reference_content("Also: ", variant_items, entry.word_class)
+            ))
+        
+        # See also, shown when references are linked
+        see_also = self.attributes.see_also_targets(entry)
+        if see_also:
             usage_items.append(self._create_usage_item(
-                f"Also: {', '.join(variants_text)}"
+                self.attributes.reference_content("See also: ", [(value, "") for value in see_also], "")
             ))
         
         return usage_items
     
-    def _create_pronunciation_item(self, text: str) -> Dict:
-        """Create a pronunciation item div"""
-        return {
+    def _create_pronunciation_item(self, text: str, audio: Optional[str] = None) -> Dict:
+        """Create a pronunciation item div, referencing its bundled audio file if any
+
+        The reference is a data attribute for other clients; Yomitan cannot play files inside a dictionary.
+        """
+        item = {
             "tag": "div",
             "content": [text],
             "style": {
@@ -79,48 +88,15 @@ class UsageBuilder:
                 "marginBottom": "0.3em"
             }
         }
+        if audio:
+            item["data"] = {"audio": audio}
+        return item
     
-    def _smart_split_usage(self, usage_text: str) -> List[str]:
-        """Split usage text by semicolon + space, but not inside quotes. Removes leading/trailing semicolons and spaces from each part."""
-        parts = []
-        current_part = ""
-        in_quotes = False
-        i = 0
-        
-        while i < len(usage_text):
-            char = usage_text[i]
-            
-            if char == '"':
-                in_quotes = not in_quotes
-                current_part += char
-            elif char == ';' and not in_quotes:
-                # Check if next character is a space
-                if i + 1 < len(usage_text) and usage_text[i + 1] == ' ':
-                    # Split on "; "
-                    cleaned = current_part.strip().lstrip(';').strip()
-                    if cleaned:
-                        parts.append(cleaned)
-                    current_part = ""
-                    i += 1  # Skip the space after semicolon
-                else:
-                    # Keep the semicolon as part of the text
-                    current_part += char
-            else:
-                current_part += char
-            
-            i += 1
-        
-        cleaned = current_part.strip().lstrip(';').strip()
-        if cleaned:
-            parts.append(cleaned)
-        
-        return parts
-    
-    def _create_usage_item(self, text: str) -> Dict:
+    def _create_usage_item(self, content: List) -> Dict:
         """Create a single usage item div"""
         return {
             "tag": "div",
-            "content": [text],
+            "content": content,
             "style": {
                 "fontSize": "0.9em",
                 "color": "#64748b",
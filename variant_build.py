@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+Multi-variant build - renders each entry's sections once into a fragment cache
+and assembles the term rows of every published dictionary variant from it
+"""
+
+import concurrent.futures
+import os
+import shutil
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from content_builder import StructuredContentBuilder
+from derived_attributes import DerivedAttributes
+from entry_processor import EntryNode
+from entry_store import SharedEntryStore
+from models import FolketsEntry
+from pos_mapper import POSMapper
+from yomitan_converter import YomitanConverter, headword_chunk_ranges
+
+
+@dataclass(frozen=True)
+class DictionaryVariant:
+    """Sections a published dictionary variant includes"""
+    name: str
+    title_suffix: str = ""
+    examples: bool = True
+    idioms: bool = True
+    base_translations: int = 3
+    base_examples: int = 3
+    base_idioms: bool = True
+
+
+VARIANTS = {
+    "full": DictionaryVariant("full"),
+    # No examples or idioms, and base form sections cut to the first translation
+    "lite": DictionaryVariant("lite", title_suffix=" Lite", examples=False, idioms=False,
+                              base_translations=1, base_examples=0, base_idioms=False),
+}
+
+# Base form fragments are shared by many inflections, so they outlive a render run
+BASE_FORM_CACHE_SIZE = 8192
+
+
+def variant_output_path(path: str, variant_name: str) -> str:
+    """The full variant keeps the given path; others get the variant name appended"""
+    if variant_name == "full":
+        return path
+    stem, extension = os.path.splitext(path)
+    return f"{stem}_{variant_name}{extension}"
+
+
+@dataclass
+class BaseFormFragments:
+    """Rendered parts of a base form section"""
+    separator: Dict
+    definitions: List[Dict]
+    examples: List[Dict]
+    idioms: List[Dict]
+    synonyms: Optional[Dict]
+
+
+@dataclass
+class NodeFragments:
+    """Rendered section outputs of one entry node"""
+    header: Dict
+    pronunciation: List[Dict]
+    usage: List[Dict]
+    definition: List[Dict]
+    examples: List[Dict]
+    base_form: Optional[BaseFormFragments]
+    idioms: List[Dict]
+    synonyms: Optional[Dict]
+
+
+class FragmentCache:
+    """Section builder outputs of the current render run, shared by all variants"""
+
+    def __init__(self, variants: List[DictionaryVariant]):
+        self.pos_mapper = POSMapper()
+        self.attributes = DerivedAttributes(self.pos_mapper)
+        self.builder = StructuredContentBuilder(self.pos_mapper, self.attributes)
+        # Render as much of a base form section as the most complete variant shows
+        self.base_translations = max(variant.base_translations for variant in variants)
+        self.base_examples = max(variant.base_examples for variant in variants)
+        # Nodes and base entries are kept with their fragments so their ids cannot be reused while cached
+        self._nodes: Dict[int, Tuple[EntryNode, NodeFragments]] = {}
+        self._base_forms: Dict[int, Tuple[FolketsEntry, BaseFormFragments]] = {}
+
+    def start_run(self, nodes: List[EntryNode]) -> None:
+        """Derive the attributes of a new run of nodes and drop the previous run's fragments"""
+        self.attributes.derive(nodes)
+        self._nodes = {}
+
+    def node(self, node: EntryNode) -> NodeFragments:
+        cached = self._nodes.get(id(node))
+        if cached is None:
+            cached = self._nodes[id(node)] = (node, self._render_node(node))
+        return cached[1]
+
+    def base_form(self, base_entry: FolketsEntry) -> BaseFormFragments:
+        cached = self._base_forms.get(id(base_entry))
+        if cached is None:
+            if len(self._base_forms) >= BASE_FORM_CACHE_SIZE:
+                self._base_forms.clear()
+            cached = self._base_forms[id(base_entry)] = (base_entry, self._render_base_form(base_entry))
+        return cached[1]
+
+    def _render_node(self, node: EntryNode) -> NodeFragments:
+        entry = node.entry
+        builder = self.builder
+        # Idioms and synonyms are only shown with the entry's own translations
+        has_translations = bool(entry.translations)
+        definition_items = builder.definition_builder.build_definitions_section(entry)
+        return NodeFragments(
+            header=builder.header_builder.build_header(entry),
+            pronunciation=builder.usage_builder.build_pronunciation_section(entry),
+            usage=builder.usage_builder.build_usage_section(entry),
+            definition=definition_items[:1],
+            examples=definition_items[1:],
+            base_form=self.base_form(node.base_form.entry) if node.base_form else None,
+            idioms=builder.definition_builder.build_idioms_section(entry) if has_translations else [],
+            synonyms=builder.synonym_builder.build_synonyms_section(entry) if has_translations else None
+        )
+
+    def _render_base_form(self, base_entry: FolketsEntry) -> BaseFormFragments:
+        base_form_builder = self.builder.base_form_builder
+        definition_builder = base_form_builder.definition_builder
+        return BaseFormFragments(
+            separator=base_form_builder._create_separator(base_entry.headword),
+            definitions=[definition_builder._create_definition_item(index, translation, base_entry.definitions)
+                         for index, translation in enumerate(base_entry.translations[:self.base_translations])],
+            examples=[definition_builder._create_example_item(example)
+                      for example in base_entry.examples[:self.base_examples]],
+            idioms=definition_builder.build_idioms_section(base_entry),
+            synonyms=base_form_builder.synonym_builder.build_base_synonyms_section(
+                base_entry.synonyms, word_class=base_entry.word_class
+            )
+        )
+
+
+class VariantContentBuilder(StructuredContentBuilder):
+    """StructuredContentBuilder assembling a variant's content from cached fragments"""
+
+    def __init__(self, fragments: FragmentCache, variant: DictionaryVariant):
+        super().__init__(fragments.pos_mapper, fragments.attributes)
+        self.fragments = fragments
+        self.variant = variant
+
+    def build_structured_content(self, node: EntryNode) -> Optional[Dict]:
+        if not node.entry.translations and not node.base_form:
+            return None
+        node_fragments = self.fragments.node(node)
+        return {"tag": "div",
+                "content": [node_fragments.header] + node_fragments.pronunciation + self._build_sense_items(node)}
+
+    def _build_sense_items(self, node: EntryNode) -> List[Dict]:
+        node_fragments = self.fragments.node(node)
+        variant = self.variant
+        items = node_fragments.usage + node_fragments.definition
+        if variant.examples:
+            items.extend(node_fragments.examples)
+
+        base_form = node_fragments.base_form
+        if base_form:
+            items.append(base_form.separator)
+            items.extend(base_form.definitions[:variant.base_translations])
+            items.extend(base_form.examples[:variant.base_examples])
+            if variant.base_idioms:
+                items.extend(base_form.idioms)
+            if base_form.synonyms:
+                items.append(base_form.synonyms)
+
+        if variant.idioms:
+            items.extend(node_fragments.idioms)
+        if node_fragments.synonyms:
+            items.append(node_fragments.synonyms)
+        return items
+
+
+class VariantConverter(YomitanConverter):
+    """Converter for one variant, rendering through the shared fragment cache"""
+
+    def __init__(self, variant: DictionaryVariant, fragments: FragmentCache, **options):
+        super().__init__(**options)
+        self.variant = variant
+        self.pos_mapper = fragments.pos_mapper
+        self.attributes = fragments.attributes
+        self.content_builder = VariantContentBuilder(fragments, variant)
+        self.use_audio_bundle(self.audio_bundle)
+        self.use_cross_references(self.cross_references)
+
+    def generate_index_json(self) -> Dict:
+        """Variants other than the full one are titled apart so both can be imported"""
+        index = super().generate_index_json()
+        if self.variant.title_suffix:
+            index["title"] += self.variant.title_suffix
+            index["description"] += f" {self.variant.name.capitalize()} variant."
+        return index
+
+
+# Per-process state of variant render workers, set up once by _init_variant_worker
+_worker_store = None
+_worker_build = None
+
+
+def _init_variant_worker(store_name: str, variant_names: List[str], converter_options: Dict) -> None:
+    """Attach a variant render worker to the shared entry store"""
+    global _worker_store, _worker_build
+    _worker_store = SharedEntryStore.attach(store_name)
+    _worker_build = MultiVariantBuild(variant_names, **converter_options)
+
+
+def _render_variant_range(start: int, end: int, context: Tuple):
+    """Render nodes [start, end) for every variant; sequence numbers are assigned by the parent"""
+    nodes = [_worker_store.get_node(index) for index in range(start, end)]
+    for converter in _worker_build.converters.values():
+        converter.use_render_context(context)
+    rows = _worker_build.render_run(nodes)
+    return rows, _worker_build.fragments.pos_mapper.unknown_classes
+
+
+class MultiVariantBuild:
+    """Renders sections once per node and writes one dictionary ZIP per variant"""
+
+    def __init__(self, variant_names: List[str], render_workers: int = 1, previous_zip: Optional[str] = None,
+                 **converter_options):
+        variants = [VARIANTS[name] for name in variant_names]
+        self.render_workers = render_workers
+        self.converter_options = converter_options
+        self.fragments = FragmentCache(variants)
+        self.converters = {
+            variant.name: VariantConverter(
+                variant, self.fragments,
+                previous_zip=variant_output_path(previous_zip, variant.name) if previous_zip else None,
+                **converter_options)
+            for variant in variants
+        }
+
+    def render_run(self, nodes: List[EntryNode]) -> Dict[str, List]:
+        """Term rows of each variant for a run of nodes that never splits a headword"""
+        self.fragments.start_run(nodes)
+        return {name: converter.convert_derived_run(nodes) for name, converter in self.converters.items()}
+
+    def run(self, entry_nodes_map: Dict[str, List[EntryNode]], output_zip_path: str) -> Dict[str, str]:
+        """Render all variants, then write their ZIPs concurrently; returns variant -> ZIP path"""
+        start = time.time()
+        all_nodes = [node for node_list in entry_nodes_map.values() for node in node_list]
+        print(f"Multi-variant build: {', '.join(self.converters)} from {len(all_nodes)} nodes")
+        if self.render_workers > 1:
+            rows = self._render_parallel(entry_nodes_map, all_nodes)
+        else:
+            rows = self._render_serial(all_nodes)
+        render_time = time.time() - start
+
+        inflection_index = None
+        if self.converter_options.get("inflection_mode") == "compact":
+            inflection_index = next(iter(self.converters.values())).generate_inflection_index(all_nodes)
+
+        output_paths = {name: variant_output_path(output_zip_path, name) for name in self.converters}
+        # Each variant's banks are written by its own parallel bank writer; compression releases the GIL
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(self.converters)) as executor:
+            futures = [
+                executor.submit(self._write_variant, self.converters[name], rows[name],
+                                output_paths[name], inflection_index)
+                for name in self.converters
+            ]
+            for future in futures:
+                future.result()
+
+        print(f"Multi-variant build complete in {time.time() - start:.2f}s (render {render_time:.2f}s)")
+        for name, path in output_paths.items():
+            print(f"  {name:<6} {len(rows[name])} rows -> {path}")
+        print(f"Found POS tags: {sorted(set().union(*(c.pos_tags for c in self.converters.values())))}")
+        self.fragments.pos_mapper.report_unknown_classes()
+        return output_paths
+
+    def _render_serial(self, all_nodes: List[EntryNode]) -> Dict[str, List]:
+        rows = {name: [] for name in self.converters}
+        total = len(all_nodes)
+        for start, end in headword_chunk_ranges(all_nodes, 2000):
+            print(f"Conversion progress: {start}/{total} ({start / total * 100:.1f}%)")
+            for name, term_entries in self.render_run(all_nodes[start:end]).items():
+                rows[name].extend(term_entries)
+        return rows
+
+    def _render_parallel(self, entry_nodes_map: Dict[str, List[EntryNode]], all_nodes: List[EntryNode]) -> Dict[str, List]:
+        """Render nodes in worker processes attached to a shared entry store"""
+        rows = {name: [] for name in self.converters}
+        total = len(all_nodes)
+        store = SharedEntryStore.create(entry_nodes_map)
+        print(f"Shared entry store: {store.shm.size} bytes, {self.render_workers} render workers")
+        # Every variant shares the options and indexes; chunks carry the index parts they read
+        first = next(iter(self.converters.values()))
+        try:
+            with concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.render_workers,
+                initializer=_init_variant_worker,
+                initargs=(store.name, list(self.converters), first.worker_options())
+            ) as executor:
+                starts, ends = zip(*headword_chunk_ranges(all_nodes, 2000))
+                contexts = [first.render_context(all_nodes[start:end]) for start, end in zip(starts, ends)]
+                # map() yields in submission order, keeping sequence numbers stable
+                for start, (chunk_rows, unknown_classes) in zip(
+                    starts, executor.map(_render_variant_range, starts, ends, contexts)
+                ):
+                    print(f"Conversion progress: {start}/{total} ({start / total * 100:.1f}%)")
+                    for name, term_entries in chunk_rows.items():
+                        converter = self.converters[name]
+                        for term_entry in term_entries:
+                            term_entry[6] = converter.sequence_number
+                            converter.sequence_number += 1
+                            converter.pos_tags.add(term_entry[2])
+                        rows[name].extend(term_entries)
+                    self.fragments.pos_mapper.unknown_classes.update(unknown_classes)
+        finally:
+            store.close()
+        return rows
+
+    @staticmethod
+    def _write_variant(converter: VariantConverter, term_entries: List, zip_path: str,
+                       inflection_index: Optional[List[List]]) -> None:
+        temp_dir = tempfile.mkdtemp(prefix=f"{converter.variant.name}_dict_files_")
+        try:
+            converter.write_rendered_files(term_entries, temp_dir, inflection_index)
+            print(f"Creating ZIP dictionary: {zip_path}")
+            converter.create_zip_dictionary(temp_dir, zip_path)
+        finally:
+            shutil.rmtree(temp_dir)
@@ -4,11 +4,44 @@ XML parser for Folkets Lexikon data
 """
 
 import xml.etree.ElementTree as ET
+import concurrent.futures
+import gc
 import html
-from typing import List, Optional
+import mmap
+import re
+from typing import List, Optional, Tuple
 from models import FolketsEntry, Example, Idiom, Definition, Synonym, Variant, SeeAlso
 
 
+WORD_START = b"<word "
+
+
+def _parse_word_range(xml_file_path: str, start: int, end: int, encoding: str) -> List[FolketsEntry]:
+    """Parse the <word> elements in a byte range of the XML file (runs in a worker process)"""
+    with open(xml_file_path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+
+    # Entries only reference strings, so cyclic GC passes are pure overhead here
+    gc.disable()
+    try:
+        parser = ET.XMLParser(encoding=encoding)
+        parser.feed(b"<chunk>")
+        parser.feed(data)
+        parser.feed(b"</chunk>")
+        chunk = parser.close()
+
+        word_parser = FolketsXMLParser()
+        entries = []
+        for word in chunk.findall('word'):
+            entry = word_parser.parse_word_entry(word)
+            if entry:
+                entries.append(entry)
+        return entries
+    finally:
+        gc.enable()
+
+
 class FolketsXMLParser:
     """Parser for Folkets Lexikon XML format"""
     
@@ -25,6 +58,91 @@ class FolketsXMLParser:
                 
         return entries
     
+    def parse_xml_parallel(self, xml_file_path: str, workers: int) -> List[FolketsEntry]:
+        """Parse the XML in byte ranges aligned on <word> boundaries across worker processes"""
+        ranges, encoding = self.split_word_ranges(xml_file_path, workers * 4)
+        print(f"Parsing {len(ranges)} chunks with {workers} worker processes...")
+        
+        entries = []
+        # Unpickling worker results creates many small objects; skip GC passes while merging
+        gc.disable()
+        try:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+                # map() yields in submission order, so document order is preserved
+                for chunk_entries in executor.map(
+                    _parse_word_range,
+                    [xml_file_path] * len(ranges),
+                    [start for start, _ in ranges],
+                    [end for _, end in ranges],
+                    [encoding] * len(ranges)
+                ):
+                    entries.extend(chunk_entries)
+        finally:
+            gc.enable()
+        
+        return entries
+    
+    def split_word_ranges(self, xml_file_path: str, chunk_count: int) -> Tuple[List[Tuple[int, int]], str]:
+        """Split the file into byte ranges that each start at a <word> element"""
+        with open(xml_file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            declaration = re.match(rb'<\?xml[^>]*encoding=["\']([A-Za-z0-9._-]+)["\']', data[:200])
+            encoding = declaration.group(1).decode('ascii') if declaration else "utf-8"
+            
+            first_word = data.find(WORD_START)
+            # Everything after the last element belongs to the root closing tag
+            body_end = data.rfind(b"</")
+            if first_word < 0 or body_end < first_word:
+                return [], encoding
+            
+            boundaries = [first_word]
+            chunk_size = max(1, (body_end - first_word) // chunk_count)
+            for i in range(1, chunk_count):
+                boundary = data.find(WORD_START, max(first_word + i * chunk_size, boundaries[-1] + 1), body_end)
+                if boundary < 0:
+                    break
+                if boundary > boundaries[-1]:
+                    boundaries.append(boundary)
+            boundaries.append(body_end)
+        
+        return list(zip(boundaries[:-1], boundaries[1:])), encoding
+    
+    @staticmethod
+    def split_usage(usage_text: str) -> List[str]:
+        """Split usage text by semicolon + space, but not inside quotes. Removes leading/trailing semicolons and spaces from each part."""
+        parts = []
+        current_part = ""
+        in_quotes = False
+        i = 0
+        
+        while i < len(usage_text):
+            char = usage_text[i]
+            
+            if char == '"':
+                in_quotes = not in_quotes
+                current_part += char
+            elif char == ';' and not in_quotes:
+                # Check if next character is a space
+                if i + 1 < len(usage_text) and usage_text[i + 1] == ' ':
+                    # Split on "; "
+                    cleaned = current_part.strip().lstrip(';').strip()
+                    if cleaned:
+                        parts.append(cleaned)
+                    current_part = ""
+                    i += 1  # Skip the space after semicolon
+                else:
+                    # Keep the semicolon as part of the text
+                    current_part += char
+            else:
+                current_part += char
+            
+            i += 1
+        
+        cleaned = current_part.strip().lstrip(';').strip()
+        if cleaned:
+            parts.append(cleaned)
+        
+        return parts
+    
     def parse_word_entry(self, word_element) -> Optional[FolketsEntry]:
         """Parse a single word entry from XML"""
         # Basic info
@@ -91,7 +209,7 @@ class FolketsXMLParser:
                 entry.definitions.append(definition)
                 
             elif child.tag == 'use':
-                entry.usage = html.unescape(child.get('value', ''))
+                entry.usage = self.split_usage(html.unescape(child.get('value', '')))
                 
             elif child.tag == 'synonym':
                 synonym = Synonym(
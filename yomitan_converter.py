@@ -7,45 +7,149 @@ import json
 import zipfile
 import os
 from pathlib import Path
-from typing import List, Dict, Set
+from typing import Iterator, List, Dict, Optional, Set, Tuple
 import shutil
+import collections
 import concurrent.futures
+import itertools
 import time
+import zlib
 
 from models import FolketsEntry
 from pos_mapper import POSMapper
 from content_builder import StructuredContentBuilder
+from compiled_layout import CompiledContentBuilder
+from derived_attributes import DerivedAttributes
 from entry_processor import EntryProcessor, EntryNode
+from entry_store import SharedEntryStore
+from build_pipeline import BuildPipeline
+from zip_reuse import ZipMemberReuse, deflate_member
+from frequency_index import FrequencyIndex
+from audio_bundle import AudioBundle
+from cross_references import CrossReferenceIndex
+from resource_scheduler import default_plan
+from bank_spool import BankSpool, write_bank_file
+
+
+# Sequence number range reserved for each bank in stable bank mode
+STABLE_BANK_SEQUENCE_STRIDE = 1000000
+
+# Entry fields that give an inflection content of its own; usage_annotations only holds the
+# processor's "inflected form of" note, which a compact pointer row already expresses
+OWN_CONTENT_FIELDS = ("translations", "phonetic", "sound_file", "inflections", "usage", "grammar",
+                      "variants", "examples", "idioms", "definitions", "synonyms", "see_also")
+
+# Per-process state of render workers, set up once by _init_render_worker
+_worker_store = None
+_worker_converter = None
+
+
+def _init_render_worker(store_name: str, converter_options: Dict) -> None:
+    """Attach a render worker to the shared entry store"""
+    global _worker_store, _worker_converter
+    _worker_store = SharedEntryStore.attach(store_name)
+    _worker_converter = YomitanConverter(**converter_options)
+
+
+def _render_node_range(start: int, end: int, context: Tuple):
+    """Render nodes [start, end) in a worker; sequence numbers are assigned by the parent"""
+    nodes = [_worker_store.get_node(index) for index in range(start, end)]
+    _worker_converter.use_render_context(context)
+    term_entries = _worker_converter.convert_node_run(nodes)
+    return term_entries, _worker_converter.pos_tags, _worker_converter.pos_mapper.unknown_classes
+
+
+def headword_chunk_ranges(all_nodes: List[EntryNode], chunk_size: int) -> List[Tuple[int, int]]:
+    """Split node indices into [start, end) chunks of about chunk_size that never split a headword"""
+    ranges = []
+    start = 0
+    total = len(all_nodes)
+    while start < total:
+        end = min(start + chunk_size, total)
+        # A headword's nodes are adjacent, so extending to the next headword keeps them together
+        while end < total and all_nodes[end].entry.headword == all_nodes[end - 1].entry.headword:
+            end += 1
+        ranges.append((start, end))
+        start = end
+    return ranges
 
 
 class YomitanConverter:
     """Converts enhanced dictionary entries to Yomitan format"""
     
-    def __init__(self):
+    def __init__(self, render_workers: int = 1, inflection_mode: str = "full", pipeline: bool = False,
+                 previous_zip: Optional[str] = None, stable_banks: int = 0, merge_homographs: bool = False,
+                 compiled_layout: bool = False, frequency_index: Optional[FrequencyIndex] = None,
+                 audio_bundle: Optional[AudioBundle] = None,
+                 cross_references: Optional[CrossReferenceIndex] = None,
+                 serialize_workers: Optional[int] = None, compress_workers: Optional[int] = None,
+                 memory_budget: Optional[int] = None):
+        self.render_workers = render_workers
+        # Bytes of rendered rows to hold before finished banks are written out early; None holds all rows
+        self.memory_budget = memory_budget
+        # Bank serialization and ZIP compression threads; None sizes them from the host's resources
+        self.serialize_workers = serialize_workers or default_plan().serialize
+        self.compress_workers = compress_workers or default_plan().compress
+        # Corpus frequencies for row scores and the term_meta_bank; None keeps every score 0
+        self.frequency_index = frequency_index
+        # Render through the layout compiled into flat functions (same output, faster)
+        self.compiled_layout = compiled_layout
+        # One row per (headword, pos) with numbered senses instead of one row per <word>
+        self.merge_homographs = merge_homographs
+        # Previous release ZIP whose unchanged members are copied without recompression
+        self.previous_zip = previous_zip
+        # Number of headword-hash term banks; 0 keeps fixed-size sequential banks
+        self.stable_banks = stable_banks
+        # Overlap render, serialize and compress stages and write the ZIP directly
+        self.pipeline = pipeline
+        # "full": inflections carry the rendered base form section
+        # "compact": content-less inflections become pointer rows to their base form
+        self.inflection_mode = inflection_mode
         self.sequence_number = 1
         self.pos_mapper = POSMapper()
-        self.content_builder = StructuredContentBuilder(self.pos_mapper)
+        # POS tags, phonetics and cleaned text derived once per render batch
+        self.attributes = DerivedAttributes(self.pos_mapper)
+        if compiled_layout:
+            self.content_builder = CompiledContentBuilder(self.pos_mapper, self.attributes)
+        else:
+            self.content_builder = StructuredContentBuilder(self.pos_mapper, self.attributes)
         self.pos_tags: Set[str] = set()
         self.entry_processor = EntryProcessor()
+        self.use_audio_bundle(audio_bundle)
+        self.use_cross_references(cross_references)
+    
+    def use_audio_bundle(self, audio_bundle: Optional[AudioBundle]) -> None:
+        """Store the bundle's audio in the ZIP and reference it from pronunciations"""
+        self.audio_bundle = audio_bundle
+        self.attributes.audio_members = audio_bundle.members if audio_bundle else {}
+    
+    def use_cross_references(self, cross_references: Optional[CrossReferenceIndex]) -> None:
+        """Render resolvable synonyms, variants and see-also references as search links"""
+        self.cross_references = cross_references
+        self.attributes.cross_references = cross_references
     
     def convert_to_yomitan_entry(self, node: EntryNode) -> List[List]:
         """Convert an entry node to Yomitan format"""
         entry = node.entry
         headword = entry.headword
-        pos_tag = self.pos_mapper.detect_pos(entry)
+        pos_tag = self.attributes.pos(entry)
         self.pos_tags.add(pos_tag)
         
-        # Build structured content
-        definition_content = self.content_builder.build_structured_content(node)
-        
-        # Skip entries with no content
-        if definition_content is None:
-            return []
-        
-        definitions = [{
-            "type": "structured-content",
-            "content": definition_content
-        }]
+        if self.inflection_mode == "compact" and self.is_pointer_node(node):
+            # Yomitan deinflection definition: [uninflected term, inflection rule chain]
+            definitions = [[node.base_form.entry.headword, []]]
+        else:
+            # Build structured content
+            definition_content = self.content_builder.build_structured_content(node)
+            
+            # Skip entries with no content
+            if definition_content is None:
+                return []
+            
+            definitions = [{
+                "type": "structured-content",
+                "content": definition_content
+            }]
         
         # Yomitan term format
         yomitan_entry = [
@@ -53,7 +157,7 @@ class YomitanConverter:
             "",  # reading (empty for Swedish)
             pos_tag,
             "",  # rules (empty for Swedish)
-            0,   # score
+            self.frequency_index.score(node) if self.frequency_index else 0,  # score
             definitions,
             self.sequence_number,
             ""   # term_tags
@@ -62,12 +166,90 @@ class YomitanConverter:
         self.sequence_number += 1
         return [yomitan_entry]
     
+    def convert_homograph_group(self, nodes: List[EntryNode]) -> List[List]:
+        """Convert same-headword, same-POS nodes to a single row with numbered senses"""
+        if len(nodes) == 1:
+            return self.convert_to_yomitan_entry(nodes[0])
+        
+        pos_tag = self.attributes.pos(nodes[0].entry)
+        self.pos_tags.add(pos_tag)
+        definition_content = self.content_builder.build_homograph_content(nodes)
+        if definition_content is None:
+            return []
+        
+        yomitan_entry = [
+            nodes[0].entry.headword,
+            "",
+            pos_tag,
+            "",
+            max(self.frequency_index.score(node) for node in nodes) if self.frequency_index else 0,
+            [{"type": "structured-content", "content": definition_content}],
+            self.sequence_number,
+            ""
+        ]
+        self.sequence_number += 1
+        return [yomitan_entry]
+    
+    def group_homographs(self, nodes: List[EntryNode]) -> List[List[EntryNode]]:
+        """Group one headword's nodes by POS, in order of first appearance"""
+        groups: Dict[str, List[EntryNode]] = {}
+        ordered_groups = []
+        for node in nodes:
+            if self.inflection_mode == "compact" and self.is_pointer_node(node):
+                # Pointer rows carry no content to share, so they stay separate
+                ordered_groups.append([node])
+                continue
+            pos_tag = self.attributes.pos(node.entry)
+            if pos_tag not in groups:
+                groups[pos_tag] = []
+                ordered_groups.append(groups[pos_tag])
+            groups[pos_tag].append(node)
+        return ordered_groups
+    
+    def convert_node_run(self, nodes: List[EntryNode]) -> List[List]:
+        """Convert consecutive nodes; in merge mode a headword's nodes must all be in the run"""
+        self.attributes.derive(nodes)
+        return self.convert_derived_run(nodes)
+    
+    def convert_derived_run(self, nodes: List[EntryNode]) -> List[List]:
+        """convert_node_run for nodes whose attributes are already derived"""
+        term_entries = []
+        if not self.merge_homographs:
+            for node in nodes:
+                term_entries.extend(self.convert_to_yomitan_entry(node))
+            return term_entries
+        
+        for _, headword_nodes in itertools.groupby(nodes, key=lambda node: node.entry.headword):
+            for group in self.group_homographs(list(headword_nodes)):
+                term_entries.extend(self.convert_homograph_group(group))
+        return term_entries
+    
+    @staticmethod
+    def is_pointer_node(node: EntryNode) -> bool:
+        """Inflections with no content of their own only repeat their base form's content"""
+        return node.base_form is not None and not any(
+            getattr(node.entry, name) for name in OWN_CONTENT_FIELDS
+        )
+    
+    def generate_inflection_index(self, all_nodes: List[EntryNode]) -> List[List]:
+        """Sorted [inflection, base headword, pos] rows for client-side resolution"""
+        index_rows = {
+            (node.entry.headword, node.base_form.entry.headword, self.pos_mapper.detect_pos(node.entry))
+            for node in all_nodes if self.is_pointer_node(node)
+        }
+        return [list(row) for row in sorted(index_rows)]
+    
+    def generate_term_meta_banks(self) -> List[List[List]]:
+        """Frequency term_meta_bank contents, empty without a frequency index"""
+        return self.frequency_index.term_meta_banks() if self.frequency_index else []
+    
     def generate_tag_bank(self) -> List[List]:
         """Generate tag bank with POS tags"""
         tag_bank = []
         pos_descriptions = self.pos_mapper.get_pos_descriptions()
         
-        for pos_tag in self.pos_tags:
+        # Sorted so identical builds produce byte-identical tag banks
+        for pos_tag in sorted(self.pos_tags):
             description = pos_descriptions.get(pos_tag, pos_tag)
             tag_bank.append([pos_tag, 'pos', 0, description, 0])
         
@@ -77,7 +259,7 @@ class YomitanConverter:
         """Generate index.json metadata"""
         from datetime import datetime
         
-        return {
+        index = {
             "title": "Folkets Lexikon Yomitanized",
             "format": 3,
             "version": 2,
@@ -90,13 +272,20 @@ class YomitanConverter:
             "sourceLanguage": "sv",
             "targetLanguage": "en"
         }
+        if self.frequency_index:
+            # term_meta_bank values are occurrence counts: higher means more frequent
+            index["frequencyMode"] = "occurrence-based"
+        return index
     
     def write_dictionary_files(self, raw_entries: List[FolketsEntry], output_dir: str):
         """Write all dictionary files"""
-        os.makedirs(output_dir, exist_ok=True)
-        
         # Stage 1: Process raw entries into enhanced dictionary data
         entry_nodes_map = self.entry_processor.process_entries(raw_entries)
+        self.write_entry_node_files(entry_nodes_map, output_dir)
+    
+    def write_entry_node_files(self, entry_nodes_map: Dict[str, List[EntryNode]], output_dir: str):
+        """Write all dictionary files from already processed entry nodes"""
+        os.makedirs(output_dir, exist_ok=True)
         
         # Flatten for Yomitan conversion
         all_nodes = []
@@ -105,45 +294,154 @@ class YomitanConverter:
         
         # Stage 2: Convert to Yomitan format
         print("Converting to Yomitan format...")
-        all_term_entries = []
-        total = len(all_nodes)
+        if self.render_workers > 1:
+            chunks = self._iter_rendered_parallel(entry_nodes_map, all_nodes)
+        else:
+            chunks = self._iter_rendered_serial(all_nodes)
         
-        for i, node in enumerate(all_nodes):
-            if i % 2000 == 0:
-                progress = (i / total) * 100
-                print(f"Conversion progress: {i}/{total} ({progress:.1f}%)")
-            
-            yomitan_entries = self.convert_to_yomitan_entry(node)
-            all_term_entries.extend(yomitan_entries)
+        if self.memory_budget:
+            # Banks go to disk as they complete once the held rows exceed the budget
+            spool = BankSpool(output_dir, self.memory_budget, self.stable_banks, STABLE_BANK_SEQUENCE_STRIDE)
+            for term_entries in chunks:
+                spool.add(term_entries)
+            print(f"Conversion complete: {spool.total_rows} Yomitan entries created")
+            spool.finish()
+            self.write_metadata_files(output_dir, self._inflection_index(all_nodes))
+            return
         
+        all_term_entries = [term_entry for term_entries in chunks for term_entry in term_entries]
         print(f"Conversion complete: {len(all_term_entries)} Yomitan entries created")
-        
-        # Write files
+        self.write_rendered_files(all_term_entries, output_dir, self._inflection_index(all_nodes))
+    
+    def _inflection_index(self, all_nodes: List[EntryNode]) -> Optional[List[List]]:
+        return self.generate_inflection_index(all_nodes) if self.inflection_mode == "compact" else None
+    
+    def write_rendered_files(self, all_term_entries: List, output_dir: str,
+                             inflection_index: Optional[List[List]] = None):
+        """Write all dictionary files from rendered term rows"""
+        os.makedirs(output_dir, exist_ok=True)
         self._write_term_banks(all_term_entries, output_dir)
+        self.write_metadata_files(output_dir, inflection_index)
+    
+    def write_metadata_files(self, output_dir: str, inflection_index: Optional[List[List]] = None):
+        """Write the files other than term banks, which need the complete render pass"""
         self._write_tag_bank(output_dir)
+        self._write_term_meta_banks(output_dir)
         self._write_index_json(output_dir)
+        if inflection_index is not None:
+            self._write_inflection_index(inflection_index, output_dir)
         
         print("All dictionary files written successfully")
     
+    def worker_options(self) -> Dict:
+        """Constructor options a render worker needs to reproduce this converter's output
+
+        The lexicon-wide indexes are not among them: each chunk carries its render_context,
+        so worker memory does not grow with the indexes times the worker count.
+        """
+        return {"inflection_mode": self.inflection_mode, "merge_homographs": self.merge_homographs,
+                "compiled_layout": self.compiled_layout}
+    
+    @staticmethod
+    def rendered_entries(nodes: List[EntryNode]) -> List[FolketsEntry]:
+        """Entries that rendering these nodes reads: their own and their base forms'"""
+        seen: Set[int] = set()
+        entries = []
+        for node in nodes:
+            while node is not None and id(node) not in seen:
+                seen.add(id(node))
+                entries.append(node.entry)
+                node = node.base_form
+        return entries
+    
+    def render_context(self, nodes: List[EntryNode]) -> Tuple:
+        """The parts of the frequency, audio and cross reference indexes these nodes' rows read"""
+        if not (self.frequency_index or self.audio_bundle or self.cross_references):
+            return None, None, None
+        entries = self.rendered_entries(nodes)
+        return (self.frequency_index.for_entries(entries) if self.frequency_index else None,
+                self.audio_bundle.for_entries(entries) if self.audio_bundle else None,
+                self.cross_references.for_entries(entries) if self.cross_references else None)
+    
+    def use_render_context(self, context: Tuple) -> None:
+        """Render with a chunk's index subsets, in a worker process"""
+        frequency_index, audio_bundle, cross_references = context
+        self.frequency_index = frequency_index
+        self.use_audio_bundle(audio_bundle)
+        self.use_cross_references(cross_references)
+    
+    def _iter_rendered_serial(self, all_nodes: List[EntryNode]) -> Iterator[List]:
+        """Render all nodes in this process, yielding each chunk's rows"""
+        total = len(all_nodes)
+        
+        for start, end in headword_chunk_ranges(all_nodes, 2000):
+            progress = (start / total) * 100
+            print(f"Conversion progress: {start}/{total} ({progress:.1f}%)")
+            
+            yield self.convert_node_run(all_nodes[start:end])
+    
+    def _iter_rendered_parallel(self, entry_nodes_map: Dict[str, List[EntryNode]],
+                                all_nodes: List[EntryNode]) -> Iterator[List]:
+        """Render nodes in worker processes attached to a shared entry store, yielding each chunk's rows"""
+        total = len(all_nodes)
+        store = SharedEntryStore.create(entry_nodes_map)
+        print(f"Shared entry store: {store.shm.size} bytes, {self.render_workers} render workers")
+        
+        try:
+            with concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.render_workers,
+                initializer=_init_render_worker,
+                initargs=(store.name, self.worker_options())
+            ) as executor:
+                starts, ends = zip(*headword_chunk_ranges(all_nodes, 2000))
+                contexts = [self.render_context(all_nodes[start:end]) for start, end in zip(starts, ends)]
+                # map() yields in submission order, keeping sequence numbers stable
+                for start, (term_entries, pos_tags, unknown_classes) in zip(
+                    starts, executor.map(_render_node_range, starts, ends, contexts)
+                ):
+                    print(f"Conversion progress: {start}/{total} ({start / total * 100:.1f}%)")
+                    for term_entry in term_entries:
+                        term_entry[6] = self.sequence_number
+                        self.sequence_number += 1
+                    self.pos_tags.update(pos_tags)
+                    self.pos_mapper.unknown_classes.update(unknown_classes)
+                    yield term_entries
+        finally:
+            store.close()
+    
+    def partition_banks(self, all_term_entries: List, bank_size: int = 10000) -> List[List]:
+        """Split term rows into banks"""
+        if self.stable_banks:
+            return self._partition_stable_banks(all_term_entries)
+        return [all_term_entries[i:i + bank_size] for i in range(0, len(all_term_entries), bank_size)]
+    
+    def _partition_stable_banks(self, all_term_entries: List) -> List[List]:
+        """Bucket rows by headword hash, so inserting an entry only changes its own bank"""
+        banks = [[] for _ in range(self.stable_banks)]
+        for term_entry in all_term_entries:
+            banks[zlib.crc32(term_entry[0].encode('utf-8')) % self.stable_banks].append(term_entry)
+        
+        # Sequence numbers restart per bank for the same reason
+        for bank_index, bank in enumerate(banks):
+            for position, term_entry in enumerate(bank):
+                term_entry[6] = bank_index * STABLE_BANK_SEQUENCE_STRIDE + position + 1
+        
+        return banks
+    
     def _write_term_banks(self, all_term_entries: List, output_dir: str) -> None:
         """Write term bank files with parallel processing"""
         print("Writing term bank files...")
-        bank_size = 10000
-        total_banks = (len(all_term_entries) + bank_size - 1) // bank_size
+        banks = self.partition_banks(all_term_entries)
+        total_banks = len(banks)
         print(f"Preparing {total_banks} banks with {len(all_term_entries)} total entries...")
         
         start_time = time.time()
         completed_count = [0]
         
         def write_single_bank(bank_info):
-            bank_number, start_idx = bank_info
-            end_idx = min(start_idx + bank_size, len(all_term_entries))
-            bank_entries = all_term_entries[start_idx:end_idx]
-            filename = f"{output_dir}/term_bank_{bank_number}.json"
-            
+            bank_number, bank_entries = bank_info
             file_start = time.time()
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(bank_entries, f, ensure_ascii=False, separators=(',', ':'))
+            write_bank_file(output_dir, bank_number, bank_entries)
             file_time = time.time() - file_start
             
             completed_count[0] += 1
@@ -153,11 +451,11 @@ class YomitanConverter:
             
             return bank_number
         
-        bank_tasks = [(i + 1, i * bank_size) for i in range(total_banks)]
+        bank_tasks = [(i + 1, bank) for i, bank in enumerate(banks)]
         
-        print(f"Starting parallel write with {min(8, total_banks)} threads...")
+        max_workers = max(1, min(self.serialize_workers, total_banks))
+        print(f"Starting parallel write with {max_workers} threads...")
         
-        max_workers = min(8, total_banks)
         with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
             futures = [executor.submit(write_single_bank, task) for task in bank_tasks]
             print(f"Submitted {len(futures)} write tasks...")
@@ -178,6 +476,20 @@ class YomitanConverter:
         with open(f"{output_dir}/tag_bank_1.json", 'w', encoding='utf-8') as f:
             json.dump(tag_bank, f, ensure_ascii=False, separators=(',', ':'))
     
+    def _write_term_meta_banks(self, output_dir: str) -> None:
+        """Write frequency term meta bank files"""
+        for bank_number, bank in enumerate(self.generate_term_meta_banks(), 1):
+            with open(f"{output_dir}/term_meta_bank_{bank_number}.json", 'w', encoding='utf-8') as f:
+                f.write(json.dumps(bank, ensure_ascii=False, separators=(',', ':')))
+            print(f"Wrote term_meta_bank_{bank_number}.json ({len(bank)} frequencies)")
+    
+    def _write_inflection_index(self, index_rows: List[List], output_dir: str) -> None:
+        """Write the inflection-to-base index file"""
+        print("Writing inflection index...")
+        with open(f"{output_dir}/inflection_index.json", 'w', encoding='utf-8') as f:
+            json.dump(index_rows, f, ensure_ascii=False, separators=(',', ':'))
+        print(f"Inflection index: {len(index_rows)} inflection-to-base rows")
+    
     def _write_index_json(self, output_dir: str) -> None:
         """Write index.json file"""
         print("Writing index.json...")
@@ -187,22 +499,62 @@ class YomitanConverter:
     
     def create_zip_dictionary(self, output_dir: str, zip_path: str):
         """Create the final ZIP dictionary file"""
-        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED, compresslevel=9) as zipf:
-            for file_path in Path(output_dir).rglob('*.json'):
-                zipf.write(file_path, file_path.name)
+        # Write beside the target so the previous ZIP stays readable when it is the same path
+        temp_zip_path = f"{zip_path}.tmp"
+        reuse = ZipMemberReuse(self.previous_zip)
+        file_paths = sorted(Path(output_dir).rglob('*.json'))
+        with zipfile.ZipFile(temp_zip_path, 'w', zipfile.ZIP_DEFLATED, compresslevel=9) as zipf:
+            if self.compress_workers > 1 and len(file_paths) > 1:
+                self._write_members_parallel(file_paths, zipf, reuse)
+            else:
+                for file_path in file_paths:
+                    reuse.write(zipf, file_path.name, file_path.read_bytes())
+            if self.audio_bundle:
+                self.audio_bundle.write(zipf)
+            reuse.finish(zipf)
+        os.replace(temp_zip_path, zip_path)
+    
+    def _write_members_parallel(self, file_paths: List[Path], zipf: zipfile.ZipFile, reuse: ZipMemberReuse) -> None:
+        """Deflate members in threads and append them in order; the window bounds members held in memory"""
+        def read_and_deflate(file_path: Path):
+            data = file_path.read_bytes()
+            digest = reuse.digest(data)
+            unchanged = reuse.unchanged(file_path.name, data, digest)
+            deflated = None if unchanged else deflate_member(file_path.name, data)
+            return file_path.name, data, digest, unchanged, deflated
+        
+        start = time.time()
+        workers = min(self.compress_workers, len(file_paths))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = collections.deque()
+            for file_path in file_paths:
+                pending.append(executor.submit(read_and_deflate, file_path))
+                if len(pending) > workers:
+                    reuse.write(zipf, *pending.popleft().result())
+            while pending:
+                reuse.write(zipf, *pending.popleft().result())
+        print(f"Compressed {len(file_paths)} members with {workers} threads in {time.time() - start:.2f}s")
     
     def convert_dictionary(self, raw_entries: List[FolketsEntry], output_zip_path: str):
         """Main conversion function"""
         print(f"Starting conversion of {len(raw_entries)} raw entries to Yomitan format...")
         
-        temp_dir = "temp_dict_files"
-        self.write_dictionary_files(raw_entries, temp_dir)
-        
-        print(f"Creating ZIP dictionary: {output_zip_path}")
-        self.create_zip_dictionary(temp_dir, output_zip_path)
-        
-        # Clean up
-        shutil.rmtree(temp_dir)
+        entry_nodes_map = self.entry_processor.process_entries(raw_entries)
+        self.convert_entry_nodes(entry_nodes_map, output_zip_path)
+    
+    def convert_entry_nodes(self, entry_nodes_map: Dict[str, List[EntryNode]], output_zip_path: str):
+        """Conversion from processed entry nodes, e.g. loaded from a snapshot"""
+        if self.pipeline:
+            BuildPipeline(self).run(entry_nodes_map, output_zip_path)
+        else:
+            temp_dir = "temp_dict_files"
+            self.write_entry_node_files(entry_nodes_map, temp_dir)
+            
+            print(f"Creating ZIP dictionary: {output_zip_path}")
+            self.create_zip_dictionary(temp_dir, output_zip_path)
+            
+            # Clean up
+            shutil.rmtree(temp_dir)
         
         print(f"Conversion complete! Dictionary saved as: {output_zip_path}")
         print(f"Found POS tags: {sorted(self.pos_tags)}")
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+ZIP member reuse - copies unchanged members from a previous dictionary ZIP
+without decompressing or recompressing them
+"""
+
+import hashlib
+import json
+import os
+import struct
+import time
+import zipfile
+import zlib
+from typing import Dict, Optional, Tuple
+
+
+# Local file header layout (APPNOTE 4.3.7)
+LOCAL_HEADER_STRUCT = "<4s2B4HL2L2H"
+LOCAL_HEADER_SIZE = struct.calcsize(LOCAL_HEADER_STRUCT)
+LOCAL_HEADER_SIGNATURE = b"PK\003\004"
+FILENAME_LENGTH_FIELD = 10
+EXTRA_LENGTH_FIELD = 11
+
+# General purpose flag bit for a trailing data descriptor; raw copies carry sizes in the header
+DATA_DESCRIPTOR_FLAG = 0x08
+
+# Digest manifest for the next build; a member because the archive comment is limited to 65535 bytes
+MANIFEST_MEMBER = "reuse_manifest.json"
+
+# Members whose content changes on every build and is never worth comparing
+ALWAYS_RECOMPRESS = {"index.json", MANIFEST_MEMBER}
+
+# Private ZipFile state driven by write_raw_member, as ZipFile.mkdir does
+RAW_WRITE_ATTRIBUTES = ("_lock", "_seekable", "start_dir", "_writecheck", "_didModify", "filelist", "NameToInfo")
+
+
+def read_raw_member(source: zipfile.ZipFile, info: zipfile.ZipInfo) -> bytes:
+    """Read a member's compressed bytes as stored in the archive"""
+    source.fp.seek(info.header_offset)
+    header = struct.unpack(LOCAL_HEADER_STRUCT, source.fp.read(LOCAL_HEADER_SIZE))
+    if header[0] != LOCAL_HEADER_SIGNATURE:
+        raise zipfile.BadZipFile(f"Bad local header for {info.filename}")
+    source.fp.seek(header[FILENAME_LENGTH_FIELD] + header[EXTRA_LENGTH_FIELD], os.SEEK_CUR)
+    return source.fp.read(info.compress_size)
+
+
+def supports_raw_write(target: zipfile.ZipFile) -> bool:
+    """True if this zipfile version has the internals write_raw_member relies on"""
+    return hasattr(zipfile.ZipInfo, "FileHeader") and all(hasattr(target, name) for name in RAW_WRITE_ATTRIBUTES)
+
+
+def write_raw_member(target: zipfile.ZipFile, info: zipfile.ZipInfo, compressed: bytes) -> None:
+    """Append already-compressed member bytes, mirroring ZipFile.writestr's bookkeeping"""
+    if not supports_raw_write(target):
+        raise NotImplementedError("this zipfile version does not support raw member writes")
+    zinfo = zipfile.ZipInfo(info.filename, info.date_time)
+    zinfo.compress_type = info.compress_type
+    zinfo.flag_bits = info.flag_bits & ~DATA_DESCRIPTOR_FLAG
+    zinfo.external_attr = info.external_attr
+    zinfo.create_system = info.create_system
+    zinfo.CRC = info.CRC
+    zinfo.compress_size = info.compress_size
+    zinfo.file_size = info.file_size
+
+    # zipfile has no public raw-write API; this is the sequence ZipFile.mkdir uses
+    with target._lock:
+        if target._seekable:
+            target.fp.seek(target.start_dir)
+        zinfo.header_offset = target.fp.tell()
+        target._writecheck(zinfo)
+        target._didModify = True
+        target.fp.write(zinfo.FileHeader())
+        target.fp.write(compressed)
+        target.start_dir = target.fp.tell()
+        target.filelist.append(zinfo)
+        target.NameToInfo[zinfo.filename] = zinfo
+
+
+def deflate_member(name: str, data: bytes, compresslevel: int = 9) -> Tuple[zipfile.ZipInfo, bytes]:
+    """Compress a member as ZipFile.writestr would; zlib releases the GIL, so threads deflate in parallel"""
+    info = zipfile.ZipInfo(name, time.localtime(time.time())[:6])
+    info.compress_type = zipfile.ZIP_DEFLATED
+    info.external_attr = 0o600 << 16
+    info.CRC = zlib.crc32(data)
+    info.file_size = len(data)
+    compressor = zlib.compressobj(compresslevel, zlib.DEFLATED, -15)
+    compressed = compressor.compress(data) + compressor.flush()
+    info.compress_size = len(compressed)
+    return info, compressed
+
+
+class ZipMemberReuse:
+    """Writes dictionary members, raw-copying those unchanged since the previous ZIP"""
+
+    def __init__(self, previous_zip_path: Optional[str] = None):
+        self.previous: Optional[zipfile.ZipFile] = None
+        self.previous_hashes: Dict[str, str] = {}
+        self.hashes: Dict[str, str] = {}
+        self.reused = 0
+        self.compressed = 0
+
+        if previous_zip_path and os.path.exists(previous_zip_path):
+            self.previous = zipfile.ZipFile(previous_zip_path)
+            self.previous_hashes = self.read_manifest(self.previous)
+            print(f"Reusing unchanged members from {previous_zip_path} "
+                  f"({len(self.previous_hashes)} hashed members)")
+        elif previous_zip_path:
+            print(f"Previous dictionary not found, compressing everything: {previous_zip_path}")
+
+    @staticmethod
+    def read_manifest(zipf: zipfile.ZipFile) -> Dict[str, str]:
+        """Per-member SHA-256 digests from the manifest member, or the archive comment of older ZIPs"""
+        if MANIFEST_MEMBER in zipf.namelist():
+            source, data = MANIFEST_MEMBER, zipf.read(MANIFEST_MEMBER)
+        elif zipf.comment:
+            source, data = "archive comment", zipf.comment
+        else:
+            return {}
+        try:
+            return json.loads(data.decode('utf-8')).get("sha256", {})
+        except (ValueError, AttributeError):
+            print(f"WARNING: unreadable reuse manifest in {source}, every member will be compressed again")
+            return {}
+
+    @staticmethod
+    def digest(data: bytes) -> str:
+        """Manifest digest of a member's content"""
+        return hashlib.sha256(data).hexdigest()
+
+    def unchanged(self, name: str, data: bytes, digest: str) -> bool:
+        """True if the previous ZIP has this member with the same content"""
+        if not self.previous or name in ALWAYS_RECOMPRESS:
+            return False
+        if self.previous_hashes.get(name) != digest:
+            return False
+        try:
+            info = self.previous.getinfo(name)
+        except KeyError:
+            # The manifest lists a member the archive does not have
+            return False
+        # The stored CRC and size are a cheap cross-check of the manifest
+        return info.file_size == len(data) and info.CRC == zlib.crc32(data)
+
+    def write(self, target: zipfile.ZipFile, name: str, data: bytes, digest: Optional[str] = None,
+              unchanged: Optional[bool] = None, deflated: Optional[Tuple[zipfile.ZipInfo, bytes]] = None) -> bool:
+        """Write a member, returning True if it was copied from the previous ZIP
+
+        digest and unchanged are the results of digest() and unchanged() when a worker
+        thread already checked the member; deflated is the member already compressed
+        by deflate_member.
+        """
+        if digest is None:
+            digest = self.digest(data)
+        self.hashes[name] = digest
+        if not supports_raw_write(target):
+            # Without raw writes nothing can be copied, so compress the member like zipfile would
+            target.writestr(name, data)
+            self.compressed += 1
+            return False
+        if unchanged is None:
+            unchanged = self.unchanged(name, data, digest)
+
+        if unchanged:
+            info = self.previous.getinfo(name)
+            write_raw_member(target, info, read_raw_member(self.previous, info))
+            self.reused += 1
+            return True
+
+        if deflated:
+            write_raw_member(target, *deflated)
+        else:
+            target.writestr(name, data)
+        self.compressed += 1
+        return False
+
+    def finish(self, target: zipfile.ZipFile) -> None:
+        """Store the digest manifest for the next build and release the previous ZIP"""
+        target.writestr(MANIFEST_MEMBER, json.dumps({"sha256": self.hashes}, separators=(',', ':')))
+        if self.previous:
+            self.previous.close()
+            print(f"ZIP members: {self.reused} copied unchanged, {self.compressed} compressed")